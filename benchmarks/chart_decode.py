@@ -0,0 +1,177 @@
+"""Benchmark of yahoo-finance chart payload decoding, from bytes to `Bars`.
+
+Compares the stdlib path (`resp.json()` then lists of floats/None) with the
+array paths of every installed json decoder, on synthetic or recorded payloads.
+
+With `--workers`, also measures the throughput of decoding a batch of payloads
+concurrently through the cpu executor (inline for 0 workers, else a process pool).
+
+Usage:
+    python -m benchmarks.chart_decode --bars 10000 --bars 100000
+    python -m benchmarks.chart_decode --payload recorded_chart.json
+    python -m benchmarks.chart_decode --workers 0 --workers 8 --workers 32 --batch 256
+"""
+
+import asyncio
+import gc
+import json
+import time
+import typing as tp
+from pathlib import Path
+
+import numpy as np
+import typer
+
+from finvestor.schemas.bar import Bars
+from finvestor.utils.executor import CPUExecutor, ProcessPoolCPUExecutor
+from finvestor.yahoo_finance.decoding import (
+    JSON_DECODERS,
+    decode_chart,
+    get_chart_arrays,
+    loads_json,
+)
+
+app = typer.Typer(help=__doc__)
+
+
+def make_chart_payload(n_bars: int, seed: int = 0) -> bytes:
+    """Make a synthetic 1m chart payload with `n_bars` bars, ~1% of them null."""
+    rng = np.random.default_rng(seed)
+    timestamp = 1_600_000_000 + 60 * np.arange(n_bars)
+    close = 100 + rng.standard_normal(n_bars).cumsum()
+    missing = rng.random(n_bars) < 0.01
+
+    def _column(values: np.ndarray) -> tp.List[tp.Optional[float]]:
+        column: tp.List[tp.Optional[float]] = values.round(4).tolist()
+        for i in np.flatnonzero(missing):
+            column[i] = None
+        return column
+
+    quote = {
+        "open": _column(close + rng.uniform(-0.5, 0.5, n_bars)),
+        "high": _column(close + 1),
+        "low": _column(close - 1),
+        "close": _column(close),
+        "volume": _column(rng.integers(0, 10_000, n_bars).astype(np.float64)),
+    }
+    payload = {
+        "chart": {
+            "result": [
+                {
+                    "meta": {"symbol": "BENCH", "dataGranularity": "1m"},
+                    "timestamp": timestamp.tolist(),
+                    "indicators": {"quote": [quote]},
+                }
+            ],
+            "error": None,
+        }
+    }
+    return json.dumps(payload).encode()
+
+
+def decode_stdlib(content: bytes) -> Bars:
+    # previous path: `resp.json()` decodes text, bars are built from lists
+    result = json.loads(content.decode("utf-8"))["chart"]["result"][0]
+    ohlc = result["indicators"]["quote"][0]
+    return Bars.from_ohlc(dict(timestamp=result["timestamp"], **ohlc), interval="1m")
+
+
+def make_decode_arrays(decoder: str) -> tp.Callable[[bytes], Bars]:
+    def _decode(content: bytes) -> Bars:
+        result = loads_json(content, decoder=decoder)["chart"]["result"][0]
+        ohlc = get_chart_arrays(result["timestamp"], result["indicators"]["quote"][0])
+        return Bars.from_ohlc(ohlc, interval="1m")
+
+    return _decode
+
+
+def get_decode_paths() -> tp.Dict[str, tp.Callable[[bytes], Bars]]:
+    paths = {"stdlib (lists)": decode_stdlib}
+    paths.update(
+        {f"{name} (arrays)": make_decode_arrays(name) for name in JSON_DECODERS}
+    )
+    return paths
+
+
+def benchmark(
+    content: bytes, decode: tp.Callable[[bytes], Bars], repeat: int
+) -> tp.Dict[str, float]:
+    def _run() -> float:
+        gc.collect()
+        start = time.perf_counter()
+        decode(content)
+        return time.perf_counter() - start
+
+    timings = [_run() for _ in range(repeat)]
+    return {
+        "best_s": min(timings),
+        "median_s": float(np.median(timings)),
+        "mb_per_s": len(content) / 2**20 / min(timings),
+    }
+
+
+def benchmark_executor(content: bytes, workers: int, batch: int) -> float:
+    """Throughput (MB/s) of decoding `batch` payloads concurrently."""
+    executor = ProcessPoolCPUExecutor(workers) if workers else CPUExecutor()
+
+    async def _run() -> float:
+        # the first task starts the worker processes
+        await asyncio.gather(
+            *[executor.run(decode_chart, content) for _ in range(workers or 1)]
+        )
+        start = time.perf_counter()
+        await asyncio.gather(
+            *[executor.run(decode_chart, content) for _ in range(batch)]
+        )
+        return time.perf_counter() - start
+
+    with executor:
+        elapsed = asyncio.run(_run())
+    return batch * len(content) / 2**20 / elapsed
+
+
+@app.command()
+def main(
+    bars: tp.List[int] = typer.Option([10_000, 100_000], "--bars"),
+    payload: tp.List[Path] = typer.Option(
+        [], "--payload", exists=True, dir_okay=False, help="Recorded chart payload."
+    ),
+    repeat: int = typer.Option(5, "--repeat"),
+    workers: tp.List[int] = typer.Option(
+        [], "--workers", help="Executor worker processes, 0 to decode inline."
+    ),
+    batch: int = typer.Option(64, "--batch", help="Payloads decoded per batch."),
+):
+    payloads = [(f"{n} bars", make_chart_payload(n)) for n in bars]
+    payloads += [(path.name, path.read_bytes()) for path in payload]
+    paths = get_decode_paths()
+
+    typer.echo(
+        f"{'payload':>20} {'size (MB)':>10} {'path':>18} "
+        f"{'best (ms)':>10} {'median (ms)':>12} {'MB/s':>8}"
+    )
+    for name, content in payloads:
+        expected = decode_stdlib(content)
+        for path_name, decode in paths.items():
+            decoded = decode(content)
+            # all paths must decode to the same bars
+            np.testing.assert_array_equal(decoded.timestamp, expected.timestamp)
+            np.testing.assert_array_equal(decoded.values, expected.values)
+            result = benchmark(content, decode, repeat)
+            typer.echo(
+                f"{name:>20} {len(content) / 2**20:>10.2f} {path_name:>18} "
+                f"{result['best_s'] * 1e3:>10.2f} {result['median_s'] * 1e3:>12.2f} "
+                f"{result['mb_per_s']:>8.1f}"
+            )
+
+    if not workers:
+        return
+    typer.echo(f"\n{'payload':>20} {'workers':>8} {'MB/s':>8}")
+    for name, content in payloads:
+        for n_workers in workers:
+            mb_per_s = benchmark_executor(content, n_workers, batch)
+            typer.echo(f"{name:>20} {n_workers:>8} {mb_per_s:>8.1f}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,129 @@
+"""Import-time budget of the `finvestor` CLI.
+
+Imports `finvestor.cli` in fresh interpreters with `python -X importtime`, and
+fails (exit code 1) when the import time exceeds the budget, or when a heavy
+module (pandas, numpy, httpx, ...) is imported before a command runs.
+
+Usage:
+    python -m benchmarks.cli_startup --budget-ms 150
+"""
+
+import re
+import statistics
+import subprocess
+import sys
+import time
+import typing as tp
+
+import typer
+
+app = typer.Typer(help=__doc__)
+
+CLI_MODULE = "finvestor.cli"
+CLI_COMMANDS: tp.Tuple[tp.Tuple[str, ...], ...] = ((), ("etoro",), ("yahoo",))
+
+# modules only needed once a command runs
+DEFAULT_FORBIDDEN_MODULES = (
+    "pandas",
+    "numpy",
+    "httpx",
+    "pydantic",
+    "tenacity",
+    "anyio",
+    "yaml",
+    "rich.logging",
+)
+_IMPORTTIME_LINE = re.compile(r"^import time:\s*(\d+) \|\s*(\d+) \|(\s*)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> tp.Dict[str, int]:
+    """Parse the `-X importtime` output into module -> cumulative time (us)."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match is not None:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+
+def measure_import(module: str) -> tp.Tuple[float, tp.Dict[str, int]]:
+    """Import `module` in a fresh interpreter.
+
+    Returns:
+        (import time of `module` in ms, all imported modules cumulative time in us)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = parse_importtime(proc.stderr)
+    return imported[module] / 1e3, imported
+
+
+def measure_help(*command: str) -> float:
+    """Wall clock time (ms) of `finvestor <command> --help`."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", CLI_MODULE, *command, "--help"],
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1e3
+
+
+@app.command()
+def main(
+    budget_ms: float = typer.Option(
+        150.0, "--budget-ms", help="Maximum median import time of the CLI."
+    ),
+    forbidden: tp.List[str] = typer.Option(
+        list(DEFAULT_FORBIDDEN_MODULES),
+        "--forbidden",
+        help="Modules that must not be imported.",
+    ),
+    repeat: int = typer.Option(7, "--repeat"),
+):
+    timings = []
+    for _ in range(repeat):
+        import_ms, imported = measure_import(CLI_MODULE)
+        timings.append(import_ms)
+    median_ms = statistics.median(timings)
+
+    typer.echo(
+        f"import {CLI_MODULE}: best {min(timings):.1f} ms, median {median_ms:.1f} ms"
+    )
+    for command in CLI_COMMANDS:
+        help_ms = statistics.median(measure_help(*command) for _ in range(repeat))
+        typer.echo(
+            f"{' '.join(('finvestor', *command, '--help')):>26}: {help_ms:.1f} ms"
+        )
+
+    slowest = sorted(
+        ((name, us) for name, us in imported.items() if "." not in name),
+        key=lambda item: -item[1],
+    )[:5]
+    typer.echo("slowest top-level imports:")
+    for name, us in slowest:
+        typer.echo(f"{name:>26}: {us / 1e3:.1f} ms")
+
+    failed = False
+    heavy = [name for name in forbidden if name in imported]
+    if heavy:
+        typer.secho(f"Heavy modules imported by '{CLI_MODULE}': {heavy}", fg="red")
+        failed = True
+    if median_ms > budget_ms:
+        typer.secho(
+            f"Import time of '{CLI_MODULE}' ({median_ms:.1f} ms) exceeds the budget "
+            f"({budget_ms:.1f} ms).",
+            fg="red",
+        )
+        failed = True
+    if failed:
+        raise typer.Exit(code=1)
+    typer.secho("The CLI is within the startup budget.", fg="green")
+
+
+if __name__ == "__main__":
+    app()
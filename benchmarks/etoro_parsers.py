@@ -0,0 +1,226 @@
+"""Benchmark of the etoro account statement parser on synthetic statements.
+
+Usage:
+    python -m benchmarks.etoro_parsers --rows 10000 --rows 100000 --rows 1000000
+"""
+
+import gc
+import time
+import tracemalloc
+import typing as tp
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import typer
+
+from finvestor.etoro.parsers import parse_etoro_account_statement
+from finvestor.etoro.utils import ETORO_DATETIME_FORMAT
+
+app = typer.Typer(help=__doc__)
+
+_TICKERS = np.array(["AAPL", "MSFT", "TSLA", "BTC", "ETH", "AMZN", "NFLX", "SPY"])
+_OTHER_TYPES = np.array(
+    [
+        "Adjustment",
+        "Rollover Fee",
+        "Deposit",
+        "Withdraw Fee",
+        "Withdraw Request",
+        "Withdraw Fee Cancelled",
+        "Withdraw Request Cancelled",
+    ]
+)
+
+
+def _format_dates(dates: np.ndarray) -> np.ndarray:
+    return pd.to_datetime(dates).strftime(ETORO_DATETIME_FORMAT).to_numpy()
+
+
+def make_account_summary() -> pd.DataFrame:
+    details: tp.List[tp.Tuple[str, tp.Any]] = [
+        ("Account Details", "-"),
+        ("Name", "John Doe"),
+        ("Username", "johndoe"),
+        ("Currency", "USD"),
+        ("Date Created", "01/01/2019 00:00:00"),
+        ("Start Date", "01/01/2019 00:00:00"),
+        ("End Date", "01/01/2022 00:00:00"),
+        ("", np.nan),
+        ("Equity", "-"),
+        ("Beginning Realized Equity", 0.0),
+        ("Beginning Unrealized Equity", 0.0),
+        ("Deposits", 1000.0),
+        ("Refunds", 0.0),
+        ("Credits", 0.0),
+        ("Adjustments", 0.0),
+        ("Withdrawals", 0.0),
+        ("Profit or Loss (Closed positions only)", 10.0),
+        ("Rollover Fees", 0.0),
+        ("Withdrawal Fees", 0.0),
+        ("", np.nan),
+        ("Ending", "-"),
+        ("Ending Realized Equity", 1010.0),
+        ("Ending Unrealized Equity", 1020.0),
+    ]
+    return pd.DataFrame(details, columns=["Details", "Value"])
+
+
+def make_financial_summary() -> pd.DataFrame:
+    names = [
+        "CFDs (Profit or Loss)",
+        "Crypto (Profit or Loss)",
+        "Stocks (Profit or Loss)",
+        "ETFs (Profit or Loss)",
+        "Stock Dividends (Profit)",
+        "CFD Dividends (Profit or Loss)",
+        "Income from Refunds",
+        "Commissions (spread) on CFDs",
+        "Commissions (spread) on Crypto",
+        "Commissions (spread) on ETFs",
+        "Fees",
+    ]
+    return pd.DataFrame(
+        {"Name": names, "Amount\nin USD": 1.0, "Tax\nRate": np.nan},
+    )
+
+
+def make_statement(rows: int, seed: int = 0) -> tp.Dict[str, pd.DataFrame]:
+    """Make a synthetic etoro statement with ~`rows` 'Account Activity' rows."""
+    rng = np.random.default_rng(seed)
+    n_positions = max(rows * 2 // 5, 1)
+    n_closed = n_positions // 2
+    n_other = max(rows - n_positions - n_closed, 0)
+
+    position_id = np.arange(1_000_000, 1_000_000 + n_positions)
+    tickers = rng.choice(_TICKERS, n_positions)
+    details = np.char.add(tickers, "/USD")
+    start = np.datetime64(datetime(2019, 1, 1))
+    open_dates = start + rng.integers(0, 3 * 365 * 24 * 3600, n_positions).astype(
+        "timedelta64[s]"
+    )
+    close_dates = open_dates[:n_closed] + np.timedelta64(timedelta(days=30))
+    amounts = rng.uniform(10, 1000, n_positions).round(2)
+    units = (amounts / rng.uniform(10, 500, n_positions)).round(6)
+
+    def _activity(n: int, **columns: tp.Any) -> pd.DataFrame:
+        data = {
+            "Date": None,
+            "Type": None,
+            "Details": None,
+            "Amount": 0.0,
+            "Units": np.nan,
+            "Realized Equity Change": 0.0,
+            "Realized Equity": 1000.0,
+            "Balance": 1000.0,
+            "Position ID": np.nan,
+            "NWA": 0.0,
+        }
+        data.update(columns)
+        return pd.DataFrame(data, index=pd.RangeIndex(n))
+
+    account_activity = pd.concat(
+        [
+            _activity(
+                n_positions,
+                Date=_format_dates(open_dates),
+                Type="Open Position",
+                Details=details,
+                Amount=amounts,
+                Units=units,
+                **{"Position ID": position_id},
+            ),
+            _activity(
+                n_closed,
+                Date=_format_dates(close_dates),
+                Type="Profit/Loss of Trade",
+                Details=details[:n_closed],
+                Amount=amounts[:n_closed] * 0.1,
+                Units=units[:n_closed],
+                **{"Position ID": position_id[:n_closed]},
+            ),
+            _activity(
+                n_other,
+                Date=_format_dates(
+                    start
+                    + rng.integers(0, 3 * 365 * 24 * 3600, n_other).astype(
+                        "timedelta64[s]"
+                    )
+                ),
+                Type=rng.choice(_OTHER_TYPES, n_other),
+                Details="-",
+                Amount=rng.uniform(-10, 10, n_other).round(2),
+            ),
+        ],
+        ignore_index=True,
+    )
+
+    closed_positions = pd.DataFrame(
+        {
+            "Position ID": position_id[:n_closed],
+            "Action": np.char.add("Buy ", tickers[:n_closed]),
+            "Amount": amounts[:n_closed],
+            "Units": units[:n_closed],
+            "Open Rate": (amounts / units)[:n_closed],
+            "Close Rate": (amounts / units)[:n_closed] * 1.1,
+            "Spread": 0.0,
+            "Profit": amounts[:n_closed] * 0.1,
+            "Open Date": _format_dates(open_dates[:n_closed]),
+            "Close Date": _format_dates(close_dates),
+            "Take Profit Rate": 0.0,
+            "Stop Lose Rate": 0.0,
+            "Rollover Fees And Dividends": 0.0,
+            "Copied From": None,
+            "Type": "Stocks",
+            "ISIN": None,
+            "Notes": None,
+        }
+    )
+    return {
+        "Account Summary": make_account_summary(),
+        "Financial Summary": make_financial_summary(),
+        "Closed Positions": closed_positions,
+        "Account Activity": account_activity,
+    }
+
+
+def benchmark(rows: int, repeat: int) -> tp.Dict[str, float]:
+    sheets = make_statement(rows)
+
+    def _run() -> float:
+        copies = {name: df.copy() for name, df in sheets.items()}
+        gc.collect()
+        start = time.perf_counter()
+        parse_etoro_account_statement(copies)
+        return time.perf_counter() - start
+
+    timings = [_run() for _ in range(repeat)]
+    # tracemalloc slows down parsing a lot, so peak memory is measured separately
+    tracemalloc.start()
+    _run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "rows": len(sheets["Account Activity"]),
+        "best_s": min(timings),
+        "median_s": float(np.median(timings)),
+        "peak_mb": peak / 2**20,
+    }
+
+
+@app.command()
+def main(
+    rows: tp.List[int] = typer.Option([10_000, 100_000], "--rows"),
+    repeat: int = typer.Option(3, "--repeat"),
+):
+    typer.echo(f"{'rows':>10} {'best (s)':>10} {'median (s)':>11} {'peak (MB)':>10}")
+    for n in rows:
+        result = benchmark(n, repeat)
+        typer.echo(
+            f"{result['rows']:>10} {result['best_s']:>10.3f} "
+            f"{result['median_s']:>11.3f} {result['peak_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    app()
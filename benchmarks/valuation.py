@@ -0,0 +1,71 @@
+"""Benchmark of the portfolio valuation engine on synthetic transactions and bars.
+
+Usage:
+    python -m benchmarks.valuation --transactions 10000 --tickers 500 --days 1260
+"""
+
+import time
+import typing as tp
+
+import numpy as np
+import typer
+
+from finvestor.schemas.bar import BAR_FIELDS, BarsPanel
+from finvestor.valuation import PortfolioValuation, TradeEvents
+
+app = typer.Typer(help=__doc__)
+
+
+def make_panel(tickers: int, days: int, seed: int = 0) -> BarsPanel:
+    """Make a daily bars panel of random walks, with ~5% missing bars."""
+    rng = np.random.default_rng(seed)
+    timestamp = 1_500_000_000 + np.arange(days, dtype=np.int64) * 86400
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (days, tickers)), axis=0))
+    values = np.repeat(close[:, :, None], len(BAR_FIELDS), axis=2)
+    values[rng.random((days, tickers)) < 0.05] = np.nan
+    names = [f"T{i:04d}" for i in range(tickers)]
+    return BarsPanel(timestamp, names, values, interval="1d")
+
+
+def make_events(panel: BarsPanel, transactions: int, seed: int = 0) -> TradeEvents:
+    """Make random buys and sells (shorts included) of the panel tickers."""
+    rng = np.random.default_rng(seed)
+    return TradeEvents(
+        rng.choice(panel.tickers, transactions),
+        rng.choice(panel.timestamp, transactions) + 3600,
+        rng.normal(0, 10, transactions).round(2),
+        rng.uniform(50, 150, transactions),
+        rng.uniform(0, 1, transactions),
+    )
+
+
+@app.command()
+def main(
+    transactions: int = typer.Option(10_000, "--transactions"),
+    tickers: int = typer.Option(500, "--tickers"),
+    days: int = typer.Option(1260, "--days"),
+    repeat: int = typer.Option(5, "--repeat"),
+):
+    panel = make_panel(tickers, days)
+    events = make_events(panel, transactions)
+    timings: tp.List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        valuation = PortfolioValuation.compute(events, panel)
+        timings.append(time.perf_counter() - start)
+    typer.echo(
+        f"{transactions} transactions x {tickers} tickers x {days} bars: "
+        f"best {min(timings) * 1e3:.1f} ms, median {np.median(timings) * 1e3:.1f} ms"
+    )
+    # cash flows and market value must add up to the realized and unrealized P&L
+    error = np.abs(
+        valuation.cash
+        + valuation.market_value
+        - valuation.realized_pnl
+        - valuation.unrealized_pnl
+    ).max()
+    typer.echo(f"max P&L identity error: {error:.2e}")
+
+
+if __name__ == "__main__":
+    app()
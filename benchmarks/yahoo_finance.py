@@ -0,0 +1,364 @@
+"""Offline benchmark of the yahoo-finance pipeline, replaying payloads through an
+httpx `MockTransport` with configurable latency and error injection.
+
+Scenarios:
+    bars: `get_yahoo_finance_bars` (1d bars over 1y) of N tickers.
+    assets: batch quotes, then `get_asset` (summary profile and ISIN) of N tickers.
+    csv: `load_yf_csv_quotes` of a yahoo-finance csv export with N tickers.
+
+Each (scenario, tickers) case runs in a fresh process, so that peak RSS is not
+shared across cases. Recorded payloads can be replayed from `--fixtures DIR`
+(`chart.json`, `quote.json`, `quote_summary.json` and `isin.txt`, where the
+string '{ticker}' is replaced by the requested ticker), missing fixtures are
+synthesized.
+
+Usage:
+    python -m benchmarks.yahoo_finance --tickers 10 --tickers 100 --tickers 1000
+    python -m benchmarks.yahoo_finance --latency-ms 50 --error-rate 0.01 \\
+        --output results.json --baseline baseline.json
+"""
+
+import asyncio
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing as tp
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import httpx
+import numpy as np
+import typer
+from tenacity import wait_none
+
+from benchmarks.chart_decode import make_chart_payload
+from finvestor.yahoo_finance import bars as yf_bars
+from finvestor.yahoo_finance import scrapper as yf_scrapper
+from finvestor.yahoo_finance.bars import get_yahoo_finance_bars
+from finvestor.yahoo_finance.client import create_client
+from finvestor.yahoo_finance.portfolio import load_yf_csv_quotes
+from finvestor.yahoo_finance.scheduler import RequestScheduler, set_scheduler
+from finvestor.yahoo_finance.scrapper import get_asset, get_quotes
+
+app = typer.Typer(help=__doc__)
+
+SCENARIOS = ("bars", "assets", "csv")
+# relative change of a metric, above which a case is reported as a regression
+DEFAULT_TOLERANCE = 0.1
+
+
+class Fixtures:
+    """Payloads replayed by the mock transport, per endpoint."""
+
+    def __init__(self, fixtures_dir: tp.Optional[Path] = None) -> None:
+        def _read(name: str) -> tp.Optional[str]:
+            if fixtures_dir is None or not (fixtures_dir / name).is_file():
+                return None
+            return (fixtures_dir / name).read_text()
+
+        self.chart = (_read("chart.json") or make_chart_payload(252).decode()).encode()
+        quote = _read("quote.json")
+        self.quote = (
+            json.loads(quote)["quoteResponse"]["result"][0]
+            if quote
+            else {
+                "symbol": "{ticker}",
+                "longName": "{ticker} Inc.",
+                "quoteType": "EQUITY",
+                "currency": "USD",
+                "exchange": "NMS",
+                "exchangeTimezoneName": "America/New_York",
+                "market": "us_market",
+            }
+        )
+        self.quote_summary = (
+            _read("quote_summary.json")
+            or '{"quoteSummary": {"result": [{"summaryProfile": {"sector": '
+            '"Technology", "industry": "Software", "country": "US"}}], "error": null}}'
+        ).encode()
+        self.isin = _read("isin.txt") or '["{ticker}|US0000000000|Stock"]'
+
+    def quotes(self, tickers: tp.List[str]) -> bytes:
+        template = json.dumps(self.quote)
+        results = [json.loads(template.replace("{ticker}", t)) for t in tickers]
+        for ticker, result in zip(tickers, results):
+            result["symbol"] = ticker
+        return json.dumps(
+            {"quoteResponse": {"result": results, "error": None}}
+        ).encode()
+
+
+def make_transport(
+    fixtures: Fixtures, *, latency_ms: float, jitter_ms: float, error_rate: float
+) -> httpx.MockTransport:
+    rng = random.Random(0)
+
+    async def _handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(max(latency_ms + rng.uniform(-1, 1) * jitter_ms, 0) / 1e3)
+        if rng.random() < error_rate:
+            return httpx.Response(503, request=request)
+        path = request.url.path
+        if path.startswith("/v8/finance/chart/"):
+            return httpx.Response(200, content=fixtures.chart)
+        if path.startswith("/v7/finance/quote"):
+            symbols = request.url.params["symbols"].split(",")
+            return httpx.Response(200, content=fixtures.quotes(symbols))
+        if path.startswith("/v10/finance/quoteSummary/"):
+            return httpx.Response(200, content=fixtures.quote_summary)
+        if "SearchController_Suggest" in path:
+            ticker = request.url.params["query"]
+            return httpx.Response(200, text=fixtures.isin.replace("{ticker}", ticker))
+        return httpx.Response(404, request=request)
+
+    return httpx.MockTransport(_handler)
+
+
+def make_tickers(n: int) -> tp.List[str]:
+    return [f"T{i:05d}" for i in range(n)]
+
+
+def make_csv(path: Path, tickers: tp.List[str]) -> None:
+    header = (
+        "Symbol,Current Price,Date,Time,Change,Open,High,Low,Volume,Trade Date,"
+        "Purchase Price,Quantity,Commission,High Limit,Low Limit,Comment"
+    )
+    rows = [
+        f"{ticker},150,2021/10/24,16:00 EDT,1,1,1,1,1,20200115,80.5,10,0,,,"
+        for ticker in tickers
+    ]
+    path.write_text("\n".join([header, *rows]) + "\n")
+
+
+def disable_retry_backoff() -> None:
+    """Retry injected errors immediately, instead of waiting seconds between tries."""
+    for func in (
+        yf_bars.get_yahoo_finance_ticker_ohlc,
+        yf_scrapper.get_quote_summary,
+        yf_scrapper.get_isin,
+        yf_scrapper._get_quotes_batch,
+    ):
+        func.__wrapped__.retry.wait = wait_none()  # type: ignore
+
+
+async def _run_scenario(
+    scenario: str, tickers: tp.List[str], client: httpx.AsyncClient, tmp_dir: Path
+) -> tp.Tuple[tp.List[float], int]:
+    """Run a scenario, returns the latency (in seconds) of each ticker and the
+    number of failed tickers.
+    """
+    if scenario == "csv":
+        csv_path = tmp_dir / "quotes.csv"
+        make_csv(csv_path, tickers)
+
+    start = time.perf_counter()
+    latencies: tp.List[float] = []
+
+    async def _timed(coro: tp.Awaitable[tp.Any]) -> None:
+        await coro
+        latencies.append(time.perf_counter() - start)
+
+    if scenario == "bars":
+        results = await asyncio.gather(
+            *[
+                _timed(
+                    get_yahoo_finance_bars(
+                        ticker, client=client, interval="1d", period="1y"
+                    )
+                )
+                for ticker in tickers
+            ],
+            return_exceptions=True,
+        )
+    elif scenario == "assets":
+        # same requests as `get_assets`, timed per ticker
+        quotes = await get_quotes(tickers, client=client)
+        results = await asyncio.gather(
+            *[
+                _timed(get_asset(ticker, client=client, quote=quotes.get(ticker)))
+                for ticker in tickers
+            ],
+            return_exceptions=True,
+        )
+    elif scenario == "csv":
+        results = await asyncio.gather(
+            _timed(load_yf_csv_quotes(str(csv_path), client=client)),
+            return_exceptions=True,
+        )
+        latencies = latencies * len(tickers)
+    else:
+        raise ValueError(f"Unknown scenario: {scenario}")
+    errors = sum(isinstance(result, Exception) for result in results)
+    if scenario == "csv":
+        errors *= len(tickers)
+    return latencies or [time.perf_counter() - start], errors
+
+
+def run_case(
+    scenario: str,
+    n_tickers: int,
+    *,
+    fixtures_dir: tp.Optional[Path],
+    latency_ms: float,
+    jitter_ms: float,
+    error_rate: float,
+    max_concurrency: int,
+) -> tp.Dict[str, tp.Any]:
+    """Run a single (scenario, tickers) case, in the current process."""
+    tmp_dir = Path(tempfile.mkdtemp(prefix="finvestor-bench-"))
+    os.environ["FINVESTOR_CACHE_DIR"] = str(tmp_dir)
+    disable_retry_backoff()
+    fixtures = Fixtures(fixtures_dir)
+    tickers = make_tickers(n_tickers)
+
+    async def _run() -> tp.Tuple[float, tp.List[float], int, int]:
+        # no rate limits, the mock server latency is the only bottleneck
+        set_scheduler(RequestScheduler(max_concurrency, host_rates={}))
+        transport = make_transport(
+            fixtures,
+            latency_ms=latency_ms,
+            jitter_ms=jitter_ms,
+            error_rate=error_rate,
+        )
+        requests = 0
+
+        async def _count(request: httpx.Request) -> None:
+            nonlocal requests
+            requests += 1
+
+        async with create_client(transport=transport) as client:
+            client.event_hooks["request"].append(_count)
+            gc.collect()
+            start = time.perf_counter()
+            latencies, errors = await _run_scenario(scenario, tickers, client, tmp_dir)
+            return time.perf_counter() - start, latencies, errors, requests
+
+    wall_s, latencies, errors, requests = asyncio.run(_run())
+    # tracemalloc slows down the run a lot, so allocations are measured separately
+    tracemalloc.start()
+    asyncio.run(_run())
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # ru_maxrss is in bytes on macOS and in kilobytes on linux
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = max_rss / 2**20 if sys.platform == "darwin" else max_rss / 2**10
+    return {
+        "scenario": scenario,
+        "tickers": n_tickers,
+        "requests": requests,
+        "errors": errors,
+        "wall_s": wall_s,
+        "tickers_per_s": n_tickers / wall_s,
+        "p50_ms": float(np.percentile(latencies, 50) * 1e3),
+        "p99_ms": float(np.percentile(latencies, 99) * 1e3),
+        "alloc_peak_mb": peak / 2**20,
+        "alloc_retained_mb": current / 2**20,
+        "peak_rss_mb": peak_rss_mb,
+    }
+
+
+def compare(
+    results: tp.List[tp.Dict[str, tp.Any]],
+    baseline: tp.List[tp.Dict[str, tp.Any]],
+    tolerance: float,
+) -> tp.List[str]:
+    """Compare results against a baseline, returns the detected regressions."""
+    base = {(r["scenario"], r["tickers"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        previous = base.get((result["scenario"], result["tickers"]))
+        if previous is None:
+            continue
+        case = f"{result['scenario']}[{result['tickers']}]"
+        # (metric, whether higher is better)
+        for metric, higher_is_better in (
+            ("tickers_per_s", True),
+            ("p99_ms", False),
+            ("alloc_peak_mb", False),
+        ):
+            change = result[metric] / previous[metric] - 1
+            typer.echo(f"{case:>16} {metric:>14} {change:>+8.1%}")
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{case} {metric}: {change:+.1%}")
+    return regressions
+
+
+@app.command()
+def main(
+    tickers: tp.List[int] = typer.Option([10, 100, 1_000], "--tickers"),
+    scenario: tp.List[str] = typer.Option(list(SCENARIOS), "--scenario"),
+    fixtures: tp.Optional[Path] = typer.Option(
+        None, "--fixtures", exists=True, file_okay=False, help="Recorded payloads."
+    ),
+    latency_ms: float = typer.Option(20.0, help="Mock server latency."),
+    jitter_ms: float = typer.Option(5.0, help="Mock server latency jitter."),
+    error_rate: float = typer.Option(0.0, help="Ratio of requests failing with 503."),
+    max_concurrency: int = typer.Option(64, help="Maximum concurrent requests."),
+    output: tp.Optional[Path] = typer.Option(None, "--output", "-o"),
+    baseline: tp.Optional[Path] = typer.Option(None, "--baseline", exists=True),
+    tolerance: float = typer.Option(DEFAULT_TOLERANCE),
+):
+    results = []
+    typer.echo(
+        f"{'case':>16} {'requests':>9} {'errors':>7} {'tickers/s':>10} {'p50 (ms)':>9} "
+        f"{'p99 (ms)':>9} {'alloc (MB)':>11} {'rss (MB)':>9}"
+    )
+    for name in scenario:
+        for n in tickers:
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(
+                    run_case,
+                    name,
+                    n,
+                    fixtures_dir=fixtures,
+                    latency_ms=latency_ms,
+                    jitter_ms=jitter_ms,
+                    error_rate=error_rate,
+                    max_concurrency=max_concurrency,
+                ).result()
+            results.append(result)
+            typer.echo(
+                f"{name + '[' + str(n) + ']':>16} {result['requests']:>9} "
+                f"{result['errors']:>7} "
+                f"{result['tickers_per_s']:>10.1f} {result['p50_ms']:>9.1f} "
+                f"{result['p99_ms']:>9.1f} {result['alloc_peak_mb']:>11.1f} "
+                f"{result['peak_rss_mb']:>9.1f}"
+            )
+
+    if output is not None:
+        report = {
+            "config": {
+                "latency_ms": latency_ms,
+                "jitter_ms": jitter_ms,
+                "error_rate": error_rate,
+                "max_concurrency": max_concurrency,
+                "fixtures": str(fixtures) if fixtures else None,
+            },
+            "platform": {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+            },
+            "results": results,
+        }
+        output.write_text(json.dumps(report, indent=2))
+        typer.echo(f"Results written to '{output}'.")
+
+    if baseline is not None:
+        regressions = compare(
+            results, json.loads(baseline.read_text())["results"], tolerance
+        )
+        if regressions:
+            typer.secho("Regressions:\n" + "\n".join(regressions), fg=typer.colors.RED)
+            raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
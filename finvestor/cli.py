@@ -0,0 +1,103 @@
+import typing as tp
+from pathlib import Path
+
+import typer
+
+from finvestor.etoro.cli import app as etoro_app
+from finvestor.yahoo_finance.cli import app as yahoo_finance_app
+
+app = typer.Typer(help="finvestor command line interface.", no_args_is_help=True)
+app.add_typer(etoro_app, name="etoro", invoke_without_command=True)
+app.add_typer(yahoo_finance_app, name="yahoo")
+
+daemon_app = typer.Typer(
+    help="Local daemon keeping connections and caches warm between commands.",
+    no_args_is_help=True,
+)
+app.add_typer(daemon_app, name="daemon")
+
+_SOCKET_OPTION = typer.Option(
+    None, "--socket", dir_okay=False, help="Daemon unix socket path."
+)
+
+
+@daemon_app.command("start")
+def daemon_start(
+    socket: tp.Optional[Path] = _SOCKET_OPTION,
+    max_concurrency: tp.Optional[int] = typer.Option(
+        None,
+        help="Maximum number of concurrent requests, defaults to the scheduler's.",
+    ),
+    http_cache: bool = typer.Option(
+        False, "--http-cache/--no-http-cache", help="Cache http responses on disk."
+    ),
+    metrics: bool = typer.Option(
+        False, "--metrics/--no-metrics", help="Record request/parse metrics."
+    ),
+    cpu_workers: tp.Optional[int] = typer.Option(
+        None,
+        "--cpu-workers",
+        help="Decode and validate responses in a pool of N processes.",
+    ),
+):
+    """
+    Run the daemon in the foreground, until stopped.
+    """
+    import asyncio
+
+    from finvestor.daemon import FinvestorDaemon
+    from finvestor.utils.logger import setup_logging
+
+    setup_logging()
+    daemon = FinvestorDaemon(
+        socket,
+        max_concurrency=max_concurrency,
+        http_cache=http_cache,
+        metrics=metrics,
+        cpu_workers=cpu_workers,
+    )
+    try:
+        asyncio.run(daemon.serve())
+    except RuntimeError as error:
+        typer.secho(f"{error}", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+
+@daemon_app.command("stop")
+def daemon_stop(socket: tp.Optional[Path] = _SOCKET_OPTION):
+    """
+    Stop the running daemon.
+    """
+    from finvestor.daemon import connect
+
+    client = connect(socket)
+    if client is None:
+        typer.secho("No finvestor daemon is running.", fg=typer.colors.YELLOW)
+        raise typer.Exit(code=1)
+    client.shutdown()
+    typer.secho("Finvestor daemon stopped.", fg=typer.colors.BRIGHT_GREEN)
+
+
+@daemon_app.command("status")
+def daemon_status(socket: tp.Optional[Path] = _SOCKET_OPTION):
+    """
+    Show whether the daemon is running.
+    """
+    from finvestor.daemon import connect
+
+    client = connect(socket)
+    if client is None:
+        typer.secho("No finvestor daemon is running.", fg=typer.colors.YELLOW)
+        raise typer.Exit(code=1)
+    status = client.ping()
+    typer.secho(
+        f"Finvestor daemon running on '{client.path}' (pid {status['pid']}, "
+        f"uptime {status['uptime']:.0f}s, {status['requests']} requests).",
+        fg=typer.colors.BRIGHT_GREEN,
+    )
+    for name, value in status.get("settings", {}).items():
+        typer.echo(f"  {name}: {value}")
+
+
+if __name__ == "__main__":
+    app()
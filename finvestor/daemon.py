@@ -0,0 +1,360 @@
+import json
+import logging
+import os
+import socket
+import time
+import typing as tp
+from pathlib import Path
+
+from finvestor.utils.paths import get_cache_dir
+
+if tp.TYPE_CHECKING:  # pragma: no cover
+    import asyncio
+
+    import httpx
+
+    from finvestor.schemas.asset import Asset
+    from finvestor.schemas.bar import Bars
+
+logger = logging.getLogger(__name__)
+
+# the protocol is one json object per line: a request `{"method": .., "params": ..}`
+# is answered with `{"ok": true, "result": ..}` or `{"ok": false, "error": ..}`
+DAEMON_SOCKET_ENV = "FINVESTOR_DAEMON_SOCKET"
+DEFAULT_CONNECT_TIMEOUT = 0.5
+DEFAULT_REQUEST_TIMEOUT = 600.0
+# connections are kept alive longer than by the CLI, to outlive cron intervals
+DEFAULT_DAEMON_KEEPALIVE_EXPIRY = 300.0
+_MAX_LINE_SIZE = 2**26
+
+
+class DaemonError(Exception):
+    """Error of a request handled by the daemon."""
+
+
+class DaemonUnavailable(ConnectionError):
+    """The daemon is not running (or not reachable)."""
+
+
+def get_socket_path() -> Path:
+    """Get the daemon unix socket path.
+
+    Defaults to '<cache_dir>/daemon.sock', can be overridden using the env
+    variable 'FINVESTOR_DAEMON_SOCKET'.
+    """
+    path = os.getenv(DAEMON_SOCKET_ENV)
+    return Path(path) if path else get_cache_dir() / "daemon.sock"
+
+
+def _dumps(message: tp.Mapping[str, tp.Any]) -> bytes:
+    # NaN (missing bar values) is kept as is, both ends use python's json
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+class DaemonClient:
+    """Blocking client of a running finvestor daemon.
+
+    Args:
+        path: Optional path to the daemon socket, defaults to `get_socket_path()`
+        timeout: timeout (in seconds) of a request.
+    """
+
+    def __init__(
+        self,
+        path: tp.Union[None, str, Path] = None,
+        *,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ) -> None:
+        self.path = Path(path) if path is not None else get_socket_path()
+        self.timeout = timeout
+
+    def request(
+        self,
+        method: str,
+        *,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        **params: tp.Any,
+    ) -> tp.Any:
+        """Send a request to the daemon and wait for its result.
+
+        Raises:
+            DaemonUnavailable: if the daemon is not running.
+            DaemonError: if the daemon failed to handle the request.
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(connect_timeout)
+            try:
+                sock.connect(str(self.path))
+            except (FileNotFoundError, ConnectionRefusedError, socket.timeout) as e:
+                raise DaemonUnavailable(
+                    f"No finvestor daemon listening on '{self.path}': {e}"
+                ) from e
+            sock.settimeout(self.timeout)
+            sock.sendall(_dumps({"method": method, "params": params}))
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+        finally:
+            sock.close()
+        if not line:
+            raise DaemonError(f"The daemon closed the connection during '{method}'.")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise DaemonError(response.get("error"))
+        return response.get("result")
+
+    def ping(self) -> tp.Dict[str, tp.Any]:
+        return self.request("ping")
+
+    def get_conflicting_settings(self, **settings: tp.Any) -> tp.List[str]:
+        """Compare settings (e.g. `max_concurrency=8`) to the daemon's.
+
+        Settings that are `None` are not compared.
+
+        Returns:
+            descriptions of the settings that differ, empty if none.
+        """
+        daemon_settings = self.ping().get("settings", {})
+        return [
+            f"{name}={daemon_settings.get(name)!r} (requested {value!r})"
+            for name, value in settings.items()
+            if value is not None and daemon_settings.get(name) != value
+        ]
+
+    def get_bars(
+        self, tickers: tp.Union[str, tp.List[str]], **params: tp.Any
+    ) -> tp.Dict[str, tp.Union["Bars", Exception]]:
+        """Get the bars of many tickers, see `iter_yahoo_finance_bars` for params.
+
+        `start` and `end` are sent as unix timestamps (seconds), tickers that
+        failed are mapped to a `DaemonError`.
+        """
+        from finvestor.schemas.bar import Bars
+
+        results = self.request("bars", tickers=tickers, **params)
+        return {
+            ticker: (
+                DaemonError(result["error"])
+                if "error" in result
+                else Bars.from_ohlc(result, interval=result["interval"])
+            )
+            for ticker, result in results.items()
+        }
+
+    def get_assets(self, tickers: tp.List[str]) -> tp.List["Asset"]:
+        from finvestor.schemas.asset import Asset
+
+        return [Asset(**asset) for asset in self.request("assets", tickers=tickers)]
+
+    def get_metrics(self) -> str:
+        """Get the daemon metrics in the prometheus text format."""
+        return self.request("metrics")
+
+    def shutdown(self) -> None:
+        self.request("shutdown")
+
+
+def connect(path: tp.Union[None, str, Path] = None) -> tp.Optional[DaemonClient]:
+    """Get a client of the daemon if it is running, else `None`."""
+    client = DaemonClient(path)
+    if not client.path.exists():
+        return None
+    try:
+        client.ping()
+    except (DaemonUnavailable, DaemonError) as error:
+        logger.debug(f"Finvestor daemon unavailable: {error}")
+        return None
+    return client
+
+
+class FinvestorDaemon:
+    """Local daemon answering finvestor requests on a unix socket.
+
+    The daemon holds a single http client (its connection pool), the asset
+    registry and the bar cache for its whole lifetime, so that repeated CLI
+    invocations reuse warm connections and caches.
+
+    Args:
+        path: Optional path to the socket, defaults to `get_socket_path()`
+        max_concurrency: maximum number of concurrent requests to yahoo-finance.
+        http_cache: whether to cache http responses on disk.
+        metrics: whether to record metrics (see the 'metrics' request).
+        cpu_workers: Optional number of processes decoding and validating
+            responses, defaults to decoding them inline.
+        transport: Optional http transport (e.g. a mock transport).
+    """
+
+    def __init__(
+        self,
+        path: tp.Union[None, str, Path] = None,
+        *,
+        max_concurrency: tp.Optional[int] = None,
+        http_cache: bool = False,
+        metrics: bool = False,
+        cpu_workers: tp.Optional[int] = None,
+        transport: tp.Optional["httpx.AsyncBaseTransport"] = None,
+    ) -> None:
+        self.path = Path(path) if path is not None else get_socket_path()
+        self.max_concurrency = max_concurrency
+        self.http_cache = http_cache
+        self.metrics = metrics
+        self.cpu_workers = cpu_workers
+        self.transport = transport
+        self.started_at = time.time()
+        self.requests = 0
+        self._stop: tp.Optional["asyncio.Event"] = None
+        self._handlers: tp.Dict[str, tp.Callable[..., tp.Awaitable[tp.Any]]] = {
+            "ping": self._handle_ping,
+            "bars": self._handle_bars,
+            "assets": self._handle_assets,
+            "metrics": self._handle_metrics,
+            "shutdown": self._handle_shutdown,
+        }
+
+    async def serve(self) -> None:
+        """Serve requests until a 'shutdown' request (or SIGINT/SIGTERM)."""
+        import asyncio
+        import signal
+
+        from finvestor.utils.executor import ProcessPoolCPUExecutor, set_cpu_executor
+        from finvestor.utils.metrics import MetricsRegistry, set_metrics
+        from finvestor.yahoo_finance.cache import BarCache
+        from finvestor.yahoo_finance.client import create_client
+        from finvestor.yahoo_finance.intervals import get_interval_capabilities
+        from finvestor.yahoo_finance.registry import AssetRegistry
+        from finvestor.yahoo_finance.scheduler import (
+            DEFAULT_MAX_CONCURRENCY,
+            RequestScheduler,
+            set_scheduler,
+        )
+
+        if connect(self.path) is not None:
+            raise RuntimeError(f"A finvestor daemon is already running: '{self.path}'")
+        self.path.unlink(missing_ok=True)
+
+        self.max_concurrency = max_concurrency = (
+            self.max_concurrency or DEFAULT_MAX_CONCURRENCY
+        )
+        set_scheduler(RequestScheduler(max_concurrency=max_concurrency))
+        if self.metrics:
+            set_metrics(MetricsRegistry())
+        executor = (
+            ProcessPoolCPUExecutor(self.cpu_workers) if self.cpu_workers else None
+        )
+        set_cpu_executor(executor)
+        self.bar_cache = BarCache()
+        self.registry = AssetRegistry()
+        # 'auto' intervals of tickers without a known chart use the registry's types
+        capabilities = get_interval_capabilities()
+        capabilities.registry = self.registry
+        self._stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self._stop.set)
+
+        async with create_client(
+            max_connections=max_concurrency,
+            keepalive_expiry=DEFAULT_DAEMON_KEEPALIVE_EXPIRY,
+            cache=self.http_cache,
+            transport=self.transport,
+        ) as self.client:
+            server = await asyncio.start_unix_server(
+                self._handle_connection, path=str(self.path), limit=_MAX_LINE_SIZE
+            )
+            os.chmod(self.path, 0o600)
+            logger.info(f"Finvestor daemon listening on '{self.path}'.")
+            try:
+                async with server:
+                    await self._stop.wait()
+            finally:
+                for sig in (signal.SIGINT, signal.SIGTERM):
+                    loop.remove_signal_handler(sig)
+                self.path.unlink(missing_ok=True)
+                self.bar_cache.close()
+                capabilities.registry = None
+                capabilities.flush()
+                self.registry.close()
+                if executor is not None:
+                    executor.close()
+                logger.info("Finvestor daemon stopped.")
+
+    async def _handle_connection(
+        self, reader: "asyncio.StreamReader", writer: "asyncio.StreamWriter"
+    ) -> None:
+        try:
+            while not self._stop.is_set():  # type: ignore
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(_dumps(await self._handle_line(line)))
+                await writer.drain()
+        except (ConnectionError, ValueError) as error:
+            # ValueError: line longer than the reader limit
+            logger.warning(f"Finvestor daemon connection error: {error}")
+        finally:
+            writer.close()
+
+    async def _handle_line(self, line: bytes) -> tp.Dict[str, tp.Any]:
+        self.requests += 1
+        try:
+            request = json.loads(line)
+            handler = self._handlers.get(request["method"])
+            if handler is None:
+                raise ValueError(f"Unknown method: '{request['method']}'")
+            result = await handler(**request.get("params", {}))
+        except Exception as error:
+            logger.exception(f"Finvestor daemon request failed: {error}")
+            return {"ok": False, "error": f"{error.__class__.__name__}: {error}"}
+        return {"ok": True, "result": result}
+
+    async def _handle_ping(self) -> tp.Dict[str, tp.Any]:
+        return {
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started_at,
+            "requests": self.requests,
+            "settings": {
+                "max_concurrency": self.max_concurrency,
+                "http_cache": self.http_cache,
+                "metrics": self.metrics,
+                "cpu_workers": self.cpu_workers or 0,
+            },
+        }
+
+    async def _handle_bars(
+        self,
+        tickers: tp.Union[str, tp.List[str]],
+        *,
+        cache: bool = False,
+        **params: tp.Any,
+    ) -> tp.Dict[str, tp.Dict[str, tp.Any]]:
+        from finvestor.schemas.bar import BAR_FIELDS
+        from finvestor.yahoo_finance.bars import iter_yahoo_finance_bars
+
+        results = {}
+        async for ticker, bars in iter_yahoo_finance_bars(
+            tickers,
+            client=self.client,
+            cache=self.bar_cache if cache else None,
+            **params,
+        ):
+            if isinstance(bars, Exception):
+                results[ticker] = {"error": f"{bars.__class__.__name__}: {bars}"}
+                continue
+            result = {"interval": bars.interval, "timestamp": bars.timestamp.tolist()}
+            for i, field in enumerate(BAR_FIELDS):
+                result[field] = bars.values[:, i].tolist()
+            results[ticker] = result
+        return results
+
+    async def _handle_assets(self, tickers: tp.List[str]) -> tp.List[tp.Dict]:
+        assets = await self.registry.warm_up(tickers, client=self.client)
+        return [asset.dict() for asset in assets]
+
+    async def _handle_metrics(self) -> str:
+        from finvestor.utils.metrics import MetricsRegistry, get_metrics
+
+        metrics = get_metrics()
+        return metrics.dump_prometheus() if isinstance(metrics, MetricsRegistry) else ""
+
+    async def _handle_shutdown(self) -> None:
+        self._stop.set()  # type: ignore
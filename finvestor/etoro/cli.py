@@ -1,11 +1,8 @@
 import os
 from pathlib import Path
 
-import pandas as pd
 import typer
 
-from finvestor.etoro.parsers import parse_etoro_account_statement
-
 app = typer.Typer(help="Load and process an etoro account statement.")
 
 
@@ -21,17 +18,22 @@ def main(
         writable=False,
         readable=True,
         help="Path to etoro_account_statement.xlsx",
-    )
+    ),
+    cache: bool = typer.Option(
+        True, "--cache/--no-cache", help="Use the parsed statement parquet sidecar."
+    ),
 ):
     """
     Load and process an etoro account statement.
     """
+    # deferred, pandas is slow to import
+    from finvestor.etoro.loader import load_etoro_account_statement
+
     typer.secho(
         f"Loading Etoro account statement '{os.path.basename(filepath)}'...",
         fg=typer.colors.BRIGHT_GREEN,
     )
-    sheets = pd.read_excel(filepath, sheet_name=None)
-    statement = parse_etoro_account_statement(sheets)
+    statement = load_etoro_account_statement(filepath, use_cache=cache)
     typer.secho(
         f"Loaded Etoro account statement of user '{statement.account_summary.name}' "
         f"from '{statement.account_summary.start_date}' "
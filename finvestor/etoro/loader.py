@@ -0,0 +1,155 @@
+import hashlib
+import importlib
+import io
+import json
+import logging
+import typing as tp
+from pathlib import Path
+
+import pandas as pd
+
+from finvestor.etoro.parsers import parse_etoro_account_statement
+from finvestor.etoro.schemas import (
+    EtoroAccountStatement,
+    EtoroAccountSummary,
+    EtoroFinancialSummary,
+)
+from finvestor.etoro.utils import ETORO_DATETIME_FORMAT
+from finvestor.utils.paths import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# only sheets needed by `parse_etoro_account_statement`
+ETORO_STATEMENT_SHEETS = (
+    "Closed Positions",
+    "Account Activity",
+    "Account Summary",
+    "Financial Summary",
+)
+_SIDECAR_FRAMES = ("transactions", "fees", "deposits", "withdrawals")
+_SIDECAR_SUMMARY = "summary.json"
+# part of the sidecar key, bump it when the parsed frames change
+_SIDECAR_VERSION = 1
+
+StatementSource = tp.Union[str, Path, bytes]
+
+
+def read_etoro_account_statement_sheets(
+    source: StatementSource, *, engine: tp.Optional[str] = None
+) -> tp.Dict[str, pd.DataFrame]:
+    """Read only the sheets of an etoro account statement that are parsed.
+
+    Args:
+        source: path to the etoro account statement xlsx, or its content.
+        engine: Optional pandas excel engine, defaults to 'openpyxl'
+
+    Returns:
+        Dict with sheets as pandas dataframe, and sheet names as keys
+    """
+    return pd.read_excel(
+        io.BytesIO(source) if isinstance(source, bytes) else source,
+        sheet_name=list(ETORO_STATEMENT_SHEETS),
+        engine=engine or "openpyxl",
+    )
+
+
+def _read_source(source: StatementSource) -> bytes:
+    return source if isinstance(source, bytes) else Path(source).read_bytes()
+
+
+def _get_sidecar_dir(content: bytes, cache_dir: tp.Optional[Path]) -> Path:
+    digest = hashlib.sha256(content).hexdigest()
+    return (cache_dir or get_cache_dir()) / "etoro" / f"{digest}-v{_SIDECAR_VERSION}"
+
+
+def _has_parquet_engine() -> bool:
+    for name in ("pyarrow", "fastparquet"):
+        try:
+            importlib.import_module(name)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+def _read_sidecar(sidecar_dir: Path) -> tp.Optional[EtoroAccountStatement]:
+    paths = [sidecar_dir / f"{name}.parquet" for name in _SIDECAR_FRAMES]
+    summary_path = sidecar_dir / _SIDECAR_SUMMARY
+    if not summary_path.is_file() or not all(path.is_file() for path in paths):
+        return None
+    summary = json.loads(summary_path.read_text())
+    return EtoroAccountStatement(
+        account_summary=EtoroAccountSummary(**summary["account_summary"]),
+        financial_summary=EtoroFinancialSummary(**summary["financial_summary"]),
+        **{name: pd.read_parquet(path) for name, path in zip(_SIDECAR_FRAMES, paths)},
+    )
+
+
+def _write_sidecar(sidecar_dir: Path, statement: EtoroAccountStatement) -> None:
+    sidecar_dir.mkdir(parents=True, exist_ok=True)
+    for name in _SIDECAR_FRAMES:
+        getattr(statement, name).to_parquet(sidecar_dir / f"{name}.parquet")
+    summary = {
+        "account_summary": statement.account_summary.dict(by_alias=True),
+        "financial_summary": statement.financial_summary.dict(by_alias=True),
+    }
+    # the summary is written last, it marks the sidecar as complete
+    (sidecar_dir / _SIDECAR_SUMMARY).write_text(
+        json.dumps(summary, default=lambda d: d.strftime(ETORO_DATETIME_FORMAT))
+    )
+
+
+def load_etoro_account_statement(
+    source: StatementSource,
+    *,
+    use_cache: bool = True,
+    cache_dir: tp.Optional[Path] = None,
+    engine: tp.Optional[str] = None,
+) -> EtoroAccountStatement:
+    """Load and parse an etoro account statement.
+
+    Parsed statements are stored as a parquet sidecar (keyed by the sha256 of the
+    file content and the version of the parsed frames) in the cache dir, so
+    reloading the same file skips the excel parsing entirely. The sidecar needs a
+    parquet engine (`pip install finvestor[parquet]`), it is skipped with a
+    warning otherwise.
+
+    Args:
+        source: path to the etoro account statement xlsx, or its content.
+        use_cache: whether to read/write the parquet sidecar.
+        cache_dir: Optional cache dir, defaults to `get_cache_dir()`
+        engine: Optional pandas excel engine, defaults to 'openpyxl'
+
+    Returns:
+        EtoroAccountStatement
+    """
+    if use_cache and not _has_parquet_engine():
+        logger.warning(
+            "No parquet engine installed, the etoro statement sidecar is disabled "
+            "(install it with `pip install finvestor[parquet]`)."
+        )
+        use_cache = False
+    if not use_cache:
+        return parse_etoro_account_statement(
+            read_etoro_account_statement_sheets(source, engine=engine)
+        )
+
+    content = _read_source(source)
+    sidecar_dir = _get_sidecar_dir(content, cache_dir)
+    try:
+        statement = _read_sidecar(sidecar_dir)
+    except Exception as error:
+        logger.warning(f"Failed to read etoro sidecar '{sidecar_dir}': {error}")
+        statement = None
+    if statement is not None:
+        logger.debug(f"Loaded etoro account statement from sidecar '{sidecar_dir}'.")
+        return statement
+
+    statement = parse_etoro_account_statement(
+        read_etoro_account_statement_sheets(content, engine=engine)
+    )
+    try:
+        _write_sidecar(sidecar_dir, statement)
+    except Exception as error:
+        logger.warning(f"Failed to write etoro sidecar '{sidecar_dir}': {error}")
+    return statement
@@ -1,5 +1,6 @@
 from typing import Dict, Tuple
 
+import numpy as np
 import pandas as pd
 
 from finvestor.etoro.schemas import (
@@ -7,10 +8,12 @@ from finvestor.etoro.schemas import (
     EtoroAccountSummary,
     EtoroFinancialSummary,
 )
-from finvestor.etoro.utils import ETORO_DATETIME_FORMAT
+from finvestor.etoro.utils import parse_etoro_datetimes
 from finvestor.etoro.yf_mapping import ETORO_TO_YF_TICKER_MAPPING
+from finvestor.utils.metrics import get_metrics, traced
 
 
+@traced("etoro.parse_account_statement")
 def parse_etoro_account_statement(
     etoro_account_statement_sheets: Dict[str, pd.DataFrame],
 ) -> EtoroAccountStatement:
@@ -54,24 +57,29 @@ def parse_etoro_account_statement(
         how="left",
         suffixes=("_open", "_close"),
     )
-    transaction[["ticker", "currency"]] = transaction["details"].str.split(
-        "/", n=1, expand=True
-    )
+    transaction[["ticker", "currency"]] = split_unique(transaction["details"], "/")
     transaction = transaction.drop(columns=["details"], errors="ignore")
     ordered_columns = list(transaction.columns[-2:]) + list(transaction.columns[:-2])
     transaction = transaction[ordered_columns]
     transaction["position_id"] = transaction["position_id"].astype("int64")
-    transaction["open_date"] = pd.to_datetime(
-        transaction["open_date"], format=ETORO_DATETIME_FORMAT, utc=True
-    )
-    transaction["close_date"] = pd.to_datetime(
-        transaction["close_date"], format=ETORO_DATETIME_FORMAT, utc=True
-    )
+    transaction["open_date"] = parse_etoro_datetimes(transaction["open_date"])
+    transaction["close_date"] = parse_etoro_datetimes(transaction["close_date"])
 
     transaction["ticker"] = transaction["ticker"].replace(
         to_replace=ETORO_TO_YF_TICKER_MAPPING
     )
 
+    metrics = get_metrics()
+    if metrics.enabled:
+        frames = {
+            "transactions": transaction,
+            "fees": fees_df,
+            "deposits": deposits_df,
+            "withdrawals": withdrawals_df,
+        }
+        for frame, df in frames.items():
+            metrics.increment("finvestor_etoro_rows_total", len(df), frame=frame)
+
     return EtoroAccountStatement(
         account_summary=parse_account_summary(
             etoro_account_statement_sheets["Account Summary"]
@@ -147,27 +155,39 @@ def pre_process_account_activity_df(
     df = df.drop(columns=["NWA"], errors="ignore")
     df.columns = df.columns.str.lower().str.replace(" ", "_")
 
+    # string columns with few unique values are stored as categoricals
+    df = df.astype({"type": "category", "details": "category"})
+
+    # split all rows by type in a single pass
+    positions_by_type = df.groupby("type", sort=False, observed=True).indices
+
+    def _select(*types: str) -> pd.DataFrame:
+        positions = [positions_by_type[t] for t in types if t in positions_by_type]
+        if not positions:
+            return df.iloc[:0]
+        return df.iloc[np.sort(np.concatenate(positions))]
+
     # extract all gees into a seprate dataframe
-    fees_df = df[(df.type == "Adjustment") | (df.type == "Rollover Fee")]
+    fees_df = _select("Adjustment", "Rollover Fee")
 
-    deposits_df = df[df.type == "Deposit"]
+    deposits_df = _select("Deposit")
     deposits_df = deposits_df.drop(columns=["type", "position_id"], errors="ignore")
 
-    withdrawals_df = df[
-        (df.type == "Withdraw Fee")
-        | (df.type == "Withdraw Request")
-        | (df.type == "Withdraw Fee Cancelled")
-        | (df.type == "Withdraw Request Cancelled")
-    ]
+    withdrawals_df = _select(
+        "Withdraw Fee",
+        "Withdraw Request",
+        "Withdraw Fee Cancelled",
+        "Withdraw Request Cancelled",
+    )
     withdrawals_df = withdrawals_df.drop(
         columns=["details", "position_id"], errors="ignore"
     )
 
-    open_df = df[df.type == "Open Position"]
+    open_df = _select("Open Position")
     open_df = open_df.drop(columns=["type", "realized_equity_change"], errors="ignore")
     open_df = open_df.rename(columns={"amount": "invested", "date": "open_date"})
 
-    closed_df = df[df.type == "Profit/Loss of Trade"]
+    closed_df = _select("Profit/Loss of Trade")
     closed_df = closed_df.drop(columns=["type"], errors="ignore")
     return fees_df, deposits_df, withdrawals_df, open_df, closed_df
 
@@ -193,7 +213,7 @@ def pre_process_closed_positions_df(df: pd.DataFrame) -> pd.DataFrame:
     """
     # split string by first space, to get type of transacation (BUY/SELL) and
     # company name
-    df[["type", "name"]] = df["Action"].str.split(" ", n=1, expand=True)
+    df[["type", "name"]] = split_unique(df["Action"], " ")
 
     # drop unnecessary columns
     df = df.drop(columns=["Copied From", "Type", "Notes", "Action"], errors="ignore")
@@ -211,6 +231,32 @@ def pre_process_closed_positions_df(df: pd.DataFrame) -> pd.DataFrame:
     )
 
     # convert column 'type' to uper case (Buy -> BUY, Sell -> SELL)
-    df["type"] = df["type"].str.upper()
+    df["type"] = df["type"].str.upper().astype("category")
 
     return df
+
+
+def split_unique(series: pd.Series, sep: str) -> pd.DataFrame:
+    """Split a string column once on `sep`, into 2 columns.
+
+    Same as `series.str.split(sep, n=1, expand=True)`, but only the unique values of
+    the column are split, which is much faster for repetitive columns (tickers,
+    actions, ...).
+
+    Args:
+        series: string (or categorical) column to split.
+        sep: separator to split on.
+
+    Returns:
+        pd.DataFrame with 2 columns (0, 1) and the same index as `series`
+    """
+    codes, uniques = pd.factorize(series)
+    parts = (
+        pd.Series(np.asarray(uniques), dtype=object)
+        .str.split(sep, n=1, expand=True)
+        .reindex(columns=range(2))
+        .to_numpy(dtype=object)
+    )
+    # missing values have a code of -1, which picks the appended NaN row
+    parts = np.vstack([parts.reshape(-1, 2), np.full((1, 2), np.nan, dtype=object)])
+    return pd.DataFrame(parts[codes], index=series.index)
@@ -1,7 +1,7 @@
 import asyncio
 import logging
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 import attr
 import pandas as pd
@@ -9,9 +9,14 @@ from anyio import open_file
 from httpx import AsyncClient
 from rich.progress import track
 
-from finvestor.etoro.parsers import parse_etoro_account_statement
+from finvestor.etoro.loader import load_etoro_account_statement
 from finvestor.etoro.schemas import EtoroAccountStatement
 from finvestor.etoro.utils import fill_nan_ticker
+from finvestor.schemas.bar import BarsPanel
+from finvestor.utils.executor import get_cpu_executor
+from finvestor.valuation import PortfolioValuation, TradeEvents
+from finvestor.yahoo_finance.client import create_client
+from finvestor.yahoo_finance.registry import AssetRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +26,25 @@ class EtoroPortfolio:
 
     statement: EtoroAccountStatement = attr.ib(kw_only=True)
     _client: AsyncClient = attr.ib(kw_only=True)
+    _registry: Optional[AssetRegistry] = attr.ib(kw_only=True, default=None)
 
     @classmethod
-    async def load(cls, filepath: str, *, client: AsyncClient) -> "EtoroPortfolio":
+    async def load(
+        cls,
+        filepath: str,
+        *,
+        client: AsyncClient,
+        registry: Optional[AssetRegistry] = None,
+    ) -> "EtoroPortfolio":
         async with await open_file(filepath, "rb") as file:
             contents = await file.read()
-        sheets = pd.read_excel(contents, sheet_name=None)
-        portfolio = cls(statement=parse_etoro_account_statement(sheets), client=client)
+        # the excel parsing runs in the cpu executor, off the event loop
+        statement = await get_cpu_executor().run(load_etoro_account_statement, contents)
+        portfolio = cls(
+            statement=statement,
+            client=client,
+            registry=registry,
+        )
         await portfolio.fill_missing()
         return portfolio
 
@@ -64,8 +81,17 @@ class EtoroPortfolio:
         return list(self.open_positions["ticker"].unique())
 
     async def fill_missing(self) -> None:
+        if self._registry is not None:
+            # fetch all unknown assets in bulk before filling each ticker
+            names = self.transactions.groupby("ticker")["name"].first()
+            await self._registry.warm_up(
+                [ticker for ticker in self.tickers if pd.isna(names.get(ticker))],
+                client=self._client,
+            )
         tasks = [
-            fill_nan_ticker(self.transactions, ticker, client=self._client)
+            fill_nan_ticker(
+                self.transactions, ticker, client=self._client, registry=self._registry
+            )
             for ticker in self.tickers
         ]
         for task in track(
@@ -76,6 +102,13 @@ class EtoroPortfolio:
         ):
             await task
 
+    def valuate(
+        self, panel: BarsPanel, *, initial_cash: float = 0.0
+    ) -> PortfolioValuation:
+        """Value the positions on each bar of `panel` (holding all their tickers)."""
+        events = TradeEvents.from_positions(self.transactions)
+        return PortfolioValuation.compute(events, panel, initial_cash=initial_cash)
+
     def export_yf(self, export_path: str) -> None:
         df = self.open_positions[["ticker", "open_date", "open_rate", "units"]]
         df.open_date = df.open_date.dt.strftime("%Y%m%d")
@@ -101,7 +134,7 @@ if __name__ == "__main__":
 
     async def main():
         filepath = "data/etoro-account-statement-12-1-2019-10-24-2021.xlsx"
-        async with AsyncClient() as client:
+        async with create_client() as client:
             portfolio = await EtoroPortfolio.load(filepath, client=client)
 
         portfolio.export_yf("quotes.csv")
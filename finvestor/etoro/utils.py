@@ -1,5 +1,5 @@
-import asyncio
 import logging
+import typing as tp
 from datetime import datetime
 
 import numpy as np
@@ -7,8 +7,9 @@ import pandas as pd
 import pytz
 from httpx import AsyncClient
 
-from finvestor.data_providers.bars import get_price_at_timestamp
-from finvestor.yahoo_finance.assets import get_asset
+from finvestor.yahoo_finance.prices import get_prices_at_timestamps
+from finvestor.yahoo_finance.registry import AssetRegistry
+from finvestor.yahoo_finance.scrapper import get_asset
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +29,30 @@ def parse_etoro_datetime(etoro_datetime: str) -> datetime:
     return pytz.utc.localize(date)
 
 
+def parse_etoro_datetimes(values: pd.Series) -> pd.Series:
+    """Parse a column of etoro datetimes, to a datetime column with UTC timezone.
+
+    Parsed in bulk with `pd.to_datetime`, each unique value is parsed only once
+    (statements repeat the same dates a lot).
+
+    Args:
+        values: column of etoro datetime strings (missing values are allowed).
+
+    Returns:
+        pd.Series: datetime column with utc timezone
+
+    Raises:
+        ValueError: if a value doesn't match the etoro datetime format.
+    """
+    return pd.to_datetime(values, format=ETORO_DATETIME_FORMAT, utc=True, cache=True)
+
+
 async def fill_nan_ticker(
-    df: pd.DataFrame, ticker: str, *, client: AsyncClient
+    df: pd.DataFrame,
+    ticker: str,
+    *,
+    client: AsyncClient,
+    registry: tp.Optional[AssetRegistry] = None,
 ) -> None:
     # get valid name index if exists
     valid_name_idx = df.loc[df.ticker == ticker, "name"].first_valid_index()
@@ -37,25 +60,22 @@ async def fill_nan_ticker(
     if valid_name_idx is not None:
         name, isin = df.loc[valid_name_idx, ["name", "ISIN"]]
     else:
-        asset = await get_asset(ticker, client=client)
+        if registry is not None:
+            asset = await registry.get_asset(ticker, client=client)
+        else:
+            asset = await get_asset(ticker, client=client)
         name = asset.name
         isin = asset.isin or np.nan
 
     df.loc[df.ticker == ticker, ["name", "ISIN"]] = name, isin
 
-    # get open_rate for non closed positions
-    if df.loc[df.ticker == ticker, "open_rate"].isnull().values.any():
-        _df_to_fill = df.loc[
-            (df.ticker == ticker) & (df.open_rate.isna()), ["open_date", "invested"]
-        ]
-        open_rates = await asyncio.gather(
-            *[
-                get_price_at_timestamp(ticker, client=client, timestamp=open_date)
-                for open_date in _df_to_fill.open_date
-            ]
+    # get open_rate for non closed positions, with a single bars request
+    missing_open_rate = (df.ticker == ticker) & df.open_rate.isna()
+    if missing_open_rate.any():
+        open_rates = await get_prices_at_timestamps(
+            ticker, df.loc[missing_open_rate, "open_date"], client=client
+        )
+        units = df.loc[missing_open_rate, "invested"].to_numpy(np.float64) / open_rates
+        df.loc[missing_open_rate, ["open_rate", "units"]] = np.column_stack(
+            [open_rates, units]
         )
-        units = _df_to_fill.invested / open_rates
-        _fill_data = [(open_rate, unit) for open_rate, unit in zip(open_rates, units)]
-        df.loc[
-            (df.ticker == ticker) & (df.open_rate.isna()), ["open_rate", "units"]
-        ] = _fill_data
@@ -1,10 +1,18 @@
 import asyncio
+import typing as tp
 from datetime import datetime
 
 from httpx import AsyncClient
 
+from finvestor.schemas.actions import CorporateActions, adjust_transactions
+from finvestor.schemas.bar import BarsPanel
 from finvestor.schemas.transaction import Transactions
-from finvestor.yahoo_finance import load_yf_csv_quotes
+from finvestor.valuation import PortfolioValuation, TradeEvents
+from finvestor.yahoo_finance import (
+    AssetRegistry,
+    create_client,
+    load_yf_csv_quotes,
+)
 
 
 class Portfolio:
@@ -17,19 +25,43 @@ class Portfolio:
 
     @classmethod
     async def from_yahoo_finance_csv(
-        cls, filepath: str, *, client: AsyncClient
+        cls,
+        filepath: str,
+        *,
+        client: AsyncClient,
+        registry: tp.Optional[AssetRegistry] = None,
     ) -> "Portfolio":
 
-        transactions = await load_yf_csv_quotes(filepath, client=client)
-        start_date = min(transactions.df["open_date"])
+        transactions = await load_yf_csv_quotes(
+            filepath, client=client, registry=registry
+        )
+        start_date = min((await transactions.load_df())["open_date"])
         name = f"yahoo-finance-{start_date}"
         return cls(transactions, name=name, start_date=start_date)
 
+    def valuate(
+        self,
+        panel: BarsPanel,
+        *,
+        initial_cash: float = 0.0,
+        actions: tp.Optional[tp.Mapping[str, CorporateActions]] = None,
+    ) -> PortfolioValuation:
+        """Value the portfolio on each bar of `panel` (holding all its tickers).
+
+        yahoo-finance bars are split-adjusted, with the `actions` of its tickers
+        the transactions are adjusted for the splits after them.
+        """
+        df = self.transactions.df
+        if actions is not None:
+            df = adjust_transactions(df, actions)
+        events = TradeEvents.from_transactions(df)
+        return PortfolioValuation.compute(events, panel, initial_cash=initial_cash)
+
 
 if __name__ == "__main__":
 
     async def main():
-        async with AsyncClient() as client:
+        async with create_client() as client:
             transactions = await Portfolio.from_yahoo_finance_csv(
                 "data/quotes.csv", client=client
             )
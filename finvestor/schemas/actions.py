@@ -0,0 +1,194 @@
+import typing as tp
+
+import numpy as np
+import pandas as pd
+
+from finvestor.schemas.bar import BAR_FIELDS, Bars
+from finvestor.yahoo_finance.utils import to_unix_seconds
+
+__all__ = ("CorporateActions", "adjust_transactions")
+
+_PRICE_FIELDS = [BAR_FIELDS.index(field) for field in ("open", "high", "low", "close")]
+_VOLUME_FIELD = BAR_FIELDS.index("volume")
+
+
+def _cumulative_factors(
+    event_timestamp: np.ndarray, ratios: np.ndarray, timestamps: np.ndarray
+) -> np.ndarray:
+    """Product of the `ratios` of the events after each timestamp.
+
+    An event at the same timestamp (e.g. the bar of the ex-date) is not applied.
+    """
+    suffix = np.ones(len(ratios) + 1, dtype=np.float64)
+    suffix[:-1] = np.cumprod(ratios[::-1])[::-1]
+    return suffix[np.searchsorted(event_timestamp, timestamps, side="right")]
+
+
+class CorporateActions:
+    """Column-oriented split and dividend events of a ticker, sorted by timestamp.
+
+    Args:
+        split_timestamp: unix timestamps (seconds) of the splits.
+        split_ratio: new shares per old share of each split (2.0 for a '2:1').
+        dividend_timestamp: unix timestamps (seconds) of the ex-dividend dates.
+        dividend_amount: cash amount per share of each dividend.
+    """
+
+    __slots__ = (
+        "split_timestamp",
+        "split_ratio",
+        "dividend_timestamp",
+        "dividend_amount",
+    )
+
+    def __init__(
+        self,
+        split_timestamp: np.ndarray,
+        split_ratio: np.ndarray,
+        dividend_timestamp: np.ndarray,
+        dividend_amount: np.ndarray,
+    ) -> None:
+        self.split_timestamp = np.asarray(split_timestamp, dtype=np.int64)
+        self.split_ratio = np.asarray(split_ratio, dtype=np.float64)
+        self.dividend_timestamp = np.asarray(dividend_timestamp, dtype=np.int64)
+        self.dividend_amount = np.asarray(dividend_amount, dtype=np.float64)
+
+    @classmethod
+    def from_ohlc(cls, ohlc: tp.Mapping[str, np.ndarray]) -> "CorporateActions":
+        """Build actions from the event arrays of a chart, see `get_chart_events`."""
+        return cls(
+            ohlc.get("split_timestamp", ()),
+            ohlc.get("split_ratio", ()),
+            ohlc.get("dividend_timestamp", ()),
+            ohlc.get("dividend_amount", ()),
+        )
+
+    @classmethod
+    def empty(cls) -> "CorporateActions":
+        return cls((), (), (), ())
+
+    @classmethod
+    def concat(cls, actions: tp.Sequence["CorporateActions"]) -> "CorporateActions":
+        """Concatenate actions sorted by timestamp, dropping duplicate events."""
+
+        def _merge(timestamp: np.ndarray, values: np.ndarray) -> tp.Tuple:
+            timestamp, index = np.unique(timestamp, return_index=True)
+            return timestamp, values[index]
+
+        return cls(
+            *_merge(
+                np.concatenate([a.split_timestamp for a in actions] or [()]),
+                np.concatenate([a.split_ratio for a in actions] or [()]),
+            ),
+            *_merge(
+                np.concatenate([a.dividend_timestamp for a in actions] or [()]),
+                np.concatenate([a.dividend_amount for a in actions] or [()]),
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.split_timestamp) + len(self.dividend_timestamp)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(splits={len(self.split_timestamp)}, "
+            f"dividends={len(self.dividend_timestamp)})"
+        )
+
+    def get_split_factors(self, timestamps: np.ndarray) -> np.ndarray:
+        """Cumulative split ratio after each timestamp.
+
+        Quantities held at a timestamp are multiplied, and prices divided, by its
+        factor to be comparable to the latest (split-adjusted) prices.
+        """
+        return _cumulative_factors(
+            self.split_timestamp, self.split_ratio, np.asarray(timestamps)
+        )
+
+    def get_dividend_ratios(self, bars: Bars) -> np.ndarray:
+        """Price ratio of each dividend: 1 - amount / close before the ex-date.
+
+        Dividends without a close before them have a ratio of 1.
+        """
+        valid = ~np.isnan(bars.close)
+        timestamp, close = bars.timestamp[valid], bars.close[valid]
+        previous = np.searchsorted(timestamp, self.dividend_timestamp, "left") - 1
+        ratios = np.ones(len(previous), dtype=np.float64)
+        found = previous >= 0
+        ratios[found] = 1.0 - self.dividend_amount[found] / close[previous[found]]
+        return ratios
+
+    def get_dividend_factors(self, timestamps: np.ndarray, bars: Bars) -> np.ndarray:
+        """Cumulative dividend ratio after each timestamp (total return adjustment).
+
+        Args:
+            timestamps: unix timestamps (seconds).
+            bars: bars the dividend ratios are computed from.
+        """
+        return _cumulative_factors(
+            self.dividend_timestamp,
+            self.get_dividend_ratios(bars),
+            np.asarray(timestamps),
+        )
+
+    def adjust_bars(
+        self, bars: Bars, *, splits: bool = True, dividends: bool = True
+    ) -> Bars:
+        """Adjust whole bar arrays for the splits and/or dividends after each bar.
+
+        yahoo-finance chart prices are already split-adjusted, `splits=False,
+        dividends=True` gives the adjusted close ('adjclose') of yahoo-finance.
+        """
+        price_factors = np.ones(len(bars), dtype=np.float64)
+        values = bars.values.copy()
+        if splits:
+            split_factors = self.get_split_factors(bars.timestamp)
+            price_factors /= split_factors
+            values[:, _VOLUME_FIELD] *= split_factors
+        if dividends:
+            price_factors *= self.get_dividend_factors(bars.timestamp, bars)
+        values[:, _PRICE_FIELDS] *= price_factors[:, None]
+        return Bars(bars.timestamp, values, interval=bars.interval)
+
+
+def adjust_transactions(
+    df: pd.DataFrame,
+    actions: tp.Mapping[str, CorporateActions],
+    *,
+    bars: tp.Optional[tp.Mapping[str, Bars]] = None,
+    ticker_column: str = "asset_ticker",
+    date_column: str = "open_date",
+    quantity_column: str = "quantity",
+    price_columns: tp.Sequence[str] = ("open_rate",),
+) -> pd.DataFrame:
+    """Adjust transaction quantities and prices for the splits after each of them.
+
+    Quantities are multiplied, and prices divided, by the cumulative split ratio
+    after each transaction, so that positions match split-adjusted bars. With
+    `bars`, prices are also adjusted for the dividends (to match 'adjclose').
+    Tickers without actions are left unchanged.
+
+    Returns:
+        an adjusted copy of `df`.
+    """
+    timestamps = to_unix_seconds(df[date_column])
+    tickers = df[ticker_column].to_numpy()
+    split_factors = np.ones(len(df), dtype=np.float64)
+    dividend_factors = np.ones(len(df), dtype=np.float64)
+    for ticker in pd.unique(tickers):
+        ticker_actions = actions.get(ticker)
+        if ticker_actions is None or not len(ticker_actions):
+            continue
+        rows = tickers == ticker
+        split_factors[rows] = ticker_actions.get_split_factors(timestamps[rows])
+        if bars is not None and ticker in bars:
+            dividend_factors[rows] = ticker_actions.get_dividend_factors(
+                timestamps[rows], bars[ticker]
+            )
+    df = df.copy()
+    if quantity_column in df:
+        df[quantity_column] = df[quantity_column].to_numpy() * split_factors
+    for column in price_columns:
+        if column in df:
+            df[column] = df[column].to_numpy() * dividend_factors / split_factors
+    return df
@@ -1,11 +1,22 @@
 import typing as tp
+from collections.abc import Sequence
 from datetime import datetime, timedelta
 
+import numpy as np
+import pandas as pd
 from pydantic import BaseModel
 
-from finvestor.schemas.base import BaseDataFrameModel
+from finvestor.utils.metrics import get_metrics
 
-__all__ = ("Bar", "Bars")
+__all__ = ("Bar", "Bars", "BarsPanel", "BAR_FIELDS")
+
+BAR_FIELDS: tp.Tuple[str, ...] = ("open", "high", "low", "close", "volume")
+
+
+def _get_datetime_index(timestamp: np.ndarray) -> pd.DatetimeIndex:
+    # `pd.to_datetime(unit="s")` fails on read-only (e.g. memory-mapped) arrays,
+    # a datetime64 view doesn't copy nor write to them
+    return pd.DatetimeIndex(timestamp.view("datetime64[s]"), name="timestamp", tz="UTC")
 
 
 class Bar(BaseModel):
@@ -18,12 +29,294 @@ class Bar(BaseModel):
     interval: tp.Union[int, str, timedelta]
 
 
-class Bars(BaseDataFrameModel):
-    __root__: tp.List[Bar]
+class Bars(Sequence):
+    """Column-oriented sequence of bars.
+
+    Bars are stored as a 1-D int64 array of unix timestamps (seconds) and a 2-D
+    float64 array of shape (n, len(BAR_FIELDS)), backed by a C-contiguous
+    (len(BAR_FIELDS), n) buffer so that `.df` can wrap it without copying.
+    Missing values are stored as NaN. `Bar` objects are only built when indexing.
+
+    Args:
+        timestamp: unix timestamps (seconds) of each bar.
+        values: OHLCV values with shape (n, len(BAR_FIELDS)).
+        interval: interval of the bars.
+    """
+
+    __slots__ = ("timestamp", "values", "interval", "_df")
+
+    def __init__(
+        self,
+        timestamp: np.ndarray,
+        values: np.ndarray,
+        *,
+        interval: tp.Union[int, str, timedelta],
+    ) -> None:
+        timestamp = np.asarray(timestamp, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape != (len(timestamp), len(BAR_FIELDS)):
+            raise ValueError(
+                f"Expected values of shape {(len(timestamp), len(BAR_FIELDS))}, "
+                f"got: {values.shape}"
+            )
+        self.timestamp = timestamp
+        self.values = values
+        self.interval = interval
+        self._df: tp.Optional[pd.DataFrame] = None
+
+    @classmethod
+    def from_ohlc(
+        cls,
+        ohlc: tp.Mapping[
+            str, tp.Union[np.ndarray, tp.Sequence[tp.Union[None, float, int]]]
+        ],
+        *,
+        interval: tp.Union[int, str, timedelta],
+    ) -> "Bars":
+        """Build bars from a mapping of columns (as returned by yahoo-finance charts).
+
+        Columns can be numpy arrays or lists, `None` values are converted to NaN in
+        bulk.
+        """
+        metrics = get_metrics()
+        with metrics.timer("finvestor_bars_build_seconds"):
+            timestamp = np.asarray(ohlc["timestamp"], dtype=np.int64)
+            block = np.empty((len(BAR_FIELDS), len(timestamp)), dtype=np.float64)
+            for i, field in enumerate(BAR_FIELDS):
+                block[i] = np.asarray(ohlc[field], dtype=np.float64)
+            bars = cls(timestamp, block.T, interval=interval)
+        if metrics.enabled:
+            metrics.increment("finvestor_bars_rows_total", len(timestamp))
+        return bars
+
+    @classmethod
+    def empty(cls, *, interval: tp.Union[int, str, timedelta]) -> "Bars":
+        return cls(
+            np.empty(0, dtype=np.int64),
+            np.empty((0, len(BAR_FIELDS)), dtype=np.float64),
+            interval=interval,
+        )
+
+    @classmethod
+    def concat(
+        cls,
+        bars: tp.Sequence["Bars"],
+        *,
+        interval: tp.Union[None, int, str, timedelta] = None,
+    ) -> "Bars":
+        """Concatenate bars sorted by timestamp.
+
+        Bars with duplicate timestamps are dropped, keeping the last one.
+        """
+        if interval is None:
+            if not bars:
+                raise ValueError("Can't infer interval of an empty sequence of bars.")
+            interval = bars[0].interval
+        if not bars:
+            return cls.empty(interval=interval)
+        timestamp = np.concatenate([b.timestamp for b in bars])
+        order = np.argsort(timestamp, kind="stable")
+        timestamp = timestamp[order]
+        keep = np.append(timestamp[1:] != timestamp[:-1], True)
+        block = np.concatenate([b.values.T for b in bars], axis=1)
+        block = np.ascontiguousarray(block[:, order[keep]])
+        return cls(timestamp[keep], block.T, interval=interval)
+
+    @classmethod
+    def build(
+        cls,
+        data: tp.Sequence[tp.Union[Bar, tp.Mapping[str, tp.Any]]],
+        *,
+        interval: tp.Union[None, int, str, timedelta] = None,
+    ) -> "Bars":
+        """Build bars from a sequence of `Bar` objects or mappings."""
+        bars = [bar if isinstance(bar, Bar) else Bar(**bar) for bar in data]
+        if interval is None:
+            if not bars:
+                raise ValueError("Can't infer interval of an empty sequence of bars.")
+            interval = bars[0].interval
+        ohlc: tp.Dict[str, tp.List[tp.Any]] = {
+            "timestamp": [int(bar.timestamp.timestamp()) for bar in bars]
+        }
+        for field in BAR_FIELDS:
+            ohlc[field] = [getattr(bar, field) for bar in bars]
+        return cls.from_ohlc(ohlc, interval=interval)
+
+    def __getitem__(self, i):  # type: ignore
+        if isinstance(i, slice):
+            return Bars(self.timestamp[i], self.values[i], interval=self.interval)
+        row = self.values[i]
+        return Bar(
+            timestamp=int(self.timestamp[i]),
+            interval=self.interval,
+            **dict(zip(BAR_FIELDS, row.tolist())),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(interval={self.interval}, len={len(self)})"
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.values[:, 0]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.values[:, 1]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.values[:, 2]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.values[:, 3]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.values[:, 4]
+
+    def dict(self) -> tp.List[tp.Dict[str, tp.Any]]:
+        return [bar.dict() for bar in self]
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Frame of the bars with an 'interval' column, bars without values dropped.
+
+        OHLCV columns wrap `values` without copying when no bar is dropped.
+        """
+        if self._df is None:
+            index = _get_datetime_index(self.timestamp)
+            df = pd.DataFrame(
+                self.values, index=index, columns=list(BAR_FIELDS), copy=False
+            )
+            if np.isnan(self.values).all(axis=1).any():
+                df = df.dropna(how="all")
+            df["interval"] = self.interval
+            self._df = df
+        return self._df
+
+
+class BarsPanel:
+    """Bars of many tickers aligned on a shared timestamp index.
+
+    Values are stored as a 3-D float64 array of shape
+    (n_timestamps, n_tickers, len(BAR_FIELDS)), missing bars are NaN.
+
+    Args:
+        timestamp: sorted unix timestamps (seconds) shared by all tickers.
+        tickers: tickers of the panel.
+        values: OHLCV values of shape (n_timestamps, n_tickers, len(BAR_FIELDS)).
+        interval: interval of the bars.
+    """
+
+    __slots__ = ("timestamp", "tickers", "values", "interval", "_df")
+
+    def __init__(
+        self,
+        timestamp: np.ndarray,
+        tickers: tp.Sequence[str],
+        values: np.ndarray,
+        *,
+        interval: tp.Union[None, int, str, timedelta],
+    ) -> None:
+        expected_shape = (len(timestamp), len(tickers), len(BAR_FIELDS))
+        if values.shape != expected_shape:
+            raise ValueError(
+                f"Expected values of shape {expected_shape}, got: {values.shape}"
+            )
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.tickers = list(tickers)
+        self.values = values
+        self.interval = interval
+        self._df: tp.Optional[pd.DataFrame] = None
+
+    @classmethod
+    def from_ohlc(
+        cls,
+        ohlc: tp.Mapping[str, tp.Mapping[str, np.ndarray]],
+        *,
+        interval: tp.Union[None, int, str, timedelta],
+    ) -> "BarsPanel":
+        """Align the chart arrays (see `Bars.from_ohlc`) of many tickers in a single
+        preallocated array.
+        """
+        timestamp = np.unique(
+            np.concatenate(
+                [np.asarray(o["timestamp"], dtype=np.int64) for o in ohlc.values()]
+                or [np.empty(0, dtype=np.int64)]
+            )
+        )
+        values = np.full(
+            (len(timestamp), len(ohlc), len(BAR_FIELDS)), np.nan, dtype=np.float64
+        )
+        for i, columns in enumerate(ohlc.values()):
+            rows = np.searchsorted(timestamp, columns["timestamp"])
+            for j, field in enumerate(BAR_FIELDS):
+                values[rows, i, j] = columns[field]
+        return cls(timestamp, list(ohlc), values, interval=interval)
+
+    @classmethod
+    def from_bars(cls, bars: tp.Mapping[str, Bars]) -> "BarsPanel":
+        """Align bars of many tickers in a single preallocated array."""
+        intervals = {b.interval for b in bars.values()}
+        if len(intervals) > 1:
+            raise ValueError(
+                f"Can't align bars with different intervals: {intervals}, "
+                "use an explicit interval."
+            )
+        return cls.from_ohlc(
+            {
+                ticker: {
+                    "timestamp": b.timestamp,
+                    **{field: b.values[:, j] for j, field in enumerate(BAR_FIELDS)},
+                }
+                for ticker, b in bars.items()
+            },
+            interval=intervals.pop() if intervals else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(interval={self.interval}, "
+            f"len={len(self)}, tickers={len(self.tickers)})"
+        )
+
+    def __getitem__(self, ticker: str) -> Bars:
+        return Bars(
+            self.timestamp,
+            self.values[:, self.tickers.index(ticker)],
+            interval=self.interval,
+        )
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return _get_datetime_index(self.timestamp)
+
+    def field(self, name: str) -> pd.DataFrame:
+        """Get a (n_timestamps, n_tickers) frame of a single field, e.g. 'close'."""
+        return pd.DataFrame(
+            self.values[:, :, BAR_FIELDS.index(name)],
+            index=self.index,
+            columns=self.tickers,
+            copy=False,
+        )
 
     @property
-    def df(self):
+    def df(self) -> pd.DataFrame:
+        """Frame with (ticker, field) MultiIndex columns, backed by `values`."""
         if self._df is None:
-            super().df
-            self._df = self._df.set_index("timestamp")
+            self._df = pd.DataFrame(
+                self.values.reshape(len(self.timestamp), -1),
+                index=self.index,
+                columns=pd.MultiIndex.from_product(
+                    [self.tickers, BAR_FIELDS], names=["ticker", "field"]
+                ),
+                copy=False,
+            )
         return self._df
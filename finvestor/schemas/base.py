@@ -4,10 +4,17 @@ from collections.abc import Sequence
 import pandas as pd
 from pydantic import BaseModel, Extra, PrivateAttr
 
+from finvestor.utils.executor import get_cpu_executor
+
 T = tp.TypeVar("T", bound="BaseDataFrameModel")
 SequenceOfObjects = tp.Sequence[tp.Union[BaseModel, tp.Mapping]]
 
 
+def _build_df(model: "BaseDataFrameModel") -> pd.DataFrame:
+    df = pd.json_normalize(model.dict(), sep="_", max_level=2)
+    return df.dropna(how="all")
+
+
 class BaseDataFrameModel(BaseModel, Sequence):
     __root__: SequenceOfObjects
     _df: tp.Optional[pd.DataFrame] = PrivateAttr(default=None)
@@ -28,10 +35,14 @@ class BaseDataFrameModel(BaseModel, Sequence):
 
     @property
     def df(self) -> pd.DataFrame:
-        if self._df is not None:
-            return self._df
-        df = pd.json_normalize(self.dict(), sep="_", max_level=2)
-        self._df = df.dropna(how="all")
+        if self._df is None:
+            self._df = _build_df(self)
+        return self._df
+
+    async def load_df(self) -> pd.DataFrame:
+        """Same as `.df`, but built by the cpu executor (e.g. in a worker process)."""
+        if self._df is None:
+            self._df = await get_cpu_executor().run(_build_df, self)
         return self._df
 
     class Config:
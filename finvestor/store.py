@@ -0,0 +1,226 @@
+import logging
+import os
+import re
+import typing as tp
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from finvestor.schemas.bar import BAR_FIELDS, Bars, BarsPanel
+from finvestor.utils.paths import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# a partition is a month of bars of a ticker, stored as a single .npy file
+_PARTITION_SUFFIX = ".npy"
+_PARTITION_NAME = re.compile(r"\d{4}-\d{2}\.npy")
+
+Interval = tp.Union[int, str]
+TickersFilter = tp.Union[None, str, tp.Iterable[str], tp.Callable[[str], bool]]
+
+
+def _get_month(timestamp: np.ndarray) -> np.ndarray:
+    return timestamp.astype("datetime64[s]").astype("datetime64[M]")
+
+
+def _get_month_range(month: str) -> tp.Tuple[int, int]:
+    """Get the (start, end) unix timestamps of a 'YYYY-MM' month."""
+    start = np.datetime64(month, "M")
+    return (
+        int(start.astype("datetime64[s]").astype(np.int64)),
+        int((start + 1).astype("datetime64[s]").astype(np.int64)),
+    )
+
+
+class BarStore:
+    """On-disk store of large bar histories, read through memory-maps.
+
+    Bars are partitioned by interval, ticker and month:
+    '<path>/<interval>/<ticker>/<YYYY-MM>.npy'. A partition is a single
+    (1 + len(BAR_FIELDS), n) int64 block: the timestamps, then the float64 values
+    stored bit for bit (the layout of `Bars`), so that it is replaced in one
+    atomic rename and readers never see timestamps and values of different
+    writes. Reads only open the partitions of the requested tickers and time
+    range, memory-map them and slice them with a binary search, so a single
+    partition slice is returned without copying, and only the pages it covers
+    are read from disk.
+
+    Args:
+        path: Optional path to the store directory, defaults to
+            '<cache_dir>/bars'
+    """
+
+    def __init__(self, path: tp.Union[None, str, Path] = None) -> None:
+        self.path = Path(path) if path is not None else get_cache_dir() / "bars"
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path='{self.path}')"
+
+    def _get_ticker_dir(self, ticker: str, interval: Interval) -> Path:
+        # tickers can contain characters such as '^', '=' or '/'
+        return self.path / str(interval) / quote(ticker, safe="=^-.")
+
+    def intervals(self) -> tp.List[str]:
+        if not self.path.exists():
+            return []
+        return sorted(p.name for p in self.path.iterdir() if p.is_dir())
+
+    def tickers(self, interval: Interval) -> tp.List[str]:
+        interval_dir = self.path / str(interval)
+        if not interval_dir.exists():
+            return []
+        return sorted(unquote(p.name) for p in interval_dir.iterdir() if p.is_dir())
+
+    def partitions(self, ticker: str, interval: Interval) -> tp.List[str]:
+        """Get the months ('YYYY-MM') stored for a ticker, sorted.
+
+        Raises:
+            ValueError: if the ticker directory has `.npy` files that are not
+                partitions (e.g. written with another layout).
+        """
+        ticker_dir = self._get_ticker_dir(ticker, interval)
+        if not ticker_dir.exists():
+            return []
+        months = []
+        for path in ticker_dir.iterdir():
+            if _PARTITION_NAME.fullmatch(path.name):
+                months.append(path.name[: -len(_PARTITION_SUFFIX)])
+            elif path.suffix == _PARTITION_SUFFIX:
+                raise ValueError(
+                    f"Unknown partition file '{path}' in the bar store, remove it "
+                    "and write the bars of the ticker again."
+                )
+        return sorted(months)
+
+    def _read_partition(self, ticker_dir: Path, month: str, interval: Interval) -> Bars:
+        block = np.load(ticker_dir / f"{month}{_PARTITION_SUFFIX}", mmap_mode="r")
+        # both are views of the memory-map, values are float64 bit patterns
+        return Bars(block[0], block[1:].view(np.float64).T, interval=interval)
+
+    def _write_partition(self, ticker_dir: Path, month: str, bars: Bars) -> None:
+        block = np.empty((1 + len(BAR_FIELDS), len(bars)), dtype=np.int64)
+        block[0] = bars.timestamp
+        block[1:].view(np.float64)[:] = bars.values.T
+        # written to a temporary file then renamed, readers keep their memory-maps
+        path = ticker_dir / f"{month}{_PARTITION_SUFFIX}"
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as file:
+            np.save(file, block)
+        os.replace(tmp_path, path)
+
+    def write(self, ticker: str, bars: Bars) -> None:
+        """Insert (or replace) the bars of a ticker, merged with the stored ones."""
+        if not len(bars):
+            return
+        if not isinstance(bars.interval, (int, str)):
+            raise ValueError(f"Can't store bars with interval: {bars.interval!r}")
+        bars = Bars.concat([bars])
+        ticker_dir = self._get_ticker_dir(ticker, bars.interval)
+        ticker_dir.mkdir(parents=True, exist_ok=True)
+        stored = set(self.partitions(ticker, bars.interval))
+
+        months = _get_month(bars.timestamp)
+        bounds = np.flatnonzero(months[1:] != months[:-1]) + 1
+        for start, end in zip([0, *bounds.tolist()], [*bounds.tolist(), len(bars)]):
+            month = str(months[start])
+            partition = bars[start:end]
+            if month in stored:
+                existing = self._read_partition(ticker_dir, month, bars.interval)
+                partition = Bars.concat([existing, partition], interval=bars.interval)
+            self._write_partition(ticker_dir, month, partition)
+        logger.debug(
+            f"[BarStore] (ticker='{ticker}', interval='{bars.interval}') wrote "
+            f"{len(bars)} bars in {len(bounds) + 1} partition(s)."
+        )
+
+    def write_many(self, bars: tp.Mapping[str, Bars]) -> None:
+        for ticker, ticker_bars in bars.items():
+            self.write(ticker, ticker_bars)
+
+    def read(
+        self,
+        ticker: str,
+        interval: Interval,
+        *,
+        start: tp.Optional[int] = None,
+        end: tp.Optional[int] = None,
+    ) -> Bars:
+        """Read the bars of a ticker with `start <= timestamp < end`.
+
+        Only the partitions overlapping the range are opened. When the range is in
+        a single partition, the returned bars are read-only views of its
+        memory-map.
+        """
+        ticker_dir = self._get_ticker_dir(ticker, interval)
+        slices = []
+        for month in self.partitions(ticker, interval):
+            month_start, month_end = _get_month_range(month)
+            if (start is not None and month_end <= start) or (
+                end is not None and month_start >= end
+            ):
+                continue
+            partition = self._read_partition(ticker_dir, month, interval)
+            lo = 0 if start is None else np.searchsorted(partition.timestamp, start)
+            hi = (
+                len(partition)
+                if end is None
+                else np.searchsorted(partition.timestamp, end)
+            )
+            if hi > lo:
+                slices.append(partition[lo:hi])
+        if not slices:
+            return Bars.empty(interval=interval)
+        if len(slices) == 1:
+            return slices[0]
+        # partitions are sorted and disjoint, concatenated without re-sorting
+        return Bars(
+            np.concatenate([b.timestamp for b in slices]),
+            np.concatenate([b.values.T for b in slices], axis=1).T,
+            interval=interval,
+        )
+
+    def scan(
+        self,
+        interval: Interval,
+        *,
+        tickers: TickersFilter = None,
+        start: tp.Optional[int] = None,
+        end: tp.Optional[int] = None,
+    ) -> tp.Iterator[tp.Tuple[str, Bars]]:
+        """Iterate over the stored bars of many tickers, one ticker at a time.
+
+        Args:
+            interval: interval of the bars.
+            tickers: Optional tickers to read (list, comma separated string, or
+                predicate on the ticker), defaults to all stored tickers.
+            start: Optional first unix timestamp (included).
+            end: Optional last unix timestamp (excluded).
+        """
+        if tickers is None or callable(tickers):
+            selected = [
+                t
+                for t in self.tickers(interval)
+                if tickers is None or tickers(t)  # type: ignore
+            ]
+        elif isinstance(tickers, str):
+            selected = [t.strip() for t in tickers.split(",") if t.strip()]
+        else:
+            selected = list(tickers)
+        for ticker in selected:
+            bars = self.read(ticker, interval, start=start, end=end)
+            if len(bars):
+                yield ticker, bars
+
+    def read_panel(
+        self,
+        interval: Interval,
+        *,
+        tickers: TickersFilter = None,
+        start: tp.Optional[int] = None,
+        end: tp.Optional[int] = None,
+    ) -> BarsPanel:
+        """Read the bars of many tickers, aligned in a panel (see `scan`)."""
+        return BarsPanel.from_bars(
+            dict(self.scan(interval, tickers=tickers, start=start, end=end))
+        )
@@ -0,0 +1,190 @@
+import functools
+import multiprocessing
+import os
+import typing as tp
+
+from finvestor.utils.metrics import MetricsRecorder, get_metrics, set_metrics
+
+if tp.TYPE_CHECKING:  # pragma: no cover
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+T = tp.TypeVar("T")
+
+# sending a payload to a worker process costs more than decoding it below this size
+DEFAULT_MIN_OFFLOAD_SIZE = 2**16
+
+
+def _run_recorded(
+    func: tp.Callable[..., T], args: tp.Tuple, kwargs: tp.Dict[str, tp.Any]
+) -> tp.Tuple[T, MetricsRecorder]:
+    """Run `func` in a worker process, recording the measurements of its hooks."""
+    recorder = MetricsRecorder()
+    set_metrics(recorder)
+    try:
+        return func(*args, **kwargs), recorder
+    finally:
+        set_metrics(None)
+
+
+class CPUExecutor:
+    """Runs CPU-bound stages (decoding, validation, parsing) inline.
+
+    The default executor: functions run on the calling (event loop) thread. See
+    `ProcessPoolCPUExecutor` to run them on other cores.
+    """
+
+    backend = "inline"
+    max_workers = 1
+
+    async def run(
+        self,
+        func: tp.Callable[..., T],
+        *args: tp.Any,
+        size: tp.Optional[int] = None,
+        **kwargs: tp.Any,
+    ) -> T:
+        """Run `func(*args, **kwargs)` and wait for its result.
+
+        Args:
+            func: picklable (module level) function.
+            size: Optional size (e.g. bytes) of the input, small inputs can be
+                processed inline by offloading executors.
+        """
+        with get_metrics().timer(
+            "finvestor_cpu_task_seconds", task=func.__name__, backend="inline"
+        ):
+            return func(*args, **kwargs)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "CPUExecutor":
+        return self
+
+    def __exit__(self, *exc_info: tp.Any) -> None:
+        self.close()
+
+
+class ProcessPoolCPUExecutor(CPUExecutor):
+    """Runs CPU-bound stages in a pool of worker processes.
+
+    At most `max_pending` tasks are submitted to the pool at the same time, other
+    callers wait for a free place (a bounded queue), so that large batches don't
+    pile up pickled inputs in memory. Inputs smaller than `min_offload_size`
+    are processed inline. Functions, arguments and results must be picklable.
+
+    Args:
+        max_workers: Optional number of worker processes, defaults to the number
+            of cores.
+        max_pending: Optional maximum number of submitted tasks, defaults to
+            twice the number of workers.
+        min_offload_size: inputs with a smaller `size` are processed inline.
+        mp_context: Optional multiprocessing start method, defaults to
+            'forkserver' when available ('spawn' otherwise), since forking a
+            process running an event loop (and threads) is unsafe.
+    """
+
+    backend = "process"
+
+    def __init__(
+        self,
+        max_workers: tp.Optional[int] = None,
+        *,
+        max_pending: tp.Optional[int] = None,
+        min_offload_size: int = DEFAULT_MIN_OFFLOAD_SIZE,
+        mp_context: tp.Optional[str] = None,
+    ) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        if self.max_workers < 1:
+            raise ValueError(f"Invalid max_workers: {max_workers}")
+        self.max_pending = max_pending or 2 * self.max_workers
+        self.min_offload_size = min_offload_size
+        if mp_context is None:
+            methods = multiprocessing.get_all_start_methods()
+            mp_context = "forkserver" if "forkserver" in methods else "spawn"
+        self.mp_context = mp_context
+        self._pool: tp.Optional["ProcessPoolExecutor"] = None
+        self._pending: tp.Dict["asyncio.AbstractEventLoop", "asyncio.Semaphore"] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(max_workers={self.max_workers}, "
+            f"max_pending={self.max_pending})"
+        )
+
+    @property
+    def pool(self) -> "ProcessPoolExecutor":
+        # workers are started on the first offloaded task
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._pool = ProcessPoolExecutor(
+                self.max_workers,
+                mp_context=multiprocessing.get_context(self.mp_context),
+            )
+        return self._pool
+
+    def _get_pending(self) -> "asyncio.Semaphore":
+        import asyncio
+
+        # semaphores are bound to the event loop they are used in
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(loop)
+        if pending is None:
+            self._pending = {loop: asyncio.Semaphore(self.max_pending)}
+            pending = self._pending[loop]
+        return pending
+
+    async def run(
+        self,
+        func: tp.Callable[..., T],
+        *args: tp.Any,
+        size: tp.Optional[int] = None,
+        **kwargs: tp.Any,
+    ) -> T:
+        import asyncio
+
+        if size is not None and size < self.min_offload_size:
+            return await super().run(func, *args, **kwargs)
+        metrics = get_metrics()
+        pending = self._get_pending()
+        with metrics.timer("finvestor_cpu_queue_seconds", task=func.__name__):
+            await pending.acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            with metrics.timer(
+                "finvestor_cpu_task_seconds", task=func.__name__, backend="process"
+            ):
+                if not metrics.enabled:
+                    return await loop.run_in_executor(
+                        self.pool, functools.partial(func, *args, **kwargs)
+                    )
+                # the metrics of the worker process are sent back with the result
+                result, recorder = await loop.run_in_executor(
+                    self.pool, functools.partial(_run_recorded, func, args, kwargs)
+                )
+            recorder.replay(metrics)
+            return result
+        finally:
+            pending.release()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+_INLINE_EXECUTOR = CPUExecutor()
+_executor: CPUExecutor = _INLINE_EXECUTOR
+
+
+def get_cpu_executor() -> CPUExecutor:
+    """Get the shared executor of CPU-bound stages (inline by default)."""
+    return _executor
+
+
+def set_cpu_executor(executor: tp.Optional[CPUExecutor]) -> None:
+    """Replace the shared executor of CPU-bound stages, `None` to run them inline."""
+    global _executor
+    _executor = executor if executor is not None else _INLINE_EXECUTOR
@@ -0,0 +1,317 @@
+import bisect
+import functools
+import inspect
+import threading
+import time
+import typing as tp
+from contextlib import contextmanager
+
+F = tp.TypeVar("F", bound=tp.Callable[..., tp.Any])
+Labels = tp.Tuple[tp.Tuple[str, str], ...]
+
+# prometheus client default buckets, in seconds
+DEFAULT_BUCKETS: tp.Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    7.5,
+    10.0,
+)
+
+
+class _NullContext:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: tp.Any) -> None:
+        return None
+
+
+_NULL_CONTEXT = _NullContext()
+
+
+class MetricsSink:
+    """Metrics sink that drops everything, used by default.
+
+    Hooks check `enabled` (or get a shared no-op context manager), so that
+    instrumentation costs nearly nothing when metrics are disabled.
+    """
+
+    enabled = False
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Increment a counter."""
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Observe a value (e.g. a duration in seconds) in a histogram."""
+
+    def timer(self, name: str, **labels: str) -> tp.ContextManager[None]:
+        """Observe the duration of a block (in seconds) in a histogram."""
+        return _NULL_CONTEXT
+
+    def span(self, name: str, **attributes: tp.Any) -> tp.ContextManager[None]:
+        """Trace a block as a span, attributes may have a high cardinality."""
+        return _NULL_CONTEXT
+
+
+class _Timer:
+    __slots__ = ("sink", "name", "labels", "start")
+
+    def __init__(self, sink: MetricsSink, name: str, labels: tp.Dict[str, str]):
+        self.sink = sink
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: tp.Any) -> None:
+        self.sink.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, n_buckets: int) -> None:
+        self.counts = [0] * n_buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+def _format_labels(labels: Labels, **extra: str) -> str:
+    items = (*labels, *extra.items())
+    if not items:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in items
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+class MetricsRegistry(MetricsSink):
+    """In-process registry of counters and histograms.
+
+    Spans are recorded as the 'finvestor_span_seconds' histogram (their
+    attributes are dropped, to keep a low labels cardinality).
+
+    Args:
+        buckets: upper bounds of the histograms buckets.
+    """
+
+    enabled = True
+
+    def __init__(self, buckets: tp.Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._counters: tp.Dict[str, tp.Dict[Labels, float]] = {}
+        self._histograms: tp.Dict[str, tp.Dict[Labels, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counter = self._counters.setdefault(name, {})
+            counter[key] = counter.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            histograms = self._histograms.setdefault(name, {})
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = _Histogram(len(self.buckets))
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                histogram.counts[index] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    def timer(self, name: str, **labels: str) -> tp.ContextManager[None]:
+        return _Timer(self, name, labels)
+
+    def span(self, name: str, **attributes: tp.Any) -> tp.ContextManager[None]:
+        return _Timer(self, "finvestor_span_seconds", {"span": name})
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Get the value of a counter."""
+        return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0.0)
+
+    def histogram(self, name: str, **labels: str) -> tp.Tuple[int, float]:
+        """Get the (count, sum) of a histogram."""
+        histogram = self._histograms.get(name, {}).get(tuple(sorted(labels.items())))
+        return (0, 0.0) if histogram is None else (histogram.count, histogram.sum)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def dump_prometheus(self) -> str:
+        """Dump all metrics in the prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, counter in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                lines.extend(
+                    f"{name}{_format_labels(labels)} {value}"
+                    for labels, value in sorted(counter.items())
+                )
+            for name, histograms in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(histograms.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            f"{name}_bucket{_format_labels(labels, le=str(bound))} "
+                            f"{cumulative}"
+                        )
+                    lines.append(
+                        f"{name}_bucket{_format_labels(labels, le='+Inf')} "
+                        f"{histogram.count}"
+                    )
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(
+                        f"{name}_count{_format_labels(labels)} {histogram.count}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+class MetricsRecorder(MetricsSink):
+    """Records measurements, to replay them in another sink.
+
+    Used to send the measurements of a worker process back to the sink of the
+    parent process (see `ProcessPoolCPUExecutor`). Spans are recorded as the
+    'finvestor_span_seconds' histogram, like in `MetricsRegistry`.
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        # (method, name, value, labels)
+        self.records: tp.List[tp.Tuple[str, str, float, tp.Dict[str, str]]] = []
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        self.records.append(("increment", name, value, labels))
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        self.records.append(("observe", name, value, labels))
+
+    def timer(self, name: str, **labels: str) -> tp.ContextManager[None]:
+        return _Timer(self, name, labels)
+
+    def span(self, name: str, **attributes: tp.Any) -> tp.ContextManager[None]:
+        return _Timer(self, "finvestor_span_seconds", {"span": name})
+
+    def replay(self, sink: MetricsSink) -> None:
+        """Record the measurements in `sink`."""
+        for method, name, value, labels in self.records:
+            getattr(sink, method)(name, value, **labels)
+
+
+class OpenTelemetrySink(MetricsSink):
+    """Trace spans with OpenTelemetry, counters and histograms go to `sink`.
+
+    Requires the optional `opentelemetry-api` package.
+
+    Args:
+        sink: Optional sink of counters and histograms, defaults to a new
+            `MetricsRegistry`.
+        tracer_name: name of the OpenTelemetry tracer.
+    """
+
+    enabled = True
+
+    def __init__(
+        self, sink: tp.Optional[MetricsSink] = None, tracer_name: str = "finvestor"
+    ) -> None:
+        try:
+            from opentelemetry import trace
+        except ImportError as error:
+            raise ImportError(
+                "OpenTelemetry spans require 'opentelemetry-api', install it with: "
+                "pip install opentelemetry-api"
+            ) from error
+        self.sink = sink if sink is not None else MetricsRegistry()
+        self.tracer = trace.get_tracer(tracer_name)
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        self.sink.increment(name, value, **labels)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        self.sink.observe(name, value, **labels)
+
+    def timer(self, name: str, **labels: str) -> tp.ContextManager[None]:
+        return self.sink.timer(name, **labels)
+
+    @contextmanager
+    def span(self, name: str, **attributes: tp.Any) -> tp.Iterator[None]:
+        with self.tracer.start_as_current_span(name, attributes=attributes):
+            with self.sink.span(name):
+                yield
+
+
+_metrics: MetricsSink = MetricsSink()
+
+
+def get_metrics() -> MetricsSink:
+    """Get the metrics sink used by all finvestor hooks (a no-op by default)."""
+    return _metrics
+
+
+def set_metrics(sink: tp.Optional[MetricsSink]) -> None:
+    """Replace the metrics sink used by all finvestor hooks, `None` disables it."""
+    global _metrics
+    _metrics = sink if sink is not None else MetricsSink()
+
+
+def traced(
+    name: str,
+    *,
+    attributes: tp.Optional[tp.Callable[..., tp.Dict[str, tp.Any]]] = None,
+) -> tp.Callable[[F], F]:
+    """Decorator tracing each call of a (sync or async) function as a span.
+
+    Args:
+        name: name of the span.
+        attributes: Optional callable, called with the arguments of the function,
+            returning the attributes of the span.
+    """
+
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: tp.Any, **kwargs: tp.Any) -> tp.Any:
+                metrics = _metrics
+                if not metrics.enabled:
+                    return await func(*args, **kwargs)
+                attrs = attributes(*args, **kwargs) if attributes is not None else {}
+                with metrics.span(name, **attrs):
+                    return await func(*args, **kwargs)
+
+            return tp.cast(F, async_wrapper)
+
+        @functools.wraps(func)
+        def wrapper(*args: tp.Any, **kwargs: tp.Any) -> tp.Any:
+            metrics = _metrics
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            attrs = attributes(*args, **kwargs) if attributes is not None else {}
+            with metrics.span(name, **attrs):
+                return func(*args, **kwargs)
+
+        return tp.cast(F, wrapper)
+
+    return decorator
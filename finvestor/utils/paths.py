@@ -0,0 +1,14 @@
+import os
+from pathlib import Path
+
+
+def get_cache_dir() -> Path:
+    """Get (and create) the finvestor cache directory.
+
+    Defaults to '~/.cache/finvestor', can be overridden using the env variable
+    'FINVESTOR_CACHE_DIR'.
+    """
+    cache_dir = os.getenv("FINVESTOR_CACHE_DIR")
+    path = Path(cache_dir) if cache_dir else Path.home() / ".cache" / "finvestor"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
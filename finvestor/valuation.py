@@ -0,0 +1,286 @@
+import typing as tp
+
+import numpy as np
+import pandas as pd
+
+from finvestor.schemas.bar import BAR_FIELDS, BarsPanel
+from finvestor.yahoo_finance.utils import to_unix_seconds
+
+VALUATION_FIELDS: tp.Tuple[str, ...] = (
+    "quantity",
+    "market_value",
+    "cost_basis",
+    "realized_pnl",
+    "unrealized_pnl",
+    "cash",
+)
+
+
+class TradeEvents:
+    """Columnar trade events (one row per buy/sell), sorted by ticker and time.
+
+    Args:
+        ticker: ticker of each event.
+        timestamp: unix timestamp (seconds) of each event.
+        quantity: signed quantity of each event, positive to buy, negative to sell.
+        price: price of each event.
+        commission: Optional commission of each event.
+    """
+
+    __slots__ = ("ticker", "timestamp", "quantity", "price", "commission")
+
+    def __init__(
+        self,
+        ticker: tp.Sequence[str],
+        timestamp: np.ndarray,
+        quantity: np.ndarray,
+        price: np.ndarray,
+        commission: tp.Optional[np.ndarray] = None,
+    ) -> None:
+        ticker = np.asarray(ticker, dtype=object)
+        timestamp = np.asarray(timestamp, dtype=np.int64)
+        quantity = np.asarray(quantity, dtype=np.float64)
+        price = np.asarray(price, dtype=np.float64)
+        if commission is None:
+            commission = np.zeros(len(timestamp))
+        commission = np.nan_to_num(np.asarray(commission, dtype=np.float64))
+        order = np.lexsort((timestamp, ticker))
+        self.ticker = ticker[order]
+        self.timestamp = timestamp[order]
+        self.quantity = quantity[order]
+        self.price = price[order]
+        self.commission = commission[order]
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(len={len(self)})"
+
+    @classmethod
+    def from_transactions(cls, df: pd.DataFrame) -> "TradeEvents":
+        """Build events from a `Transactions.df` frame (one row per BUY/SELL)."""
+        sign = np.where(df["type"].to_numpy() == "SELL", -1.0, 1.0)
+        return cls(
+            df["asset_ticker"].to_numpy(),
+            to_unix_seconds(df["open_date"]),
+            sign * df["quantity"].to_numpy(dtype=np.float64),
+            df["open_rate"].to_numpy(dtype=np.float64),
+            df["commission"].to_numpy(dtype=np.float64),
+        )
+
+    @classmethod
+    def from_positions(cls, df: pd.DataFrame) -> "TradeEvents":
+        """Build events from a frame of positions (e.g. etoro transactions).
+
+        Each position opens `units` at `open_rate` on `open_date` (short if its
+        `type` is 'SELL'), and closes them at `close_rate` on `close_date` when
+        it is closed. Open positions have no `open_rate` in etoro statements, it
+        defaults to `invested / units`.
+        """
+        sign = np.where(df["type"].astype(object).to_numpy() == "SELL", -1.0, 1.0)
+        units = sign * df["units"].to_numpy(dtype=np.float64)
+        closed = df["close_date"].notna().to_numpy()
+        ticker = df["ticker"].to_numpy(dtype=object)
+        open_rate = df["open_rate"].fillna(df["invested"] / df["units"])
+        return cls(
+            np.concatenate([ticker, ticker[closed]]),
+            np.concatenate(
+                [
+                    to_unix_seconds(df["open_date"]),
+                    to_unix_seconds(df["close_date"][closed]),
+                ]
+            ),
+            np.concatenate([units, -units[closed]]),
+            np.concatenate(
+                [
+                    open_rate.to_numpy(dtype=np.float64),
+                    df["close_rate"].to_numpy(dtype=np.float64)[closed],
+                ]
+            ),
+        )
+
+
+def get_average_cost(
+    events: TradeEvents,
+) -> tp.Tuple[np.ndarray, np.ndarray]:
+    """Realized P&L and remaining cost of each event, with the average cost method.
+
+    Sells (or buys covering a short) realize `quantity * (price - average cost)`
+    and leave the average cost unchanged, buys increasing the position update the
+    average cost. The average cost only depends on the previous event of the same
+    ticker, this recurrence is run over the events of each ticker, restarting at
+    each new ticker.
+
+    Returns:
+        (realized P&L of each event, signed cost basis after each event)
+    """
+    n = len(events)
+    realized = np.zeros(n)
+    cost = np.zeros(n)
+    tickers = events.ticker
+    new_ticker = np.ones(n, dtype=bool)
+    new_ticker[1:] = tickers[1:] != tickers[:-1]
+
+    position = position_cost = 0.0
+    for i, (is_new, quantity, price) in enumerate(
+        zip(new_ticker.tolist(), events.quantity.tolist(), events.price.tolist())
+    ):
+        if is_new:
+            position = position_cost = 0.0
+        if position == 0 or (position > 0) == (quantity > 0):
+            position_cost += quantity * price
+            position += quantity
+        else:
+            average = position_cost / position
+            closed = -quantity if abs(quantity) <= abs(position) else position
+            realized[i] = closed * (price - average)
+            position_cost -= closed * average
+            position -= closed
+            remaining = quantity + closed
+            if remaining:
+                # crossed zero: the remaining quantity opens a new position
+                position_cost = remaining * price
+                position = remaining
+            if abs(position) < 1e-12:
+                position = position_cost = 0.0
+        cost[i] = position_cost
+    return realized - events.commission, cost
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    """Forward fill NaN values of a (n_timestamps, n_tickers) array, column-wise."""
+    index = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(index, axis=0, out=index)
+    return np.take_along_axis(values, index, axis=0)
+
+
+class PortfolioValuation:
+    """Valuation of a portfolio on each timestamp of a bar panel.
+
+    Every field is a (n_timestamps, n_tickers) float64 array:
+        quantity: held quantity (negative if short).
+        market_value: quantity valued at the (forward filled) close price.
+        cost_basis: signed cost of the held quantity, at average cost.
+        realized_pnl: cumulative realized P&L, net of commissions.
+        unrealized_pnl: market_value - cost_basis.
+        cash: cumulative cash flows of the trades (negative when buying).
+
+    Args:
+        timestamp: unix timestamps (seconds) of the valuations.
+        tickers: tickers of the portfolio.
+        initial_cash: cash held before the first trade.
+    """
+
+    def __init__(
+        self,
+        timestamp: np.ndarray,
+        tickers: tp.Sequence[str],
+        *,
+        initial_cash: float = 0.0,
+        **fields: np.ndarray,
+    ) -> None:
+        self.timestamp = timestamp
+        self.tickers = list(tickers)
+        self.initial_cash = initial_cash
+        for name in VALUATION_FIELDS:
+            setattr(self, name, fields[name])
+
+    quantity: np.ndarray
+    market_value: np.ndarray
+    cost_basis: np.ndarray
+    realized_pnl: np.ndarray
+    unrealized_pnl: np.ndarray
+    cash: np.ndarray
+
+    @classmethod
+    def compute(
+        cls,
+        events: TradeEvents,
+        panel: BarsPanel,
+        *,
+        initial_cash: float = 0.0,
+    ) -> "PortfolioValuation":
+        """Value trade events on each bar of `panel`.
+
+        An event is applied from the bar containing it (events before the first
+        bar are applied on the first bar), positions are valued at the bar close.
+
+        Raises:
+            ValueError: if tickers of the events are missing from the panel.
+        """
+        columns = pd.Index(panel.tickers).get_indexer(events.ticker)
+        if (columns < 0).any():
+            missing = sorted(set(events.ticker[columns < 0]))
+            raise ValueError(f"Missing bars of tickers: {missing}")
+        rows = np.searchsorted(panel.timestamp, events.timestamp, side="right") - 1
+        rows = np.clip(rows, 0, None)
+        realized, cost = get_average_cost(events)
+
+        # change of cost basis at each event, relative to the previous event of
+        # the same ticker (the first event of a ticker starts from 0)
+        cost_delta = np.diff(cost, prepend=0.0)
+        new_ticker = np.ones(len(events), dtype=bool)
+        new_ticker[1:] = events.ticker[1:] != events.ticker[:-1]
+        cost_delta[new_ticker] = cost[new_ticker]
+
+        shape = (len(panel.timestamp), len(panel.tickers))
+        fields = {}
+        for name, deltas in (
+            ("quantity", events.quantity),
+            ("cost_basis", cost_delta),
+            ("realized_pnl", realized),
+            ("cash", -events.quantity * events.price - events.commission),
+        ):
+            values = np.zeros(shape)
+            np.add.at(values, (rows, columns), deltas)
+            fields[name] = np.cumsum(values, axis=0, out=values)
+
+        quantity = fields["quantity"]
+        # rounding errors of closed positions
+        quantity[np.abs(quantity) < 1e-9] = 0.0
+        close = _ffill(panel.values[:, :, BAR_FIELDS.index("close")])
+        market_value = quantity * close
+        market_value[quantity == 0] = 0.0
+        fields["market_value"] = market_value
+        fields["unrealized_pnl"] = market_value - fields["cost_basis"]
+        return cls(panel.timestamp, panel.tickers, initial_cash=initial_cash, **fields)
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(len={len(self)}, tickers={len(self.tickers)})"
+        )
+
+    @property
+    def equity(self) -> np.ndarray:
+        """Total equity: initial cash + trades cash flows + market value."""
+        return self.initial_cash + (self.cash + self.market_value).sum(axis=1)
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(
+            pd.to_datetime(self.timestamp, unit="s", utc=True), name="timestamp"
+        )
+
+    def field(self, name: str) -> pd.DataFrame:
+        """Get a (n_timestamps, n_tickers) frame of a single field, e.g. 'quantity'."""
+        if name not in VALUATION_FIELDS:
+            raise KeyError(f"Unknown valuation field: '{name}'")
+        return pd.DataFrame(
+            getattr(self, name), index=self.index, columns=self.tickers, copy=False
+        )
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Portfolio totals (summed over tickers) and equity, per timestamp."""
+        data = {
+            name: getattr(self, name).sum(axis=1)
+            for name in VALUATION_FIELDS
+            if name != "quantity"
+        }
+        data["cash"] = data["cash"] + self.initial_cash
+        data["equity"] = self.equity
+        return pd.DataFrame(data, index=self.index)
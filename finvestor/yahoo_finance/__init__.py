@@ -1,6 +1,88 @@
-from finvestor.yahoo_finance.bars import (
-    get_yahoo_finance_bars,
-    get_yahoo_finance_ticker_bars,
-    get_yahoo_finance_ticker_ohlc,
-)
-from finvestor.yahoo_finance.scrapper import get_asset, get_isin
+import importlib
+import typing as tp
+
+if tp.TYPE_CHECKING:  # pragma: no cover
+    from finvestor.yahoo_finance.bars import (
+        get_yahoo_finance_bars,
+        get_yahoo_finance_panel,
+        get_yahoo_finance_ticker_bars,
+        get_yahoo_finance_ticker_history,
+        get_yahoo_finance_ticker_ohlc,
+        iter_yahoo_finance_bars,
+    )
+    from finvestor.yahoo_finance.cache import BarCache
+    from finvestor.yahoo_finance.client import create_client
+    from finvestor.yahoo_finance.fx import FXRates, get_fx_rates, set_fx_rates
+    from finvestor.yahoo_finance.intervals import (
+        IntervalCapabilities,
+        get_interval_capabilities,
+        set_interval_capabilities,
+    )
+    from finvestor.yahoo_finance.live import BarEvent, BarRingBuffer, LiveBarsPoller
+    from finvestor.yahoo_finance.portfolio import load_assets, load_yf_csv_quotes
+    from finvestor.yahoo_finance.prices import (
+        get_price_at_timestamp,
+        get_prices,
+        get_prices_at_timestamps,
+    )
+    from finvestor.yahoo_finance.registry import AssetRegistry
+    from finvestor.yahoo_finance.scheduler import (
+        RequestScheduler,
+        get_scheduler,
+        set_scheduler,
+    )
+    from finvestor.yahoo_finance.scrapper import (
+        get_asset,
+        get_assets,
+        get_isin,
+        get_quotes,
+    )
+
+# public names are imported on first access, so that importing a submodule (e.g.
+# the CLI) does not import pandas, numpy, httpx, ...
+_EXPORTS: tp.Dict[str, str] = {
+    "get_yahoo_finance_bars": "finvestor.yahoo_finance.bars",
+    "get_yahoo_finance_panel": "finvestor.yahoo_finance.bars",
+    "get_yahoo_finance_ticker_bars": "finvestor.yahoo_finance.bars",
+    "get_yahoo_finance_ticker_history": "finvestor.yahoo_finance.bars",
+    "get_yahoo_finance_ticker_ohlc": "finvestor.yahoo_finance.bars",
+    "iter_yahoo_finance_bars": "finvestor.yahoo_finance.bars",
+    "BarCache": "finvestor.yahoo_finance.cache",
+    "create_client": "finvestor.yahoo_finance.client",
+    "FXRates": "finvestor.yahoo_finance.fx",
+    "get_fx_rates": "finvestor.yahoo_finance.fx",
+    "set_fx_rates": "finvestor.yahoo_finance.fx",
+    "IntervalCapabilities": "finvestor.yahoo_finance.intervals",
+    "get_interval_capabilities": "finvestor.yahoo_finance.intervals",
+    "set_interval_capabilities": "finvestor.yahoo_finance.intervals",
+    "BarEvent": "finvestor.yahoo_finance.live",
+    "BarRingBuffer": "finvestor.yahoo_finance.live",
+    "LiveBarsPoller": "finvestor.yahoo_finance.live",
+    "load_assets": "finvestor.yahoo_finance.portfolio",
+    "load_yf_csv_quotes": "finvestor.yahoo_finance.portfolio",
+    "get_price_at_timestamp": "finvestor.yahoo_finance.prices",
+    "get_prices": "finvestor.yahoo_finance.prices",
+    "get_prices_at_timestamps": "finvestor.yahoo_finance.prices",
+    "AssetRegistry": "finvestor.yahoo_finance.registry",
+    "RequestScheduler": "finvestor.yahoo_finance.scheduler",
+    "get_scheduler": "finvestor.yahoo_finance.scheduler",
+    "set_scheduler": "finvestor.yahoo_finance.scheduler",
+    "get_asset": "finvestor.yahoo_finance.scrapper",
+    "get_assets": "finvestor.yahoo_finance.scrapper",
+    "get_isin": "finvestor.yahoo_finance.scrapper",
+    "get_quotes": "finvestor.yahoo_finance.scrapper",
+}
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> tp.Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> tp.List[str]:
+    return sorted({*globals(), *_EXPORTS})
@@ -1,7 +1,10 @@
 import asyncio
+import functools
 import logging
+import time
 import typing as tp
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta
 
 import numpy as np
 from httpx import (
@@ -12,21 +15,52 @@ from httpx import (
     Request,
     Response,
 )
-from tenacity import TryAgain, before_sleep_log, retry, wait_exponential, wait_random
+from tenacity import (
+    TryAgain,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random,
+)
 
-from finvestor.schemas.bar import Bar, Bars
+from finvestor.schemas.actions import CorporateActions
+from finvestor.schemas.bar import BAR_FIELDS, Bars, BarsPanel
+from finvestor.utils.executor import get_cpu_executor
+from finvestor.utils.metrics import get_metrics, traced
+from finvestor.yahoo_finance.cache import BarCache
+from finvestor.yahoo_finance.client import create_client
+from finvestor.yahoo_finance.decoding import (
+    ChartDecodeError,
+    ChartEmptyError,
+    decode_chart,
+    get_instrument_type,
+)
+from finvestor.yahoo_finance.intervals import (
+    get_interval_capabilities,
+    get_range_bucket,
+)
+from finvestor.yahoo_finance.scheduler import DEFAULT_MAX_CONCURRENCY, get_scheduler
+from finvestor.yahoo_finance.singleflight import single_flight
 from finvestor.yahoo_finance.utils import (
     YF_CHART_URI,
+    YF_MAX_ATTEMPTS,
     AutoValidInterval,
     ValidPeriod,
     YFBarsRequestParams,
+    before_retry_sleep,
+    extract_tickers_list,
     get_valid_intervals,
+    is_transient_error,
+    record_response,
+    split_time_range,
     user_agent_header,
-    extract_tickers_list,
 )
 
 logger = logging.getLogger(__name__)
 
+R = tp.TypeVar("R")
+
 
 class YahooFinanceInvalidResponse(HTTPError):
     def __init__(self, message: str, *, request: Request, response: Response) -> None:
@@ -35,92 +69,93 @@ class YahooFinanceInvalidResponse(HTTPError):
         self.response = response
 
 
+class YahooFinanceEmptyResponse(YahooFinanceInvalidResponse):
+    pass
+
+
+def _ohlc_request_key(
+    ticker: str, *, params: YFBarsRequestParams, **kwargs: tp.Any
+) -> tp.Hashable:
+    return (
+        YF_CHART_URI.format(ticker=ticker),
+        tuple(sorted(params.dict(exclude_none=True, by_alias=True).items())),
+    )
+
+
+@single_flight(key=_ohlc_request_key)
 @retry(
     reraise=True,
+    retry=retry_if_exception(is_transient_error),
+    stop=stop_after_attempt(YF_MAX_ATTEMPTS),
     wait=wait_exponential(multiplier=1, min=4, max=10) + wait_random(0, 2),
-    before_sleep=before_sleep_log(logger, logging.DEBUG),
+    before_sleep=before_retry_sleep(logger),
+)
+@traced(
+    "yahoo_finance.ohlc",
+    attributes=lambda ticker, *, params, **_: {
+        "ticker": ticker,
+        "interval": params.interval,
+    },
 )
 async def get_yahoo_finance_ticker_ohlc(
     ticker: str,
     *,
     params: YFBarsRequestParams,
     client: AsyncClient,
-) -> tp.Dict[str, tp.List[tp.Union[None, float, int]]]:
+) -> tp.Dict[str, np.ndarray]:
 
     logger.debug(
         f"[YF] GET '{ticker}' bars with params: "
         f"{params.dict(by_alias=True, exclude_none=True)}."
     )
+    url = YF_CHART_URI.format(ticker=ticker)
+    metrics = get_metrics()
     try:
-        resp = await client.get(
-            url=YF_CHART_URI.format(ticker=ticker),
-            params=params.dict(exclude_none=True, by_alias=True),
-            headers=user_agent_header(),
-        )
+        async with get_scheduler().slot(url, key=ticker):
+            with metrics.timer("finvestor_http_request_seconds", endpoint="chart"):
+                resp = await client.get(
+                    url=url,
+                    params=params.dict(exclude_none=True, by_alias=True),
+                    headers=user_agent_header(),
+                )
     except ConnectTimeout as timeout_error:
         logger.error(f"ConnectTimeout: {timeout_error}")
         raise TryAgain(f"{str(timeout_error)}") from timeout_error
 
+    record_response(resp, endpoint="chart")
     resp.raise_for_status()
-    response = resp.json()
-
     request = resp._request
     assert request is not None
 
-    result = response.get("chart", {}).get("result", [])
-    error = response.get("chart", {}).get("error")
-    if error:
-        raise YahooFinanceInvalidResponse(
-            f"Yahoo finance responded with chart error: {error}",
-            request=request,
-            response=resp,
-        )
-    if not result or not isinstance(result, list):
-        raise YahooFinanceInvalidResponse(
-            f"Yahoo finance responded with empty/invalid chart result: {result}",
-            request=request,
-            response=resp,
-        )
-
-    timestamp = result[0].get("timestamp")
-    if not timestamp:
-        raise YahooFinanceInvalidResponse(
-            f"Yahoo finance responded with empty quotes: {result}",
-            request=request,
-            response=resp,
-        )
+    # large payloads are decoded by the cpu executor, off the event loop
     try:
-        ohlc = result[0]["indicators"]["quote"][0]
-        return dict(timestamp=timestamp, **ohlc)
-    except KeyError as error:
+        return await get_cpu_executor().run(
+            decode_chart, resp.content, size=len(resp.content)
+        )
+    except ChartEmptyError as error:
+        raise YahooFinanceEmptyResponse(
+            str(error), request=request, response=resp
+        ) from error
+    except ChartDecodeError as error:
         raise YahooFinanceInvalidResponse(
-            f"{error}", request=request, response=resp
+            str(error), request=request, response=resp
         ) from error
 
 
-async def get_yahoo_finance_ticker_bars(
-    ticker: str,
-    *,
-    client: AsyncClient,
-    interval: AutoValidInterval = "auto",
-    period: tp.Optional[ValidPeriod] = None,
-    start: tp.Optional[datetime] = None,
-    end: tp.Optional[datetime] = None,
-    include_prepost: tp.Optional[bool] = None,
-    events: tp.Literal[None, "div", "split", "div,splits"] = "div,splits",
-) -> Bars:
+async def _get_ticker_ohlc(
+    ticker: str, *, params: YFBarsRequestParams, client: AsyncClient
+) -> tp.Tuple[tp.Dict[str, np.ndarray], str]:
+    """Get the chart arrays of a ticker, resolving an 'auto' interval.
 
-    params = YFBarsRequestParams(
-        interval=interval,
-        period=period,
-        start=start,
-        end=end,
-        include_prepost=include_prepost,
-        events=events,
-    )
-
-    if params.interval == "auto":
-        valid_intervals = get_valid_intervals(params)
+    Returns:
+        (chart arrays, interval of the bars)
+    """
+    auto_interval = params.interval == "auto"
+    if auto_interval:
+        capabilities = get_interval_capabilities()
+        valid_intervals = capabilities.resolve(
+            ticker, params, get_valid_intervals(params)
+        )
     else:
         valid_intervals = (params.interval,)
 
@@ -142,8 +177,9 @@ async def get_yahoo_finance_ticker_bars(
             break
         except HTTPStatusError as error:
             if error.response.status_code == 422:
-                logger.error(
-                    f"Client error '422 Unprocessable Entity': {error.response.json()}"
+                logger.debug(
+                    f"[YF] (ticker='{ticker}'): interval '{valid_interval}' "
+                    "rejected with '422 Unprocessable Entity'."
                 )
                 errors.append(error)
                 continue
@@ -156,28 +192,253 @@ async def get_yahoo_finance_ticker_bars(
             f"(valid_intervals={valid_intervals}) responded with:\n{errors}"
         )
 
-    bars = Bars(
-        __root__=[
-            Bar(
-                timestamp=timestamp,
-                close=close if close is not None else np.nan,
-                high=high if high is not None else np.nan,
-                low=low if low is not None else np.nan,
-                open=open if open is not None else np.nan,
-                volume=volume if volume is not None else np.nan,
-                interval=valid_interval,
+    if auto_interval:
+        capabilities.record(
+            ticker,
+            params,
+            asset_type=get_instrument_type(ohlc),
+            rejected=valid_intervals[: len(errors)],
+            accepted=valid_interval,
+        )
+    return ohlc, valid_interval
+
+
+async def get_yahoo_finance_ticker_bars(
+    ticker: str,
+    *,
+    client: AsyncClient,
+    interval: AutoValidInterval = "auto",
+    period: tp.Optional[ValidPeriod] = None,
+    start: tp.Optional[datetime] = None,
+    end: tp.Optional[datetime] = None,
+    include_prepost: tp.Optional[bool] = None,
+    events: tp.Literal[None, "div", "split", "div,splits"] = "div,splits",
+    cache: tp.Optional[BarCache] = None,
+    chunked: bool = False,
+) -> Bars:
+    """Get bars of a ticker.
+
+    With `chunked=True`, a long `start..end` range is split into windows that
+    yahoo-finance accepts for the (explicit) interval, e.g. 7 days for '1m', the
+    windows are fetched concurrently and stitched into a single `Bars`. Windows
+    rejected with a '422' (e.g. older than the intraday bars retention) are
+    dropped and learned in the interval table, so they are skipped next time.
+    """
+
+    params = YFBarsRequestParams(
+        interval=interval,
+        period=period,
+        start=start,
+        end=end,
+        include_prepost=include_prepost,
+        events=events,
+    )
+
+    if cache is not None:
+        if params.interval != "auto":
+            return await cache.get_ticker_bars(ticker, params=params, client=client)
+        logger.warning(
+            f"[YF] (ticker='{ticker}'): bars with an 'auto' interval are not cached."
+        )
+
+    if chunked:
+        return await _get_chunked_ticker_bars(ticker, params=params, client=client)
+
+    ohlc, valid_interval = await _get_ticker_ohlc(ticker, params=params, client=client)
+    bars = Bars.from_ohlc(ohlc, interval=valid_interval)
+    return bars
+
+
+async def get_yahoo_finance_ticker_history(
+    ticker: str,
+    *,
+    client: AsyncClient,
+    interval: AutoValidInterval = "auto",
+    period: tp.Optional[ValidPeriod] = None,
+    start: tp.Optional[datetime] = None,
+    end: tp.Optional[datetime] = None,
+    include_prepost: tp.Optional[bool] = None,
+) -> tp.Tuple[Bars, CorporateActions, np.ndarray]:
+    """Get bars of a ticker and its splits and dividends, with a single request.
+
+    The bar cache only stores bars, so history requests are never cached.
+
+    Returns:
+        the bars, their splits and dividends, and the adjusted close of each bar
+        ('adjclose' of yahoo-finance, NaN when missing e.g. for intraday bars).
+    """
+    params = YFBarsRequestParams(
+        interval=interval,
+        period=period,
+        start=start,
+        end=end,
+        include_prepost=include_prepost,
+        events="div,splits",
+    )
+    ohlc, valid_interval = await _get_ticker_ohlc(ticker, params=params, client=client)
+    return (
+        Bars.from_ohlc(ohlc, interval=valid_interval),
+        CorporateActions.from_ohlc(ohlc),
+        ohlc["adjclose"],
+    )
+
+
+async def _get_chunked_ticker_bars(
+    ticker: str, *, params: YFBarsRequestParams, client: AsyncClient
+) -> Bars:
+    if params.interval == "auto" or params.start is None:
+        raise ValueError(
+            "Chunked bars requests need an explicit interval and a start, got: "
+            f"interval='{params.interval}', start={params.start}"
+        )
+    interval = params.interval
+    windows = split_time_range(params.start, params.end or int(time.time()), interval)
+    logger.debug(
+        f"[YF] (ticker='{ticker}') fetching '{interval}' bars in "
+        f"{len(windows)} window(s)."
+    )
+
+    capabilities = get_interval_capabilities()
+    rejected: tp.List[tp.Tuple[YFBarsRequestParams, HTTPError]] = []
+    asset_types: tp.Set[str] = set()
+
+    async def _fetch_window(window: tp.Tuple[int, int]) -> tp.Optional[Bars]:
+        window_params = params.copy(update={"start": window[0], "end": window[1]})
+        if interval in capabilities.rejected_for(ticker, window_params):
+            logger.debug(
+                f"[YF] (ticker='{ticker}') skipping {window}, interval "
+                f"'{interval}' is known to be rejected."
             )
-            for timestamp, volume, open, close, low, high in zip(
-                ohlc["timestamp"],
-                ohlc["volume"],
-                ohlc["open"],
-                ohlc["close"],
-                ohlc["low"],
-                ohlc["high"],
+            return None
+        try:
+            ohlc = await get_yahoo_finance_ticker_ohlc(
+                ticker, params=window_params, client=client
+            )
+        except YahooFinanceEmptyResponse:
+            logger.debug(f"[YF] (ticker='{ticker}') no bars in {window}.")
+            return Bars.empty(interval=interval)
+        except HTTPStatusError as error:
+            if error.response.status_code != 422:
+                raise error
+            # e.g. the oldest windows are out of the intraday bars retention
+            logger.debug(
+                f"[YF] (ticker='{ticker}'): interval '{interval}' rejected in "
+                f"{window} with '422 Unprocessable Entity'."
+            )
+            rejected.append((window_params, error))
+            return None
+        asset_type = get_instrument_type(ohlc)
+        if asset_type is not None:
+            asset_types.add(asset_type)
+        return Bars.from_ohlc(ohlc, interval=interval)
+
+    results = await asyncio.gather(*[_fetch_window(window) for window in windows])
+    bars = [result for result in results if result is not None]
+    if not bars:
+        if rejected:
+            raise rejected[0][1]
+        raise HTTPError(
+            f"[YF] (ticker='{ticker}') interval '{interval}' is known to be "
+            f"rejected for all of the {len(windows)} window(s)."
+        )
+    # other windows succeeded, so the rejections are due to the requested range,
+    # learned for the range buckets where no window succeeded
+    accepted_buckets = {
+        get_range_bucket(params.copy(update={"start": window[0], "end": window[1]}))
+        for window, result in zip(windows, results)
+        if result is not None
+    }
+    asset_type = next(iter(asset_types), capabilities.asset_types.get(ticker))
+    for window_params, _ in rejected:
+        if get_range_bucket(window_params) not in accepted_buckets:
+            capabilities.record(
+                ticker, window_params, asset_type=asset_type, rejected=[interval]
             )
-        ]
+    return Bars.concat(bars, interval=interval)
+
+
+def iter_yahoo_finance_bars(
+    tickers: tp.Union[str, tp.List[str]],
+    *,
+    client: AsyncClient,
+    interval: AutoValidInterval = "auto",
+    period: tp.Optional[ValidPeriod] = None,
+    start: tp.Optional[datetime] = None,
+    end: tp.Optional[datetime] = None,
+    include_prepost: tp.Optional[bool] = None,
+    events: tp.Literal[None, "div", "split", "div,splits"] = "div,splits",
+    cache: tp.Optional[BarCache] = None,
+    chunked: bool = False,
+    max_workers: int = DEFAULT_MAX_CONCURRENCY,
+    buffer_size: int = 1,
+) -> tp.AsyncIterator[tp.Tuple[str, tp.Union[Bars, Exception]]]:
+    """Yield `(ticker, bars)` (or `(ticker, error)`) as soon as each ticker is done.
+
+    At most `max_workers` tickers are fetched at the same time. Finished results
+    wait for the consumer in a buffer of `buffer_size` results: when it is full,
+    a worker holds on to its result and doesn't start a new ticker, so at most
+    `buffer_size + max_workers` results are kept waiting.
+    """
+    fetch = functools.partial(
+        get_yahoo_finance_ticker_bars,
+        client=client,
+        interval=interval,
+        period=period,
+        start=start,
+        end=end,
+        include_prepost=include_prepost,
+        events=events,
+        cache=cache,
+        chunked=chunked,
     )
-    return bars
+    return _iter_concurrently(
+        extract_tickers_list(tickers),
+        fetch,
+        max_workers=max_workers,
+        buffer_size=buffer_size,
+    )
+
+
+async def _iter_concurrently(
+    tickers: tp.List[str],
+    fetch: tp.Callable[[str], tp.Awaitable[R]],
+    *,
+    max_workers: int,
+    buffer_size: int = 1,
+) -> tp.AsyncIterator[tp.Tuple[str, tp.Union[R, Exception]]]:
+    """Yield `(ticker, await fetch(ticker))` (or `(ticker, error)`) as soon as each
+    ticker is done, see `iter_yahoo_finance_bars`.
+    """
+    if max_workers < 1 or buffer_size < 1:
+        raise ValueError(
+            f"Invalid max_workers={max_workers} or buffer_size={buffer_size}."
+        )
+    pending = deque(tickers)
+    queue: "asyncio.Queue[tp.Tuple[str, tp.Union[R, Exception]]]" = asyncio.Queue(
+        maxsize=buffer_size
+    )
+
+    async def _worker() -> None:
+        while pending:
+            ticker = pending.popleft()
+            result: tp.Union[R, Exception]
+            try:
+                result = await fetch(ticker)
+            except Exception as error:
+                logger.debug(f"[YF] (ticker='{ticker}') failed with: {error!r}")
+                result = error
+            await queue.put((ticker, result))
+
+    workers = [
+        asyncio.ensure_future(_worker()) for _ in range(min(max_workers, len(tickers)))
+    ]
+    try:
+        for _ in range(len(tickers)):
+            yield await queue.get()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
 
 
 async def get_yahoo_finance_bars(
@@ -190,13 +451,62 @@ async def get_yahoo_finance_bars(
     end: tp.Optional[datetime] = None,
     include_prepost: tp.Optional[bool] = None,
     events: tp.Literal[None, "div", "split", "div,splits"] = "div,splits",
+    cache: tp.Optional[BarCache] = None,
+    chunked: bool = False,
+    max_workers: int = DEFAULT_MAX_CONCURRENCY,
 ) -> tp.Dict[str, Bars]:
 
     tickers = extract_tickers_list(tickers)
 
-    bars = await asyncio.gather(
-        *[
-            get_yahoo_finance_ticker_bars(
+    bars: tp.Dict[str, Bars] = {}
+    results = iter_yahoo_finance_bars(
+        tickers,
+        client=client,
+        interval=interval,
+        period=period,
+        start=start,
+        end=end,
+        include_prepost=include_prepost,
+        events=events,
+        cache=cache,
+        chunked=chunked,
+        max_workers=max_workers,
+    )
+    try:
+        async for ticker, result in results:
+            if isinstance(result, Exception):
+                raise result
+            bars[ticker] = result
+    finally:
+        await results.aclose()  # type: ignore
+    return {ticker: bars[ticker] for ticker in tickers}
+
+
+async def get_yahoo_finance_panel(
+    tickers: tp.Union[str, tp.List[str]],
+    *,
+    client: AsyncClient,
+    interval: AutoValidInterval = "auto",
+    period: tp.Optional[ValidPeriod] = None,
+    start: tp.Optional[datetime] = None,
+    end: tp.Optional[datetime] = None,
+    include_prepost: tp.Optional[bool] = None,
+    events: tp.Literal[None, "div", "split", "div,splits"] = "div,splits",
+    cache: tp.Optional[BarCache] = None,
+    chunked: bool = False,
+    max_workers: int = DEFAULT_MAX_CONCURRENCY,
+) -> BarsPanel:
+    """Same as `get_yahoo_finance_bars`, but returns all bars aligned in a panel.
+
+    The panel is filled straight from the decoded chart arrays, without building
+    intermediate `Bars` (except for cached and chunked bars).
+    """
+
+    async def _fetch(
+        ticker: str,
+    ) -> tp.Tuple[tp.Mapping[str, np.ndarray], tp.Union[int, str, timedelta]]:
+        if (cache is not None and interval != "auto") or chunked:
+            bars = await get_yahoo_finance_ticker_bars(
                 ticker,
                 client=client,
                 interval=interval,
@@ -205,11 +515,42 @@ async def get_yahoo_finance_bars(
                 end=end,
                 include_prepost=include_prepost,
                 events=events,
+                cache=cache,
+                chunked=chunked,
             )
-            for ticker in tickers
-        ]
+            columns = {field: bars.values[:, j] for j, field in enumerate(BAR_FIELDS)}
+            return {"timestamp": bars.timestamp, **columns}, bars.interval
+        params = YFBarsRequestParams(
+            interval=interval,
+            period=period,
+            start=start,
+            end=end,
+            include_prepost=include_prepost,
+            events=events,
+        )
+        return await _get_ticker_ohlc(ticker, params=params, client=client)
+
+    tickers = extract_tickers_list(tickers)
+    ohlc: tp.Dict[str, tp.Mapping[str, np.ndarray]] = {}
+    intervals: tp.Set[tp.Union[int, str, timedelta]] = set()
+    results = _iter_concurrently(tickers, _fetch, max_workers=max_workers)
+    try:
+        async for ticker, result in results:
+            if isinstance(result, Exception):
+                raise result
+            ohlc[ticker], ticker_interval = result
+            intervals.add(ticker_interval)
+    finally:
+        await results.aclose()  # type: ignore
+    if len(intervals) > 1:
+        raise ValueError(
+            f"Can't align bars with different intervals: {intervals}, "
+            "use an explicit interval."
+        )
+    return BarsPanel.from_ohlc(
+        {ticker: ohlc[ticker] for ticker in tickers},
+        interval=intervals.pop() if intervals else None,
     )
-    return dict(zip(tickers, bars))
 
 
 if __name__ == "__main__":
@@ -218,7 +559,7 @@ if __name__ == "__main__":
     ticker = "TSLA,AAPL"
 
     async def main():
-        async with AsyncClient() as client:
+        async with create_client() as client:
             bars = await get_yahoo_finance_bars(
                 ticker, client=client, period="1d", interval="1h"
             )
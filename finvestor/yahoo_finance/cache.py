@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import sqlite3
+import time
+import typing as tp
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from httpx import AsyncClient, HTTPError, HTTPStatusError
+
+from finvestor.schemas.bar import BAR_FIELDS, Bars
+from finvestor.utils.duration import parse_duration
+from finvestor.utils.paths import get_cache_dir
+from finvestor.yahoo_finance.utils import (
+    YFBarsRequestParams,
+    get_candle_duration,
+    split_time_range,
+)
+
+logger = logging.getLogger(__name__)
+
+BarCacheKey = tp.Tuple[str, str, str, int]
+TimeRange = tp.Tuple[int, int]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    events TEXT NOT NULL,
+    prepost INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    {", ".join(f"{field} REAL" for field in BAR_FIELDS)},
+    PRIMARY KEY (ticker, interval, events, prepost, timestamp)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ranges (
+    ticker TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    events TEXT NOT NULL,
+    prepost INTEGER NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ranges_key
+    ON ranges (ticker, interval, events, prepost);
+"""
+_KEY_WHERE = "ticker = ? AND interval = ? AND events = ? AND prepost = ?"
+
+
+def get_requested_range(params: YFBarsRequestParams, now: int) -> TimeRange:
+    """Get the [start, end) range (unix seconds) covered by the request params.
+
+    Periods are counted in calendar days from `now`, 'ytd' starts on the first
+    of january (UTC) of the current year.
+    """
+    end = now if params.end is None else min(params.end, now)
+    if params.start is not None:
+        return params.start, end
+    assert params.period is not None
+    if params.period == "ytd":
+        year = datetime.fromtimestamp(now, tz=timezone.utc).year
+        return int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp()), end
+    return now - int(parse_duration(params.period).total_seconds()), end
+
+
+def merge_ranges(ranges: tp.Iterable[TimeRange]) -> tp.List[TimeRange]:
+    merged: tp.List[TimeRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_ranges(
+    start: int, end: int, covered: tp.Iterable[TimeRange]
+) -> tp.List[TimeRange]:
+    """Get the parts of [start, end) that are not in any of the covered ranges."""
+    missing: tp.List[TimeRange] = []
+    for covered_start, covered_end in merge_ranges(covered):
+        if covered_end <= start:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > start:
+            missing.append((start, covered_start))
+        start = max(start, covered_end)
+    if start < end:
+        missing.append((start, end))
+    return missing
+
+
+class BarCache:
+    """Persistent SQLite store of yahoo-finance bars.
+
+    Bars are keyed by (ticker, interval, events, include_prepost). For every key
+    the cache keeps track of the time ranges that only contain completed candles,
+    so that only the missing gaps (and the current open candle) are fetched from
+    yahoo-finance.
+
+    Args:
+        path: Optional path to the sqlite database, defaults to
+            '<cache_dir>/bars.sqlite'
+    """
+
+    def __init__(self, path: tp.Union[None, str, Path] = None) -> None:
+        self.path = Path(path) if path is not None else get_cache_dir() / "bars.sqlite"
+        self._conn: tp.Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def get_key(ticker: str, params: YFBarsRequestParams) -> BarCacheKey:
+        if params.interval == "auto":
+            raise ValueError("Can't cache bars with an 'auto' interval.")
+        return (
+            ticker,
+            params.interval,
+            params.events or "",
+            int(bool(params.include_prepost)),
+        )
+
+    def covered_ranges(self, key: BarCacheKey) -> tp.List[TimeRange]:
+        rows = self.conn.execute(
+            f"SELECT start, end FROM ranges WHERE {_KEY_WHERE} ORDER BY start", key
+        ).fetchall()
+        return [(start, end) for start, end in rows]
+
+    def missing_ranges(
+        self, key: BarCacheKey, start: int, end: int
+    ) -> tp.List[TimeRange]:
+        return subtract_ranges(start, end, self.covered_ranges(key))
+
+    def read(self, key: BarCacheKey, start: int, end: int) -> Bars:
+        rows = self.conn.execute(
+            f"SELECT timestamp, {', '.join(BAR_FIELDS)} FROM bars "
+            f"WHERE {_KEY_WHERE} AND timestamp >= ? AND timestamp < ? "
+            "ORDER BY timestamp",
+            (*key, start, end),
+        ).fetchall()
+        data = np.array(rows, dtype=np.float64).reshape(len(rows), len(BAR_FIELDS) + 1)
+        return Bars(
+            data[:, 0].astype(np.int64),
+            np.ascontiguousarray(data[:, 1:].T).T,
+            interval=key[1],
+        )
+
+    def write(
+        self, key: BarCacheKey, bars: Bars, *, covered: tp.Optional[TimeRange] = None
+    ) -> None:
+        """Insert (or replace) bars and mark the `covered` range as complete."""
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO bars VALUES "
+                f"(?, ?, ?, ?, ?, {', '.join('?' for _ in BAR_FIELDS)})",
+                (
+                    (*key, timestamp, *values)
+                    for timestamp, values in zip(
+                        bars.timestamp.tolist(), bars.values.tolist()
+                    )
+                ),
+            )
+            if covered is None or covered[0] >= covered[1]:
+                return
+            ranges = merge_ranges([*self.covered_ranges(key), covered])
+            self.conn.execute(f"DELETE FROM ranges WHERE {_KEY_WHERE}", key)
+            self.conn.executemany(
+                "INSERT INTO ranges VALUES (?, ?, ?, ?, ?, ?)",
+                ((*key, start, end) for start, end in ranges),
+            )
+
+    async def get_ticker_bars(
+        self,
+        ticker: str,
+        *,
+        params: YFBarsRequestParams,
+        client: AsyncClient,
+    ) -> Bars:
+        """Get bars of a ticker, only fetching the missing ranges from yahoo-finance.
+
+        Candles that may still be open at fetch time are stored but never marked as
+        covered, so they are re-fetched (and patched) on the next call. Gaps rejected
+        with a '422' (e.g. older than the intraday bars retention) are skipped and
+        the bars of the other gaps are returned, unless no bar is left.
+
+        Raises:
+            HTTPStatusError: if every missing gap was rejected and no bar is cached.
+            HTTPError: if fetching a gap failed, after the other gaps are stored.
+        """
+        from finvestor.yahoo_finance.bars import (
+            YahooFinanceEmptyResponse,
+            get_yahoo_finance_ticker_ohlc,
+        )
+
+        key = self.get_key(ticker, params)
+        now = int(time.time())
+        start, end = get_requested_range(params, now)
+        # a candle starting before this timestamp is complete
+        complete_before = now - get_candle_duration(key[1])
+
+        async def _fetch_gap(gap: TimeRange) -> None:
+            gap_params = params.copy(
+                update={"period": None, "start": gap[0], "end": gap[1]}
+            )
+            try:
+                ohlc = await get_yahoo_finance_ticker_ohlc(
+                    ticker, params=gap_params, client=client
+                )
+            except YahooFinanceEmptyResponse:
+                logger.debug(f"[YF-Cache] (ticker='{ticker}') no bars in {gap}.")
+                bars = Bars.empty(interval=key[1])
+            else:
+                bars = Bars.from_ohlc(ohlc, interval=key[1])
+            self.write(key, bars, covered=(gap[0], min(gap[1], complete_before)))
+
+        # long gaps are fetched in windows accepted by a single request
+        gaps = [
+            window
+            for gap in self.missing_ranges(key, start, end)
+            for window in split_time_range(*gap, key[1])
+        ]
+        logger.debug(
+            f"[YF-Cache] (ticker='{ticker}', interval='{key[1]}') "
+            f"fetching {len(gaps)} missing range(s): {gaps}"
+        )
+        # every gap is awaited, so that the fetched ones are stored when others fail
+        results = await asyncio.gather(
+            *[_fetch_gap(gap) for gap in gaps], return_exceptions=True
+        )
+        rejected: tp.List[HTTPStatusError] = []
+        errors: tp.List[BaseException] = []
+        for gap, result in zip(gaps, results):
+            if (
+                isinstance(result, HTTPStatusError)
+                and result.response.status_code == 422
+            ):
+                logger.warning(
+                    f"[YF-Cache] (ticker='{ticker}', interval='{key[1]}') "
+                    f"range {gap} rejected with '422 Unprocessable Entity', skipped."
+                )
+                rejected.append(result)
+            elif isinstance(result, BaseException):
+                errors.append(result)
+        if len(errors) == 1:
+            raise errors[0]
+        if errors:
+            raise HTTPError(
+                f"[YF-Cache] (ticker='{ticker}') failed to fetch {len(errors)} "
+                f"of {len(gaps)} missing range(s):\n{errors}"
+            )
+
+        bars = self.read(key, start, end)
+        if rejected and len(bars) == 0:
+            raise rejected[0]
+        return bars
@@ -1,15 +1,12 @@
 import logging
 import typing as tp
 from enum import Enum
+from pathlib import Path
 
-import anyio
 import typer
-from httpx import AsyncClient
 
-from finvestor.yahoo_finance.utils import AutoValidInterval, ValidPeriod
-from finvestor.yahoo_finance.bars import get_yahoo_finance_bars
-
-from finvestor.utils.logger import setup_logging
+from finvestor.utils.metrics import MetricsRegistry, set_metrics
+from finvestor.yahoo_finance.types import AutoValidInterval, ValidPeriod
 
 logger = logging.getLogger("finvestor.yahoo_finance.cli")
 app = typer.Typer(
@@ -47,28 +44,133 @@ def main(
     period: YFPeriodEnum = typer.Option("1d", "-p", "--period"),
     prepost: bool = False,
     events: YFEventsEnum = typer.Option("div,splits"),
+    cache: bool = typer.Option(
+        False, "--cache/--no-cache", help="Use the local bar cache."
+    ),
+    max_concurrency: tp.Optional[int] = typer.Option(
+        None,
+        help="Maximum number of concurrent requests, defaults to the scheduler's.",
+    ),
+    http_cache: tp.Optional[bool] = typer.Option(
+        None,
+        "--http-cache/--no-http-cache",
+        help="Cache http responses on disk, defaults to no.",
+    ),
+    metrics_file: tp.Optional[Path] = typer.Option(
+        None,
+        "--metrics-file",
+        dir_okay=False,
+        help="Write request/parse metrics in the prometheus text format.",
+    ),
+    cpu_workers: tp.Optional[int] = typer.Option(
+        None,
+        "--cpu-workers",
+        help="Decode and validate responses in a pool of N processes.",
+    ),
+    daemon: bool = typer.Option(
+        True,
+        "--daemon/--no-daemon",
+        help="Use the finvestor daemon when it is running.",
+    ),
 ):
     """
     Load and process an etoro account statement.
     """
 
+    if cache and interval.value == "auto":
+        # the cache is keyed by interval, bars of an 'auto' interval can't be cached
+        raise typer.BadParameter(
+            "The bar cache needs an explicit interval (-i/--interval).",
+            param_hint="'--cache'",
+        )
+
+    from finvestor.daemon import connect
+    from finvestor.utils.logger import setup_logging
+
+    setup_logging()
+
+    def _log_bars(ticker: str, bars: tp.Any) -> None:
+        if isinstance(bars, Exception):
+            logger.error(f"=> Failed to load '{ticker}' bars: {bars}")
+            return
+        logger.info(f"=> '{ticker}' bars for a period of '{period.value}': ")
+        logger.info(bars.df)
+
+    daemon_client = connect() if daemon else None
+    if daemon_client is not None:
+        conflicts = daemon_client.get_conflicting_settings(
+            max_concurrency=max_concurrency,
+            http_cache=http_cache,
+            metrics=True if metrics_file is not None else None,
+            cpu_workers=cpu_workers,
+        )
+        if conflicts:
+            # the daemon can't apply per command settings, they are honored in-process
+            logger.warning(
+                f"The finvestor daemon on '{daemon_client.path}' runs with "
+                f"{', '.join(conflicts)}, loading bars without it "
+                "(restart it with these options, or use --no-daemon)."
+            )
+            daemon_client = None
+    if daemon_client is not None:
+        logger.debug(f"Using the finvestor daemon on '{daemon_client.path}'.")
+        results = daemon_client.get_bars(
+            tickers,
+            interval=interval.value,
+            period=period.value,
+            include_prepost=prepost,
+            events=events.value,
+            cache=cache,
+        )
+        for ticker, bars in results.items():
+            _log_bars(ticker, bars)
+        if metrics_file is not None:
+            metrics_file.write_text(daemon_client.get_metrics())
+        return
+
+    # heavy imports (pandas, numpy, httpx, ...) are deferred until a command runs
+    import anyio
+
+    from finvestor.utils.executor import ProcessPoolCPUExecutor, set_cpu_executor
+    from finvestor.yahoo_finance.bars import iter_yahoo_finance_bars
+    from finvestor.yahoo_finance.cache import BarCache
+    from finvestor.yahoo_finance.client import create_client
+    from finvestor.yahoo_finance.scheduler import (
+        DEFAULT_MAX_CONCURRENCY,
+        RequestScheduler,
+        set_scheduler,
+    )
+
+    max_concurrency = max_concurrency or DEFAULT_MAX_CONCURRENCY
+    set_scheduler(RequestScheduler(max_concurrency=max_concurrency))
+    metrics = MetricsRegistry() if metrics_file is not None else None
+    set_metrics(metrics)
+
     async def _worker():
-        async with AsyncClient() as client:
-            return await get_yahoo_finance_bars(
+        async with create_client(
+            max_connections=max_concurrency, cache=bool(http_cache)
+        ) as client:
+            async for ticker, bars in iter_yahoo_finance_bars(
                 tickers,
                 client=client,
                 interval=interval.value,
                 period=period.value,
                 include_prepost=prepost,
                 events=events.value,
-            )
+                cache=BarCache() if cache else None,
+            ):
+                _log_bars(ticker, bars)
 
-    all_bars = anyio.run(_worker)
-    for ticker, bars in all_bars.items():
-        logger.info(f"=> '{ticker}' bars for a period of '{period.value}': ")
-        logger.info(bars.df)
+    executor = ProcessPoolCPUExecutor(cpu_workers) if cpu_workers else None
+    set_cpu_executor(executor)
+    try:
+        anyio.run(_worker)
+    finally:
+        if executor is not None:
+            executor.close()
+    if metrics is not None and metrics_file is not None:
+        metrics_file.write_text(metrics.dump_prometheus())
 
 
 if __name__ == "__main__":
-    setup_logging()
     app()
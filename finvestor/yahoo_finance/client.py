@@ -0,0 +1,157 @@
+import importlib.util
+import logging
+import typing as tp
+from datetime import timedelta
+from pathlib import Path
+
+import httpx
+from httpx_cache import AsyncCacheControlTransport, FileCache
+
+from finvestor.utils.paths import get_cache_dir
+from finvestor.yahoo_finance.scheduler import DEFAULT_MAX_CONCURRENCY
+from finvestor.yahoo_finance.utils import (
+    ISIN_URI,
+    YF_CHART_URI,
+    YF_QUOTE_API_URI,
+    YF_QUOTE_SUMMARY_URI,
+    YF_QUOTE_URI,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = DEFAULT_MAX_CONCURRENCY
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = DEFAULT_MAX_CONCURRENCY
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_TIMEOUT = 10.0
+
+# url prefix -> how long a cached response stays fresh, the longest prefix wins
+DEFAULT_CACHE_RULES: tp.Dict[str, timedelta] = {
+    ISIN_URI: timedelta(days=30),
+    YF_QUOTE_SUMMARY_URI.format(ticker=""): timedelta(days=1),
+    YF_QUOTE_URI.format(ticker=""): timedelta(days=1),
+    YF_QUOTE_API_URI: timedelta(minutes=5),
+    YF_CHART_URI.format(ticker=""): timedelta(minutes=1),
+}
+
+
+def has_http2() -> bool:
+    """Whether HTTP/2 is supported, i.e. the `h2` package (`httpx[http2]`) is
+    installed.
+    """
+    return importlib.util.find_spec("h2") is not None
+
+
+class CacheRulesTransport(httpx.AsyncBaseTransport):
+    """Transport caching only the requests matching a rule, with `httpx-cache`.
+
+    The freshness of a cached response is set by the matching rule (as a request
+    'cache-control: max-age' directive), requests that match no rule, or that
+    already have a 'cache-control' header, skip the cache.
+
+    Args:
+        transport: transport used to send the requests.
+        cache: httpx-cache cache used to store the responses.
+        rules: mapping of url prefix -> max age of a cached response.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        cache: FileCache,
+        rules: tp.Mapping[str, timedelta],
+    ) -> None:
+        self.transport = transport
+        self.cache_transport = AsyncCacheControlTransport(
+            transport=transport, cache=cache
+        )
+        # longest prefixes first
+        self.rules = sorted(
+            (
+                (prefix, int(max_age.total_seconds()))
+                for prefix, max_age in rules.items()
+            ),
+            key=lambda rule: len(rule[0]),
+            reverse=True,
+        )
+
+    def get_max_age(self, url: httpx.URL) -> tp.Optional[int]:
+        url_str = str(url)
+        for prefix, max_age in self.rules:
+            if url_str.startswith(prefix):
+                return max_age
+        return None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        max_age = self.get_max_age(request.url)
+        if max_age is None or "cache-control" in request.headers:
+            return await self.transport.handle_async_request(request)
+        request.headers["cache-control"] = f"max-age={max_age}"
+        return await self.cache_transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # also closes the wrapped transport
+        await self.cache_transport.aclose()
+
+
+def create_client(
+    *,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    timeout: float = DEFAULT_TIMEOUT,
+    http2: tp.Optional[bool] = None,
+    cache: bool = False,
+    cache_dir: tp.Union[None, str, Path] = None,
+    cache_rules: tp.Optional[tp.Mapping[str, timedelta]] = None,
+    transport: tp.Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """Create the httpx client shared by all finvestor fetchers.
+
+    Connections are kept alive and reused across requests, and multiplexed over
+    HTTP/2 (e.g. to 'query2.finance.yahoo.com').
+
+    Args:
+        max_connections: maximum number of open connections, defaults to the
+            scheduler's maximum concurrency.
+        max_keepalive_connections: maximum number of idle connections kept alive.
+        keepalive_expiry: seconds an idle connection is kept alive.
+        timeout: requests timeout in seconds.
+        http2: whether to enable HTTP/2, defaults to yes. Falls back to HTTP/1.1
+            with a warning if `h2` is not installed.
+        cache: whether to cache responses on disk, using `cache_rules`.
+        cache_dir: Optional http cache dir, defaults to '<cache_dir>/http'
+        cache_rules: Optional mapping of url prefix -> max age of a cached
+            response, defaults to `DEFAULT_CACHE_RULES`.
+        transport: Optional transport (e.g. a mock transport), replaces the
+            default connection pool.
+
+    Returns:
+        httpx.AsyncClient
+    """
+    if http2 is None or http2:
+        http2 = has_http2()
+        if not http2:
+            logger.warning(
+                "HTTP/2 is disabled, the 'h2' package is not installed "
+                "(install it with `pip install httpx[http2]`)."
+            )
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+    if cache:
+        transport = CacheRulesTransport(
+            transport,
+            FileCache(cache_dir or get_cache_dir() / "http"),
+            DEFAULT_CACHE_RULES if cache_rules is None else cache_rules,
+        )
+    logger.debug(
+        f"Created http client (max_connections={max_connections}, http2={http2}, "
+        f"cache={cache})."
+    )
+    return httpx.AsyncClient(transport=transport, timeout=timeout)
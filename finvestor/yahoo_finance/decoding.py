@@ -0,0 +1,150 @@
+import json
+import typing as tp
+
+import numpy as np
+
+from finvestor.schemas.bar import BAR_FIELDS
+from finvestor.utils.metrics import get_metrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+JSONDecoder = tp.Callable[[tp.Union[bytes, str]], tp.Any]
+
+JSON_DECODERS: tp.Dict[str, JSONDecoder] = {"json": json.loads}
+if orjson is not None:
+    JSON_DECODERS["orjson"] = orjson.loads
+
+# fastest installed decoder
+DEFAULT_JSON_DECODER = "orjson" if orjson is not None else "json"
+
+
+def loads_json(
+    content: tp.Union[bytes, str], *, decoder: tp.Optional[str] = None
+) -> tp.Any:
+    """Decode a json payload, with orjson when installed.
+
+    Args:
+        content: raw json payload (e.g. `response.content`)
+        decoder: Optional name of the decoder in `JSON_DECODERS`, defaults to
+            `DEFAULT_JSON_DECODER`
+
+    Returns:
+        decoded json
+    """
+    return JSON_DECODERS[decoder or DEFAULT_JSON_DECODER](content)
+
+
+def get_chart_events(
+    events: tp.Optional[tp.Mapping[str, tp.Mapping[str, tp.Any]]],
+) -> tp.Dict[str, np.ndarray]:
+    """Convert the split and dividend events of a chart result to sorted arrays.
+
+    Returns:
+        'dividend_timestamp' (int64), 'dividend_amount', 'split_timestamp' (int64)
+        and 'split_ratio' (new shares per old share, e.g. 2.0 for a '2:1' split).
+    """
+    events = events or {}
+    dividends = sorted(
+        (int(dividend["date"]), dividend["amount"])
+        for dividend in (events.get("dividends") or {}).values()
+    )
+    splits = sorted(
+        (int(split["date"]), split["numerator"] / split["denominator"])
+        for split in (events.get("splits") or {}).values()
+        if split.get("numerator") and split.get("denominator")
+    )
+    return {
+        "dividend_timestamp": np.array([d[0] for d in dividends], dtype=np.int64),
+        "dividend_amount": np.array([d[1] for d in dividends], dtype=np.float64),
+        "split_timestamp": np.array([s[0] for s in splits], dtype=np.int64),
+        "split_ratio": np.array([s[1] for s in splits], dtype=np.float64),
+    }
+
+
+def get_chart_arrays(
+    timestamp: tp.Sequence[int],
+    quote: tp.Mapping[str, tp.Sequence[tp.Any]],
+    *,
+    adjclose: tp.Optional[tp.Sequence[tp.Any]] = None,
+    events: tp.Optional[tp.Mapping[str, tp.Mapping[str, tp.Any]]] = None,
+) -> tp.Dict[str, np.ndarray]:
+    """Convert the columns of a yahoo-finance chart result to numpy arrays.
+
+    Timestamps are converted to int64 and OHLCV values to float64, `null` values
+    are converted to NaN in bulk while building the arrays. The adjusted close
+    ('adjclose', NaN when missing) and the arrays of `get_chart_events` are
+    added to the OHLCV columns.
+
+    Raises:
+        KeyError: if an OHLCV column is missing from `quote`.
+    """
+    arrays = {"timestamp": np.asarray(timestamp, dtype=np.int64)}
+    for field in BAR_FIELDS:
+        arrays[field] = np.array(quote[field], dtype=np.float64)
+    if adjclose is not None:
+        arrays["adjclose"] = np.array(adjclose, dtype=np.float64)
+    else:
+        arrays["adjclose"] = np.full(len(timestamp), np.nan, dtype=np.float64)
+    arrays.update(get_chart_events(events))
+    return arrays
+
+
+class ChartDecodeError(ValueError):
+    """Invalid yahoo-finance chart payload."""
+
+
+class ChartEmptyError(ChartDecodeError):
+    """Valid yahoo-finance chart payload without any bar."""
+
+
+def decode_chart(content: tp.Union[bytes, str]) -> tp.Dict[str, np.ndarray]:
+    """Decode a yahoo-finance chart payload to the arrays of `get_chart_arrays`.
+
+    The yahoo-finance asset type of the ticker (e.g. 'EQUITY', 'ETF' or
+    'MUTUALFUND', empty if unknown) is added as a 0-d 'instrument_type' array, see
+    `get_instrument_type`. Module level, so that it can run in a worker process
+    (see `CPUExecutor`).
+
+    Raises:
+        ChartEmptyError: if the chart has no bars.
+        ChartDecodeError: if the payload is a chart error or an invalid chart.
+    """
+    metrics = get_metrics()
+    with metrics.timer("finvestor_parse_seconds", kind="chart"):
+        response = loads_json(content)
+
+    result = response.get("chart", {}).get("result", [])
+    error = response.get("chart", {}).get("error")
+    if error:
+        raise ChartDecodeError(f"Yahoo finance responded with chart error: {error}")
+    if not result or not isinstance(result, list):
+        raise ChartDecodeError(
+            f"Yahoo finance responded with empty/invalid chart result: {result}"
+        )
+
+    timestamp = result[0].get("timestamp")
+    if not timestamp:
+        raise ChartEmptyError(f"Yahoo finance responded with empty quotes: {result}")
+    try:
+        indicators = result[0]["indicators"]
+        adjclose = (indicators.get("adjclose") or [{}])[0].get("adjclose")
+        with metrics.timer("finvestor_parse_seconds", kind="chart_arrays"):
+            arrays = get_chart_arrays(
+                timestamp,
+                indicators["quote"][0],
+                adjclose=adjclose,
+                events=result[0].get("events"),
+            )
+    except KeyError as error:
+        raise ChartDecodeError(f"{error}") from error
+    meta = result[0].get("meta") or {}
+    arrays["instrument_type"] = np.array(meta.get("instrumentType") or "")
+    return arrays
+
+
+def get_instrument_type(ohlc: tp.Mapping[str, np.ndarray]) -> tp.Optional[str]:
+    """Get the asset type of a decoded chart (see `decode_chart`), if known."""
+    return str(ohlc.get("instrument_type", "")) or None
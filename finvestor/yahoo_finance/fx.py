@@ -0,0 +1,290 @@
+import asyncio
+import functools
+import logging
+import time
+import typing as tp
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from httpx import AsyncClient
+
+from finvestor.schemas.bar import BAR_FIELDS, Bars, BarsPanel
+from finvestor.yahoo_finance.bars import get_yahoo_finance_ticker_bars
+from finvestor.yahoo_finance.cache import BarCache
+from finvestor.yahoo_finance.prices import PRICE_LOOKBACK
+from finvestor.yahoo_finance.singleflight import SingleFlight
+from finvestor.yahoo_finance.utils import to_unix_seconds
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_CURRENCY = "USD"
+# yahoo-finance quotes some exchanges in a minor unit of the currency
+MINOR_CURRENCIES: tp.Dict[str, tp.Tuple[str, float]] = {
+    "GBp": ("GBP", 0.01),
+    "GBX": ("GBP", 0.01),
+    "ILA": ("ILS", 0.01),
+    "ZAc": ("ZAR", 0.01),
+}
+_PRICE_FIELDS = [BAR_FIELDS.index(field) for field in ("open", "high", "low", "close")]
+
+
+def normalize_currency(currency: str) -> tp.Tuple[str, float]:
+    """Get the currency of a (minor) currency and its factor, e.g. GBp: (GBP, 0.01)"""
+    return MINOR_CURRENCIES.get(currency, (currency, 1.0))
+
+
+def get_fx_ticker(currency: str, base: str) -> str:
+    """Get the yahoo-finance ticker of a currency pair, e.g. 'EURUSD=X'."""
+    return f"{currency}{base}=X"
+
+
+class FXRates:
+    """Daily FX rate series fetched from yahoo-finance, kept in memory.
+
+    Rates of a pair are fetched once (through the chart fetcher, and the bar
+    cache if set) for the requested range, and reused by every conversion that
+    falls in it, a wider range re-fetches the pair (merged with the loaded range,
+    one fetch per pair at a time). The rate at a timestamp is the close of the
+    last daily bar starting at or before it.
+
+    Args:
+        cache: Optional bar cache, to persist the rate series across runs.
+    """
+
+    def __init__(self, *, cache: tp.Optional[BarCache] = None) -> None:
+        self.cache = cache
+        self._series: tp.Dict[str, Bars] = {}
+        self._ranges: tp.Dict[str, tp.Tuple[int, int]] = {}
+        self._flight = SingleFlight()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(pairs={sorted(self._series)})"
+
+    @property
+    def pairs(self) -> tp.List[str]:
+        return list(self._series)
+
+    def get_series(self, currency: str, base: str) -> Bars:
+        """Get the loaded daily bars of a currency pair.
+
+        Raises:
+            KeyError: if the pair was not loaded.
+        """
+        pair = get_fx_ticker(currency, base)
+        if pair not in self._series:
+            raise KeyError(f"FX rates of '{pair}' are not loaded.")
+        return self._series[pair]
+
+    async def load(
+        self,
+        currencies: tp.Iterable[str],
+        base: str,
+        *,
+        client: AsyncClient,
+        start: int,
+        end: int,
+    ) -> None:
+        """Fetch the rates of `currencies` to `base` between unix timestamps.
+
+        Pairs already loaded for the range are not fetched again.
+        """
+        start -= int(PRICE_LOOKBACK.total_seconds())
+        end += 24 * 3600
+        pairs = {
+            get_fx_ticker(currency, base)
+            for currency in {normalize_currency(c)[0] for c in currencies}
+            if currency != base
+        }
+        await asyncio.gather(
+            *[
+                self._load_pair(pair, start, end, client=client)
+                for pair in sorted(pairs)
+                if not self._covers(pair, start, end)
+            ]
+        )
+
+    def _covers(self, pair: str, start: int, end: int) -> bool:
+        loaded = self._ranges.get(pair)
+        return loaded is not None and loaded[0] <= start and end <= loaded[1]
+
+    async def _load_pair(
+        self, pair: str, start: int, end: int, *, client: AsyncClient
+    ) -> None:
+        # a single fetch of a pair runs at a time, a caller whose range is not
+        # covered by the fetch it joined fetches again once it is done
+        while not self._covers(pair, start, end):
+            await self._flight.run(
+                pair, functools.partial(self._fetch_pair, pair, start, end, client)
+            )
+
+    async def _fetch_pair(
+        self, pair: str, start: int, end: int, client: AsyncClient
+    ) -> None:
+        if pair in self._ranges:
+            # the new range is merged with the loaded one, to keep a single series
+            start = min(start, self._ranges[pair][0])
+            end = max(end, self._ranges[pair][1])
+        logger.debug(f"[FX] fetching '{pair}' rates in ({start}, {end}).")
+        bars = await get_yahoo_finance_ticker_bars(
+            pair,
+            client=client,
+            interval="1d",
+            start=datetime.fromtimestamp(start, tz=timezone.utc),
+            end=datetime.fromtimestamp(min(end, int(time.time())), tz=timezone.utc),
+            cache=self.cache,
+        )
+        valid = ~np.isnan(bars.close)
+        self._series[pair] = Bars(
+            bars.timestamp[valid], bars.values[valid], interval=bars.interval
+        )
+        # the requested range is kept (not the fetched one, capped at the
+        # current time), so that recent conversions don't re-fetch every time
+        self._ranges[pair] = (start, end)
+
+    def get_rates(
+        self,
+        currencies: tp.Union[str, tp.Sequence[str], np.ndarray, pd.Series],
+        base: str,
+        timestamps: np.ndarray,
+    ) -> np.ndarray:
+        """Vectorized as-of lookup of the rates converting to `base`.
+
+        Args:
+            currencies: currency of each timestamp, or a single currency.
+            base: currency converted to.
+            timestamps: unix timestamps (seconds).
+
+        Returns:
+            np.ndarray: float64 rates, NaN for timestamps before the first rate.
+
+        Raises:
+            KeyError: if the rates of a currency were not loaded.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if isinstance(currencies, str):
+            currencies = np.full(len(timestamps), currencies, dtype=object)
+        unique, inverse = np.unique(
+            np.asarray(currencies, dtype=object).astype(str), return_inverse=True
+        )
+        rates = np.full(len(timestamps), np.nan, dtype=np.float64)
+        for i, currency in enumerate(unique.tolist()):
+            rows = inverse == i
+            iso_currency, factor = normalize_currency(currency)
+            if iso_currency == base:
+                rates[rows] = factor
+                continue
+            series = self.get_series(iso_currency, base)
+            index = np.searchsorted(series.timestamp, timestamps[rows], "right") - 1
+            found = index >= 0
+            group_rates = np.full(len(index), np.nan, dtype=np.float64)
+            group_rates[found] = series.close[index[found]] * factor
+            rates[rows] = group_rates
+        return rates
+
+    async def convert_transactions(
+        self,
+        df: pd.DataFrame,
+        base: str = DEFAULT_BASE_CURRENCY,
+        *,
+        client: AsyncClient,
+        currency_column: str = "currency",
+        date_column: str = "open_date",
+        columns: tp.Sequence[str] = ("open_rate", "commission"),
+    ) -> pd.DataFrame:
+        """Convert the amounts of a transactions frame to `base`.
+
+        Each row is converted at the rate of its `date_column`, `columns` missing
+        from the frame are ignored.
+
+        Returns:
+            a copy of `df`, with `currency_column` set to `base`.
+        """
+        timestamps = to_unix_seconds(df[date_column])
+        currencies = df[currency_column].fillna(base).to_numpy()
+        if len(timestamps):
+            await self.load(
+                pd.unique(currencies),
+                base,
+                client=client,
+                start=int(timestamps.min()),
+                end=int(timestamps.max()),
+            )
+        rates = self.get_rates(currencies, base, timestamps)
+        df = df.copy()
+        for column in columns:
+            if column in df:
+                df[column] = df[column].to_numpy(dtype=np.float64) * rates
+        df[currency_column] = base
+        return df
+
+    async def convert_bars(
+        self,
+        bars: Bars,
+        currency: str,
+        base: str = DEFAULT_BASE_CURRENCY,
+        *,
+        client: AsyncClient,
+    ) -> Bars:
+        """Convert the prices (not the volume) of bars to `base`."""
+        if len(bars):
+            await self.load(
+                [currency],
+                base,
+                client=client,
+                start=int(bars.timestamp[0]),
+                end=int(bars.timestamp[-1]),
+            )
+        rates = self.get_rates(currency, base, bars.timestamp)
+        values = bars.values.copy()
+        values[:, _PRICE_FIELDS] *= rates[:, None]
+        return Bars(bars.timestamp, values, interval=bars.interval)
+
+    async def convert_panel(
+        self,
+        panel: BarsPanel,
+        currencies: tp.Mapping[str, str],
+        base: str = DEFAULT_BASE_CURRENCY,
+        *,
+        client: AsyncClient,
+    ) -> BarsPanel:
+        """Convert the prices of a panel to `base`, given the currency of each ticker.
+
+        Tickers missing from `currencies` are assumed to be quoted in `base`.
+        """
+        ticker_currencies = [currencies.get(t) or base for t in panel.tickers]
+        if len(panel):
+            await self.load(
+                set(ticker_currencies),
+                base,
+                client=client,
+                start=int(panel.timestamp[0]),
+                end=int(panel.timestamp[-1]),
+            )
+        # one (n_timestamps,) rate series per currency, broadcast to its tickers
+        rates = np.ones((len(panel.timestamp), len(panel.tickers)), dtype=np.float64)
+        for currency in set(ticker_currencies):
+            columns = [i for i, c in enumerate(ticker_currencies) if c == currency]
+            rates[:, columns] = self.get_rates(currency, base, panel.timestamp)[:, None]
+        values = panel.values.copy()
+        values[:, :, _PRICE_FIELDS] *= rates[:, :, None]
+        return BarsPanel(
+            panel.timestamp, panel.tickers, values, interval=panel.interval
+        )
+
+
+_fx_rates: tp.Optional[FXRates] = None
+
+
+def get_fx_rates() -> FXRates:
+    """Get the shared FX rates, reused by all portfolios."""
+    global _fx_rates
+    if _fx_rates is None:
+        _fx_rates = FXRates()
+    return _fx_rates
+
+
+def set_fx_rates(fx_rates: FXRates) -> None:
+    """Replace the shared FX rates (e.g. with rates backed by a bar cache)."""
+    global _fx_rates
+    _fx_rates = fx_rates
@@ -0,0 +1,267 @@
+import atexit
+import json
+import logging
+import os
+import time
+import typing as tp
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from finvestor.utils.paths import get_cache_dir
+from finvestor.yahoo_finance.utils import (
+    ValidInterval,
+    YFBarsRequestParams,
+    get_requested_days,
+)
+
+if tp.TYPE_CHECKING:  # pragma: no cover
+    from finvestor.yahoo_finance.registry import AssetRegistry
+
+logger = logging.getLogger(__name__)
+
+# upper bounds (in days) of the requested range buckets
+RANGE_BUCKETS: tp.Tuple[float, ...] = (1, 7, 30, 60, 730)
+DEFAULT_REJECTION_TTL = timedelta(days=7)
+# minimum seconds between two writes of the table, changes are flushed at exit
+DEFAULT_SAVE_INTERVAL = 10.0
+
+
+def get_range_bucket(params: YFBarsRequestParams) -> str:
+    days = get_requested_days(params)
+    for max_days in RANGE_BUCKETS:
+        if days <= max_days:
+            return f"{max_days}d"
+    return "max"
+
+
+def guess_asset_type(ticker: str) -> str:
+    """Guess the yahoo-finance asset type of a ticker from its symbol, e.g.
+    '^GSPC' is an 'INDEX', 'EURUSD=X' a 'CURRENCY' and 'BTC-USD' a
+    'CRYPTOCURRENCY', other tickers are guessed to be an 'EQUITY'.
+    """
+    if ticker.startswith("^"):
+        return "INDEX"
+    if ticker.endswith("=X"):
+        return "CURRENCY"
+    if ticker.endswith("=F"):
+        return "FUTURE"
+    if "-" in ticker and len(ticker.rsplit("-", 1)[1]) == 3:
+        return "CRYPTOCURRENCY"
+    return "EQUITY"
+
+
+class IntervalCapabilities:
+    """Persistent table of the intervals yahoo-finance rejects, per asset type and
+    requested range bucket.
+
+    Asset types are the yahoo-finance 'quoteType' of the tickers (e.g. 'EQUITY',
+    'ETF' or 'MUTUALFUND'), rejections are recorded with the asset type from the
+    metadata of the chart responses. Until a chart of a ticker is received, its
+    asset type is looked up in the asset `registry`, or guessed from its symbol
+    (see `guess_asset_type`), so that even the first request of a ticker skips the
+    known rejections.
+
+    An interval is only recorded as rejected (with a '422 Unprocessable Entity')
+    once a coarser interval succeeded for the same request, or other windows of
+    a chunked request succeeded with it, so that failures of a single ticker
+    (e.g. delisted) are not learned. Rejections expire after `ttl`, in case
+    yahoo-finance starts accepting the interval.
+
+    Changes are written at most every `save_interval` seconds (and at exit, or
+    with `flush`).
+
+    Args:
+        path: Optional path to the json table, defaults to
+            '<cache_dir>/intervals.json'
+        ttl: time to live of a recorded rejection.
+        registry: Optional asset registry, to look up the asset type of tickers
+            without a known chart.
+        save_interval: minimum seconds between two writes of the table.
+    """
+
+    def __init__(
+        self,
+        path: tp.Union[None, str, Path] = None,
+        *,
+        ttl: timedelta = DEFAULT_REJECTION_TTL,
+        registry: tp.Optional["AssetRegistry"] = None,
+        save_interval: float = DEFAULT_SAVE_INTERVAL,
+    ) -> None:
+        self.path = (
+            Path(path) if path is not None else get_cache_dir() / "intervals.json"
+        )
+        self.ttl = ttl
+        self.registry = registry
+        self.save_interval = save_interval
+        self._data: tp.Optional[tp.Dict[str, tp.Dict[str, tp.Any]]] = None
+        self._dirty = False
+        self._saved_at = float("-inf")
+        self._flush_at_exit = False
+
+    @staticmethod
+    def get_key(asset_type: str, params: YFBarsRequestParams) -> str:
+        return f"{asset_type}/{get_range_bucket(params)}"
+
+    @property
+    def data(self) -> tp.Dict[str, tp.Dict[str, tp.Any]]:
+        if self._data is None:
+            try:
+                data = json.loads(self.path.read_text())
+            except FileNotFoundError:
+                data = {}
+            except (OSError, ValueError) as error:
+                logger.warning(f"Failed to read interval table '{self.path}': {error}")
+                data = {}
+            # tables keyed by guessed asset types (no 'rejected' section) are reset
+            self._data = {
+                "rejected": data.get("rejected", {}),
+                "asset_types": data.get("asset_types", {}),
+            }
+        return self._data
+
+    @property
+    def table(self) -> tp.Dict[str, tp.Dict[str, int]]:
+        """key -> {rejected interval -> unix timestamp of the rejection}"""
+        return self.data["rejected"]
+
+    @property
+    def asset_types(self) -> tp.Dict[str, str]:
+        """ticker -> asset type"""
+        return self.data["asset_types"]
+
+    def rejected(self, key: str) -> tp.Set[str]:
+        min_rejected_at = time.time() - self.ttl.total_seconds()
+        return {
+            interval
+            for interval, rejected_at in self.table.get(key, {}).items()
+            if rejected_at >= min_rejected_at
+        }
+
+    def get_asset_type(self, ticker: str) -> str:
+        """Get the asset type of a ticker: from its charts, else from the asset
+        registry, else guessed from its symbol.
+        """
+        asset_type = self.asset_types.get(ticker)
+        if asset_type is None and self.registry is not None:
+            asset = self.registry.get(ticker)
+            asset_type = asset.type if asset is not None else None
+        return asset_type or guess_asset_type(ticker)
+
+    def rejected_for(self, ticker: str, params: YFBarsRequestParams) -> tp.Set[str]:
+        """Get the intervals known to be rejected for a ticker and request."""
+        return self.rejected(self.get_key(self.get_asset_type(ticker), params))
+
+    def resolve(
+        self,
+        ticker: str,
+        params: YFBarsRequestParams,
+        valid_intervals: tp.Sequence[ValidInterval],
+    ) -> tp.Tuple[ValidInterval, ...]:
+        """Drop the intervals known to be rejected from `valid_intervals`."""
+        rejected = self.rejected_for(ticker, params)
+        intervals = tuple(i for i in valid_intervals if i not in rejected)
+        # keep the coarsest interval as a last resort
+        return intervals or tuple(valid_intervals[-1:])
+
+    def record(
+        self,
+        ticker: str,
+        params: YFBarsRequestParams,
+        *,
+        asset_type: tp.Optional[str],
+        rejected: tp.Sequence[ValidInterval],
+        accepted: tp.Optional[ValidInterval] = None,
+    ) -> None:
+        """Record the intervals rejected (before `accepted` succeeded).
+
+        Args:
+            asset_type: asset type of the ticker, from its chart response, nothing
+                is recorded if it is unknown.
+        """
+        if not asset_type:
+            return
+        changed = self.asset_types.get(ticker) != asset_type
+        self.asset_types[ticker] = asset_type
+        key = self.get_key(asset_type, params)
+        intervals = self.table.get(key, {})
+        if accepted is not None and intervals.pop(accepted, None) is not None:
+            changed = True
+        # known rejections are only refreshed once half of their ttl is over
+        refresh_before = time.time() - self.ttl.total_seconds() / 2
+        rejected = [i for i in rejected if intervals.get(i, 0) < refresh_before]
+        if rejected:
+            now = int(time.time())
+            intervals.update({interval: now for interval in rejected})
+            changed = True
+            logger.debug(
+                f"[YF] ({key}) learned rejected intervals {list(rejected)}, "
+                f"accepted: {accepted}."
+            )
+        if changed:
+            self.table[key] = intervals
+            self._changed()
+
+    def _changed(self) -> None:
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+        elif not self._flush_at_exit:
+            atexit.register(self.flush)
+            self._flush_at_exit = True
+
+    def flush(self) -> None:
+        """Write the pending changes of the table."""
+        if self._dirty:
+            self.save()
+
+    def save(self) -> None:
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp_path.write_text(json.dumps(self.data, indent=2, sort_keys=True))
+            tmp_path.replace(self.path)
+        except OSError as error:
+            logger.warning(f"Failed to write interval table '{self.path}': {error}")
+
+    def clear(self) -> None:
+        self._data = {"rejected": {}, "asset_types": {}}
+        self.save()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Rejected intervals, one row per (asset type, range bucket, interval)."""
+        rows = [
+            (
+                *key.split("/", 1),
+                interval,
+                pd.Timestamp(rejected_at, unit="s", tz="UTC"),
+            )
+            for key, intervals in self.table.items()
+            for interval, rejected_at in intervals.items()
+        ]
+        return pd.DataFrame(
+            rows, columns=["asset_type", "range", "interval", "rejected_at"]
+        )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path='{self.path}', keys={len(self.table)})"
+
+
+_capabilities: tp.Optional[IntervalCapabilities] = None
+
+
+def get_interval_capabilities() -> IntervalCapabilities:
+    """Get the shared interval table used to resolve 'auto' intervals."""
+    global _capabilities
+    if _capabilities is None:
+        _capabilities = IntervalCapabilities()
+    return _capabilities
+
+
+def set_interval_capabilities(capabilities: IntervalCapabilities) -> None:
+    """Replace the shared interval table used to resolve 'auto' intervals."""
+    global _capabilities
+    _capabilities = capabilities
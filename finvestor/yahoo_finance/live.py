@@ -0,0 +1,383 @@
+import asyncio
+import inspect
+import logging
+import time
+import typing as tp
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+from httpx import AsyncClient, HTTPError
+from pydantic import BaseModel
+
+from finvestor.schemas.bar import BAR_FIELDS, Bar, Bars
+from finvestor.utils.metrics import get_metrics
+from finvestor.yahoo_finance.bars import (
+    YahooFinanceEmptyResponse,
+    get_yahoo_finance_ticker_ohlc,
+)
+from finvestor.yahoo_finance.utils import (
+    MAX_REQUEST_DAYS,
+    ValidInterval,
+    YFBarsRequestParams,
+    extract_tickers_list,
+    get_candle_duration,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 1024
+# yahoo-finance publishes a closed candle a few seconds after its boundary
+DEFAULT_POLL_DELAY = 2.0
+DEFAULT_LATENCY_WINDOW = 1024
+
+BarEventKind = tp.Literal["new", "update"]
+
+
+class BarEvent(BaseModel):
+    """Change of the bars of a ticker.
+
+    'new': a new bar was appended, the previous bar is closed. `latency` is the
+        delay (in seconds) between the close of the previous candle (its start
+        plus the interval, at the latest the open of the new bar) and the event.
+    'update': the last (still forming) bar was patched in place.
+    """
+
+    ticker: str
+    kind: BarEventKind
+    bar: Bar
+    latency: tp.Optional[float] = None
+
+
+class BarRingBuffer:
+    """Fixed capacity ring buffer of the latest bars of a ticker.
+
+    Bars are stored in preallocated numpy arrays, the oldest bars are overwritten
+    once `capacity` is reached, and the last bar can be patched in place.
+
+    Args:
+        capacity: maximum number of bars kept.
+        interval: interval of the bars.
+    """
+
+    def __init__(self, capacity: int, *, interval: ValidInterval) -> None:
+        if capacity < 1:
+            raise ValueError(f"Invalid capacity={capacity}.")
+        self.capacity = capacity
+        self.interval = interval
+        self.step = get_candle_duration(interval)
+        self._timestamp = np.zeros(capacity, dtype=np.int64)
+        # start of the candles, the timestamp of a forming bar may be later
+        self._opened = np.zeros(capacity, dtype=np.int64)
+        self._values = np.full((capacity, len(BAR_FIELDS)), np.nan)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(interval={self.interval}, "
+            f"len={self._size}, capacity={self.capacity})"
+        )
+
+    @property
+    def last_timestamp(self) -> tp.Optional[int]:
+        if not self._size:
+            return None
+        return int(self._timestamp[(self._start + self._size - 1) % self.capacity])
+
+    @property
+    def last_opened(self) -> tp.Optional[int]:
+        """Start of the candle of the last bar."""
+        if not self._size:
+            return None
+        return int(self._opened[(self._start + self._size - 1) % self.capacity])
+
+    def _order(self) -> np.ndarray:
+        return (self._start + np.arange(self._size)) % self.capacity
+
+    def _append(self, timestamp: int, values: np.ndarray) -> int:
+        if self._size < self.capacity:
+            index = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._timestamp[index] = self._opened[index] = timestamp
+        self._values[index] = values
+        return index
+
+    def update(self, bars: Bars) -> tp.List[tp.Tuple[BarEventKind, int]]:
+        """Merge `bars` (sorted, newest candles) into the buffer.
+
+        A bar less than one interval after the start of the last candle patches
+        it, timestamp included (the last bar of yahoo-finance is updated until the
+        candle closes), newer bars are appended, older bars patch the bar of the
+        candle starting at the same time if kept. Bars without a close price are
+        skipped.
+
+        Returns:
+            list of `(kind, physical index)` of the changed bars.
+        """
+        valid = ~np.isnan(bars.close)
+        timestamp, values = bars.timestamp[valid], bars.values[valid]
+        changes: tp.List[tp.Tuple[BarEventKind, int]] = []
+        if not len(timestamp):
+            return changes
+
+        if not self._size:
+            # bulk fill, only the latest `capacity` bars are kept
+            timestamp, values = timestamp[-self.capacity :], values[-self.capacity :]
+            n = len(timestamp)
+            self._timestamp[:n] = self._opened[:n] = timestamp
+            self._values[:n] = values
+            self._start, self._size = 0, n
+            return [("new", i) for i in range(n)]
+
+        order: tp.Optional[np.ndarray] = None
+        for ts, row in zip(timestamp.tolist(), values):
+            last_index = (self._start + self._size - 1) % self.capacity
+            opened = int(self._opened[last_index])
+            if ts >= opened + self.step:
+                changes.append(("new", self._append(ts, row)))
+                order = None
+                continue
+            if ts >= opened:
+                index = last_index
+            else:
+                if order is None:
+                    order = self._order()
+                position = int(np.searchsorted(self._opened[order], ts))
+                if position >= self._size or self._opened[order[position]] != ts:
+                    continue
+                index = int(order[position])
+            if self._timestamp[index] != ts or not np.array_equal(
+                self._values[index], row, equal_nan=True
+            ):
+                self._timestamp[index] = ts
+                self._values[index] = row
+                changes.append(("update", index))
+        return changes
+
+    def get_previous_close(self, index: int) -> int:
+        """Close time of the candle before the bar at physical `index`.
+
+        The start of the previous candle plus one interval, the start of the bar
+        at `index` if the previous bar is no longer kept.
+        """
+        if index == self._start:
+            return int(self._opened[index])
+        return int(self._opened[(index - 1) % self.capacity]) + self.step
+
+    def get_bar(self, index: int) -> Bar:
+        return Bar(
+            timestamp=datetime.fromtimestamp(self._timestamp[index], tz=timezone.utc),
+            interval=self.interval,
+            **dict(zip(BAR_FIELDS, self._values[index].tolist())),
+        )
+
+    @property
+    def bars(self) -> Bars:
+        """Copy of the buffered bars, oldest first."""
+        order = self._order()
+        return Bars(self._timestamp[order], self._values[order], interval=self.interval)
+
+
+def get_next_boundary(now: float, period: float) -> float:
+    """Get the first multiple of `period` (unix seconds) after `now`."""
+    return (now // period + 1) * period
+
+
+Subscriber = tp.Callable[[BarEvent], tp.Union[None, tp.Awaitable[None]]]
+
+
+class LiveBarsPoller:
+    """Keep the bars of many tickers current, polling only the newest candles.
+
+    Polls are aligned to the multiples of `poll_period` (by default the interval
+    duration, e.g. every minute at hh:mm:00 + `delay` for '1m' bars). Each poll
+    requests bars from the start of the last buffered bar, merges them into the
+    ticker ring buffer and emits `BarEvent`s to the subscribers.
+
+    Args:
+        tickers: tickers to poll (list or comma separated).
+        client: httpx client.
+        interval: interval of the bars.
+        capacity: number of bars kept per ticker, also the size of the initial
+            history loaded.
+        poll_period: Optional seconds between polls, defaults to the interval.
+        delay: seconds waited after each boundary, for yahoo-finance to publish
+            the closed candle.
+        include_prepost: include pre and post market bars.
+    """
+
+    def __init__(
+        self,
+        tickers: tp.Union[str, tp.List[str]],
+        *,
+        client: AsyncClient,
+        interval: ValidInterval,
+        capacity: int = DEFAULT_CAPACITY,
+        poll_period: tp.Optional[float] = None,
+        delay: float = DEFAULT_POLL_DELAY,
+        include_prepost: tp.Optional[bool] = None,
+    ) -> None:
+        if interval.endswith("mo"):
+            # months have no fixed duration to detect new candles
+            raise ValueError(f"Live bars are not supported for interval '{interval}'.")
+        self.tickers = extract_tickers_list(tickers)
+        self.client = client
+        self.interval = interval
+        self.capacity = capacity
+        self.step = get_candle_duration(interval)
+        self.poll_period = poll_period or self.step
+        self.delay = delay
+        self.include_prepost = include_prepost
+        self.buffers = {
+            ticker: BarRingBuffer(capacity, interval=interval)
+            for ticker in self.tickers
+        }
+        self.latencies: tp.Deque[float] = deque(maxlen=DEFAULT_LATENCY_WINDOW)
+        self._subscribers: tp.List[Subscriber] = []
+        self._stop_event: tp.Optional[asyncio.Event] = None
+
+    @property
+    def _stop(self) -> asyncio.Event:
+        # created lazily, to be bound to the running event loop
+        if self._stop_event is None:
+            self._stop_event = asyncio.Event()
+        return self._stop_event
+
+    def __getitem__(self, ticker: str) -> Bars:
+        return self.buffers[ticker].bars
+
+    def subscribe(self, callback: Subscriber) -> tp.Callable[[], None]:
+        """Call `callback` (sync or async) on every event.
+
+        Returns:
+            function removing the subscription.
+        """
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    async def events(self, maxsize: int = 0) -> tp.AsyncIterator[BarEvent]:
+        """Iterate over the events, until the poller is stopped."""
+        queue: "asyncio.Queue[tp.Optional[BarEvent]]" = asyncio.Queue(maxsize)
+        unsubscribe = self.subscribe(queue.put)
+        stop_task = asyncio.ensure_future(self._stop.wait())
+        try:
+            while not self._stop.is_set():
+                get_task = asyncio.ensure_future(queue.get())
+                await asyncio.wait(
+                    {get_task, stop_task}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not get_task.done():
+                    get_task.cancel()
+                    break
+                event = get_task.result()
+                if event is not None:
+                    yield event
+        finally:
+            unsubscribe()
+            stop_task.cancel()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def latency_stats(self) -> tp.Dict[str, float]:
+        """Close-to-event latency (seconds) statistics of the latest new bars."""
+        if not self.latencies:
+            return {}
+        latencies = np.fromiter(self.latencies, dtype=np.float64)
+        return {
+            "count": len(latencies),
+            "p50": float(np.percentile(latencies, 50)),
+            "p99": float(np.percentile(latencies, 99)),
+            "max": float(latencies.max()),
+        }
+
+    async def _emit(self, event: BarEvent) -> None:
+        for callback in list(self._subscribers):
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception(f"[LIVE] subscriber failed on event: {event}")
+
+    async def poll_ticker(self, ticker: str, *, initial: bool = False) -> int:
+        """Fetch the newest bars of a ticker and emit its changes.
+
+        Returns:
+            number of emitted events.
+        """
+        buffer = self.buffers[ticker]
+        now = time.time()
+        last_opened = buffer.last_opened
+        if last_opened is None:
+            history = self.capacity * self.step
+            max_days = MAX_REQUEST_DAYS.get(self.interval)
+            if max_days is not None:
+                history = min(history, int(max_days * 24 * 3600))
+            start = int(now) - history
+        else:
+            # the candle of the last bar may have been updated since
+            start = last_opened
+        params = YFBarsRequestParams(
+            interval=self.interval,
+            start=start,
+            end=int(now),
+            include_prepost=self.include_prepost,
+        )
+        try:
+            ohlc = await get_yahoo_finance_ticker_ohlc(
+                ticker, params=params, client=self.client
+            )
+        except YahooFinanceEmptyResponse:
+            return 0
+        changes = buffer.update(Bars.from_ohlc(ohlc, interval=self.interval))
+        if initial:
+            # the history is loaded silently
+            return 0
+
+        metrics = get_metrics()
+        received_at = time.time()
+        for kind, index in changes:
+            bar = buffer.get_bar(index)
+            latency = None
+            if kind == "new":
+                latency = max(received_at - buffer.get_previous_close(index), 0.0)
+                self.latencies.append(latency)
+                metrics.observe("finvestor_live_close_latency_seconds", latency)
+            metrics.increment("finvestor_live_events_total", kind=kind)
+            await self._emit(
+                BarEvent(ticker=ticker, kind=kind, bar=bar, latency=latency)
+            )
+        return len(changes)
+
+    async def poll(self, *, initial: bool = False) -> None:
+        """Poll all tickers once (concurrently)."""
+        results = await asyncio.gather(
+            *[self.poll_ticker(t, initial=initial) for t in self.tickers],
+            return_exceptions=True,
+        )
+        for ticker, result in zip(self.tickers, results):
+            if isinstance(result, HTTPError):
+                logger.error(f"[LIVE] (ticker='{ticker}') poll failed: {result}")
+            elif isinstance(result, BaseException):
+                raise result
+
+    async def run(self) -> None:
+        """Load the initial history, then poll on each boundary until stopped."""
+        self._stop.clear()
+        await self.poll(initial=True)
+        while not self._stop.is_set():
+            wake_at = get_next_boundary(time.time(), self.poll_period) + self.delay
+            try:
+                await asyncio.wait_for(
+                    self._stop.wait(), timeout=max(wake_at - time.time(), 0)
+                )
+            except asyncio.TimeoutError:
+                await self.poll()
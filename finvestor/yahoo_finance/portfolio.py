@@ -9,7 +9,9 @@ from rich.progress import track
 
 from finvestor.schemas.asset import Asset
 from finvestor.schemas.transaction import Transactions
-from finvestor.yahoo_finance.scrapper import get_asset
+from finvestor.utils.executor import get_cpu_executor
+from finvestor.yahoo_finance.registry import AssetRegistry
+from finvestor.yahoo_finance.scrapper import get_asset, get_quotes
 
 YF_CSV_QUOTES_DROP_COLS = [
     "Current Price",
@@ -33,7 +35,12 @@ YF_CSV_QUOTES_RENAME_COLS = {
 }
 
 
-async def load_yf_csv_quotes(filepath: str, *, client: AsyncClient) -> Transactions:
+async def load_yf_csv_quotes(
+    filepath: str,
+    *,
+    client: AsyncClient,
+    registry: tp.Optional[AssetRegistry] = None,
+) -> Transactions:
     async with await open_file(filepath, "rb") as file:
         contents = await file.read()
     df = pd.read_csv(io.BytesIO(contents))
@@ -47,19 +54,42 @@ async def load_yf_csv_quotes(filepath: str, *, client: AsyncClient) -> Transacti
     # convert open_date to datetime.
     df["open_date"] = pd.to_datetime(df["open_date"], utc=True, format="%Y%m%d")
     # load asset information from yahoo finance
-    assets = await load_assets(df.ticker.unique(), client=client)
+    assets = await load_assets(df.ticker.unique(), client=client, registry=registry)
     # map an asset for each ticker
     df["asset"] = df["ticker"].map({asset.ticker: asset for asset in assets})
-    return Transactions(__root__=df.to_dict(orient="records"))
+    # prices are quoted in the currency of the asset, when yahoo-finance knows it
+    df["currency"] = df["asset"].map(lambda asset: asset.currency).fillna("USD")
+    # pydantic validation of every transaction runs in the cpu executor
+    return await get_cpu_executor().run(
+        Transactions.build, df.to_dict(orient="records")
+    )
 
 
-async def load_assets(tickers: tp.List[str], *, client: AsyncClient) -> tp.List[Asset]:
-    tasks = [get_asset(ticker, client=client) for ticker in tickers]
-    return [
-        await task
-        for task in track(
-            asyncio.as_completed(tasks),
-            description=f"[green]Loading {len(tasks)} Assets info from yahoo-finance",
-            total=len(tasks),
-        )
+async def load_assets(
+    tickers: tp.List[str],
+    *,
+    client: AsyncClient,
+    registry: tp.Optional[AssetRegistry] = None,
+) -> tp.List[Asset]:
+    cached = registry.get_many(tickers) if registry is not None else {}
+    missing = [ticker for ticker in tickers if ticker not in cached]
+    if not missing:
+        return list(cached.values())
+
+    quotes = await get_quotes(missing, client=client)
+    tasks = [
+        get_asset(ticker, client=client, quote=quotes.get(ticker)) for ticker in missing
     ]
+    progress = track(
+        asyncio.as_completed(tasks),
+        description=f"[green]Loading {len(tasks)} Assets info from yahoo-finance",
+        total=len(tasks),
+    )
+    try:
+        assets = [await task for task in progress]
+    finally:
+        # stops the progress display thread, even if a task failed
+        progress.close()  # type: ignore
+    if registry is not None:
+        registry.put(assets)
+    return list(cached.values()) + assets
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+import typing as tp
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from httpx import AsyncClient
+
+from finvestor.schemas.bar import Bars
+from finvestor.yahoo_finance.bars import get_yahoo_finance_ticker_bars
+from finvestor.yahoo_finance.utils import (
+    Timestamps,
+    get_candle_duration,
+    to_unix_seconds,
+)
+
+logger = logging.getLogger(__name__)
+
+# bars fetched before the first timestamp, to find a price on weekends/holidays
+PRICE_LOOKBACK = timedelta(days=7)
+
+
+def lookup_prices(bars: Bars, timestamps: np.ndarray) -> np.ndarray:
+    """Vectorized as-of lookup of the price of each (unix seconds) timestamp.
+
+    The price at a timestamp is the open of the bar it falls in, or the close of
+    the last bar if it falls after it (e.g. on weekends). Timestamps before the
+    first bar have a NaN price.
+    """
+    valid = ~(np.isnan(bars.open) | np.isnan(bars.close))
+    bar_timestamp = bars.timestamp[valid]
+    prices = np.full(len(timestamps), np.nan, dtype=np.float64)
+    if not len(bar_timestamp):
+        return prices
+
+    index = np.searchsorted(bar_timestamp, timestamps, side="right") - 1
+    found = index >= 0
+    index = index[found]
+    bar_end = bar_timestamp[index] + get_candle_duration(bars.interval)
+    prices[found] = np.where(
+        timestamps[found] < bar_end,
+        bars.open[valid][index],
+        bars.close[valid][index],
+    )
+    return prices
+
+
+async def get_prices_at_timestamps(
+    ticker: str, timestamps: Timestamps, *, client: AsyncClient
+) -> np.ndarray:
+    """Get the price of a ticker at many timestamps, using a single bars request.
+
+    One bar range covering all timestamps is fetched at the finest interval
+    yahoo-finance accepts for it, then every timestamp is resolved at once.
+
+    Args:
+        ticker: yahoo-finance ticker.
+        timestamps: timezone aware timestamps.
+        client: httpx AsyncClient
+
+    Returns:
+        np.ndarray: float64 prices, NaN for timestamps without a price.
+    """
+    seconds = to_unix_seconds(timestamps)
+    if not len(seconds):
+        return np.empty(0, dtype=np.float64)
+
+    now = int(time.time())
+    start = int(seconds.min() - PRICE_LOOKBACK.total_seconds())
+    end = min(int(seconds.max()) + 24 * 3600, now)
+    bars = await get_yahoo_finance_ticker_bars(
+        ticker,
+        client=client,
+        interval="auto",
+        start=datetime.fromtimestamp(start, tz=timezone.utc),
+        end=datetime.fromtimestamp(end, tz=timezone.utc),
+    )
+    logger.debug(
+        f"[YF] (ticker='{ticker}') resolving {len(seconds)} price(s) from "
+        f"{len(bars)} '{bars.interval}' bars."
+    )
+    return lookup_prices(bars, seconds)
+
+
+async def get_prices(
+    timestamps: tp.Mapping[str, Timestamps], *, client: AsyncClient
+) -> tp.Dict[str, np.ndarray]:
+    """Get prices of many tickers, with one bars request per ticker."""
+    prices = await asyncio.gather(
+        *[
+            get_prices_at_timestamps(ticker, ticker_timestamps, client=client)
+            for ticker, ticker_timestamps in timestamps.items()
+        ]
+    )
+    return dict(zip(timestamps, prices))
+
+
+async def get_price_at_timestamp(
+    ticker: str, *, client: AsyncClient, timestamp: datetime
+) -> float:
+    prices = await get_prices_at_timestamps(ticker, [timestamp], client=client)
+    return float(prices[0])
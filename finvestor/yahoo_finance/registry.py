@@ -0,0 +1,130 @@
+import logging
+import sqlite3
+import time
+import typing as tp
+from datetime import timedelta
+from pathlib import Path
+
+from httpx import AsyncClient
+
+from finvestor.schemas.asset import Asset
+from finvestor.utils.paths import get_cache_dir
+from finvestor.yahoo_finance.scrapper import get_asset, get_assets
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    ticker TEXT PRIMARY KEY,
+    isin TEXT,
+    data TEXT NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assets_isin ON assets (isin);
+"""
+DEFAULT_ASSET_TTL = timedelta(days=30)
+
+
+class AssetRegistry:
+    """Persistent SQLite registry of `Asset` records.
+
+    Assets older than `ttl` are considered expired and are fetched again from
+    yahoo-finance on the next lookup.
+
+    Args:
+        path: Optional path to the sqlite database, defaults to
+            '<cache_dir>/assets.sqlite'
+        ttl: time to live of a cached asset.
+    """
+
+    def __init__(
+        self,
+        path: tp.Union[None, str, Path] = None,
+        *,
+        ttl: timedelta = DEFAULT_ASSET_TTL,
+    ) -> None:
+        self.path = (
+            Path(path) if path is not None else get_cache_dir() / "assets.sqlite"
+        )
+        self.ttl = ttl
+        self._conn: tp.Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @property
+    def _min_updated_at(self) -> int:
+        return int(time.time() - self.ttl.total_seconds())
+
+    def get(self, ticker: str) -> tp.Optional[Asset]:
+        """Get a (non expired) asset by ticker."""
+        return self.get_many([ticker]).get(ticker)
+
+    def get_many(self, tickers: tp.Iterable[str]) -> tp.Dict[str, Asset]:
+        """Get all (non expired) assets of the given tickers, by ticker."""
+        tickers = list(dict.fromkeys(tickers))
+        assets: tp.Dict[str, Asset] = {}
+        # stay under sqlite's default limit of 999 query variables
+        for i in range(0, len(tickers), 900):
+            chunk = tickers[i : i + 900]
+            rows = self.conn.execute(
+                "SELECT ticker, data FROM assets WHERE updated_at >= ? "
+                f"AND ticker IN ({', '.join('?' for _ in chunk)})",
+                (self._min_updated_at, *chunk),
+            ).fetchall()
+            assets.update({ticker: Asset.parse_raw(data) for ticker, data in rows})
+        return assets
+
+    def get_by_isin(self, isin: str) -> tp.List[Asset]:
+        """Get all (non expired) assets with the given ISIN."""
+        rows = self.conn.execute(
+            "SELECT data FROM assets WHERE isin = ? AND updated_at >= ? "
+            "ORDER BY ticker",
+            (isin, self._min_updated_at),
+        ).fetchall()
+        return [Asset.parse_raw(data) for data, in rows]
+
+    def put(self, assets: tp.Iterable[Asset]) -> None:
+        now = int(time.time())
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)",
+                ((asset.ticker, asset.isin, asset.json(), now) for asset in assets),
+            )
+
+    def missing(self, tickers: tp.Iterable[str]) -> tp.List[str]:
+        """Get the tickers that have no (or an expired) asset in the registry."""
+        tickers = list(dict.fromkeys(tickers))
+        cached = self.get_many(tickers)
+        return [ticker for ticker in tickers if ticker not in cached]
+
+    async def get_asset(self, ticker: str, *, client: AsyncClient) -> Asset:
+        """Get an asset from the registry, or from yahoo-finance if missing."""
+        asset = self.get(ticker)
+        if asset is None:
+            asset = await get_asset(ticker, client=client)
+            self.put([asset])
+        return asset
+
+    async def warm_up(
+        self, tickers: tp.Iterable[str], *, client: AsyncClient
+    ) -> tp.List[Asset]:
+        """Fetch (in bulk) all missing or expired assets of the given tickers."""
+        tickers = list(dict.fromkeys(tickers))
+        assets = self.get_many(tickers)
+        missing = [ticker for ticker in tickers if ticker not in assets]
+        if missing:
+            logger.debug(f"[AssetRegistry] fetching {len(missing)} missing asset(s).")
+            fetched = await get_assets(missing, client=client)
+            self.put(fetched)
+            assets.update({asset.ticker: asset for asset in fetched})
+        return [assets[ticker] for ticker in tickers]
@@ -0,0 +1,162 @@
+import asyncio
+import time
+import typing as tp
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+from finvestor.utils.metrics import get_metrics
+
+if tp.TYPE_CHECKING:  # pragma: no cover
+    from httpx import URL
+
+# host -> (requests per second, burst)
+DEFAULT_HOST_RATES: tp.Dict[str, tp.Tuple[float, int]] = {
+    "query2.finance.yahoo.com": (10.0, 10),
+    "finance.yahoo.com": (4.0, 4),
+    "markets.businessinsider.com": (4.0, 4),
+}
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class TokenBucket:
+    """Token bucket rate limiter.
+
+    Tokens are reserved in call order (the token count can go negative), so
+    waiters are served first come, first served.
+
+    Args:
+        rate: number of tokens added per second.
+        burst: maximum number of tokens in the bucket.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"Invalid token bucket: rate={rate}, burst={burst}")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+class RequestScheduler:
+    """Bounded-concurrency request scheduler with per-host rate limiting.
+
+    At most `max_concurrency` requests run at the same time, waiting requests are
+    served round-robin across keys (e.g. tickers) so that a ticker with many
+    requests can't starve the others. Once a slot is granted, requests to a host
+    listed in `host_rates` are additionally rate limited with a token bucket.
+
+    Args:
+        max_concurrency: maximum number of concurrent requests.
+        host_rates: mapping of host -> (requests per second, burst).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        host_rates: tp.Optional[tp.Mapping[str, tp.Tuple[float, int]]] = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError(f"Invalid max_concurrency: {max_concurrency}")
+        self.max_concurrency = max_concurrency
+        host_rates = DEFAULT_HOST_RATES if host_rates is None else host_rates
+        self._buckets = {
+            host: TokenBucket(rate, burst) for host, (rate, burst) in host_rates.items()
+        }
+        self._active = 0
+        self._waiters: "OrderedDict[str, tp.Deque[asyncio.Future]]" = OrderedDict()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def pending(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @asynccontextmanager
+    async def slot(
+        self, url: tp.Union[str, "URL"], *, key: str = ""
+    ) -> tp.AsyncIterator[None]:
+        """Wait for a free slot (and then a rate limit token) to request `url`."""
+        host = urlsplit(str(url)).hostname or ""
+        bucket = self._buckets.get(host)
+        metrics = get_metrics()
+        with metrics.timer("finvestor_scheduler_wait_seconds", wait="slot"):
+            await self._acquire(key)
+        try:
+            if bucket is not None:
+                with metrics.timer(
+                    "finvestor_scheduler_wait_seconds", wait="rate_limit", host=host
+                ):
+                    await bucket.acquire()
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, key: str) -> None:
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was handed over to us right before cancellation
+                self._release()
+            else:
+                self._remove_waiter(key, future)
+            raise
+
+    def _remove_waiter(self, key: str, future: asyncio.Future) -> None:
+        waiters = self._waiters.get(key)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(future)
+        except ValueError:
+            pass
+        if not waiters:
+            del self._waiters[key]
+
+    def _release(self) -> None:
+        # hand the slot over to the next waiting key (round-robin)
+        while self._waiters:
+            key, waiters = self._waiters.popitem(last=False)
+            future = waiters.popleft()
+            if waiters:
+                self._waiters[key] = waiters
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+
+_scheduler: tp.Optional[RequestScheduler] = None
+
+
+def get_scheduler() -> RequestScheduler:
+    """Get the shared request scheduler used by all yahoo-finance fetchers."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RequestScheduler()
+    return _scheduler
+
+
+def set_scheduler(scheduler: RequestScheduler) -> None:
+    """Replace the shared request scheduler used by all yahoo-finance fetchers."""
+    global _scheduler
+    _scheduler = scheduler
@@ -3,29 +3,59 @@ import json
 import logging
 import typing as tp
 
-from httpx import AsyncClient, ConnectTimeout, HTTPStatusError
-from tenacity import TryAgain, before_sleep_log, retry, wait_exponential, wait_random
+from httpx import AsyncClient, ConnectTimeout, HTTPError, HTTPStatusError
+from tenacity import (
+    TryAgain,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random,
+)
 
 from finvestor.schemas.asset import Asset
-from finvestor.yahoo_finance.utils import ISIN_URI, YF_QUOTE_URI, user_agent_header
+from finvestor.utils.metrics import get_metrics, traced
+from finvestor.yahoo_finance.scheduler import get_scheduler
+from finvestor.yahoo_finance.singleflight import single_flight
+from finvestor.yahoo_finance.utils import (
+    ISIN_URI,
+    YF_MAX_ATTEMPTS,
+    YF_QUOTE_API_URI,
+    YF_QUOTE_BATCH_SIZE,
+    YF_QUOTE_SUMMARY_URI,
+    YF_QUOTE_URI,
+    before_retry_sleep,
+    is_transient_error,
+    record_response,
+    user_agent_header,
+)
 
 logger = logging.getLogger(__name__)
 
 
+@single_flight(key=lambda ticker, **_: YF_QUOTE_URI.format(ticker=ticker))
 @retry(
     reraise=True,
+    retry=retry_if_exception(is_transient_error),
+    stop=stop_after_attempt(YF_MAX_ATTEMPTS),
     wait=wait_exponential(multiplier=1, min=4, max=10) + wait_random(0, 2),
-    before_sleep=before_sleep_log(logger, logging.DEBUG),
+    before_sleep=before_retry_sleep(logger),
+)
+@traced(
+    "yahoo_finance.quote_summary", attributes=lambda ticker, **_: {"ticker": ticker}
 )
 async def get_quote_summary(
     ticker: str, *, client: AsyncClient
 ) -> tp.Dict[str, tp.Any]:
 
+    url = YF_QUOTE_URI.format(ticker=ticker)
+    metrics = get_metrics()
     try:
-        resp = await client.get(
-            YF_QUOTE_URI.format(ticker=ticker), headers=user_agent_header()
-        )
+        async with get_scheduler().slot(url, key=ticker):
+            with metrics.timer("finvestor_http_request_seconds", endpoint="quote_page"):
+                resp = await client.get(url, headers=user_agent_header())
 
+        record_response(resp, endpoint="quote_page")
         resp.raise_for_status()
     except ConnectTimeout as error:
         logger.error(f"ConnectTimeout: {error}")
@@ -41,13 +71,14 @@ async def get_quote_summary(
             raise TryAgain(f"{str(error)}") from error
         raise error
 
-    data = json.loads(
-        resp.text.split("root.App.main =")[1]
-        .split("(this)")[0]
-        .split(";\n}")[0]
-        .strip()
-        .replace("{}", "null")
-    )
+    with metrics.timer("finvestor_parse_seconds", kind="quote_page"):
+        data = json.loads(
+            resp.text.split("root.App.main =")[1]
+            .split("(this)")[0]
+            .split(";\n}")[0]
+            .strip()
+            .replace("{}", "null")
+        )
     quote_symmary_store = (
         data.get("context", {})
         .get("dispatcher", {})
@@ -58,16 +89,28 @@ async def get_quote_summary(
     return quote_symmary_store
 
 
+@single_flight(key=lambda ticker, **_: (ISIN_URI, ticker))
+@retry(
+    reraise=True,
+    retry=retry_if_exception(is_transient_error),
+    stop=stop_after_attempt(YF_MAX_ATTEMPTS),
+    wait=wait_exponential(multiplier=1, min=4, max=10) + wait_random(0, 2),
+    before_sleep=before_retry_sleep(logger),
+)
+@traced("yahoo_finance.isin", attributes=lambda ticker, **_: {"ticker": ticker})
 async def get_isin(ticker: str, *, client: AsyncClient) -> tp.Optional[str]:
     if "-" in ticker or "^" in ticker:
         return None
-    resp = await client.get(
-        ISIN_URI,
-        params={
-            "max_results": "25",
-            "query": ticker,
-        },
-    )
+    async with get_scheduler().slot(ISIN_URI, key=ticker):
+        with get_metrics().timer("finvestor_http_request_seconds", endpoint="isin"):
+            resp = await client.get(
+                ISIN_URI,
+                params={
+                    "max_results": "25",
+                    "query": ticker,
+                },
+            )
+    record_response(resp, endpoint="isin")
     resp.raise_for_status()
 
     search_str = f'"{ticker}|'
@@ -76,7 +119,148 @@ async def get_isin(ticker: str, *, client: AsyncClient) -> tp.Optional[str]:
     return resp.text.split(search_str)[1].split('"')[0].split("|")[0]
 
 
-async def get_asset(ticker: str, *, client: AsyncClient) -> Asset:
+@single_flight(key=lambda tickers, **_: (YF_QUOTE_API_URI, tuple(tickers)))
+@retry(
+    reraise=True,
+    retry=retry_if_exception(is_transient_error),
+    stop=stop_after_attempt(YF_MAX_ATTEMPTS),
+    wait=wait_exponential(multiplier=1, min=4, max=10) + wait_random(0, 2),
+    before_sleep=before_retry_sleep(logger),
+)
+async def _get_quotes_batch(
+    tickers: tp.List[str], *, client: AsyncClient
+) -> tp.Dict[str, tp.Dict[str, tp.Any]]:
+    try:
+        async with get_scheduler().slot(YF_QUOTE_API_URI, key=tickers[0]):
+            with get_metrics().timer(
+                "finvestor_http_request_seconds", endpoint="quote"
+            ):
+                resp = await client.get(
+                    YF_QUOTE_API_URI,
+                    params={"symbols": ",".join(tickers)},
+                    headers=user_agent_header(),
+                )
+        record_response(resp, endpoint="quote")
+        resp.raise_for_status()
+    except ConnectTimeout as error:
+        logger.error(f"ConnectTimeout: {error}")
+        raise TryAgain(f"{str(error)}") from error
+    except HTTPStatusError as error:
+        # throttling and server errors are retried, instead of scraping the
+        # quote page of every ticker of the batch
+        if is_transient_error(error):
+            raise error
+        logger.error(f"Batch quote request failed for {tickers}: {error}")
+        return {}
+
+    result = (resp.json().get("quoteResponse", {}) or {}).get("result", []) or []
+    return {quote["symbol"]: quote for quote in result if "symbol" in quote}
+
+
+async def get_quotes(
+    tickers: tp.List[str], *, client: AsyncClient
+) -> tp.Dict[str, tp.Dict[str, tp.Any]]:
+    """Get the quotes of many tickers using yahoo-finance's JSON quote API.
+
+    Tickers are requested in batches of `YF_QUOTE_BATCH_SIZE` symbols, tickers
+    missing from the response are missing from the returned dict.
+    """
+    unique_tickers = list(dict.fromkeys(tickers))
+    batches = await asyncio.gather(
+        *[
+            _get_quotes_batch(
+                unique_tickers[i : i + YF_QUOTE_BATCH_SIZE], client=client
+            )
+            for i in range(0, len(unique_tickers), YF_QUOTE_BATCH_SIZE)
+        ]
+    )
+    return {ticker: quote for batch in batches for ticker, quote in batch.items()}
+
+
+@single_flight(key=lambda ticker, **_: YF_QUOTE_SUMMARY_URI.format(ticker=ticker))
+async def get_summary_profile(
+    ticker: str, *, client: AsyncClient
+) -> tp.Dict[str, tp.Any]:
+    url = YF_QUOTE_SUMMARY_URI.format(ticker=ticker)
+    try:
+        async with get_scheduler().slot(url, key=ticker):
+            with get_metrics().timer(
+                "finvestor_http_request_seconds", endpoint="quote_summary"
+            ):
+                resp = await client.get(
+                    url,
+                    params={"modules": "summaryProfile"},
+                    headers=user_agent_header(),
+                )
+        record_response(resp, endpoint="quote_summary")
+        resp.raise_for_status()
+    except HTTPError as error:
+        logger.error(f"Failed to get '{ticker}' summary profile: {error}")
+        return {}
+    result = (resp.json().get("quoteSummary", {}) or {}).get("result") or [{}]
+    return result[0].get("summaryProfile", {}) or {}
+
+
+@single_flight(key=lambda ticker, quote=None, **_: (ticker, quote is None))
+async def get_asset(
+    ticker: str,
+    *,
+    client: AsyncClient,
+    quote: tp.Optional[tp.Dict[str, tp.Any]] = None,
+) -> Asset:
+    """Get asset information of a ticker.
+
+    If a `quote` (from `get_quotes`) is given, only the (small) JSON summary
+    profile and the ISIN are requested, otherwise the quote page is scraped.
+    Concurrent calls for the same ticker share a single fetch.
+    """
+    if quote is None:
+        return await _get_scrapped_asset(ticker, client=client)
+
+    if quote.get("quoteType") == "EQUITY":
+        summary_profile, isin = await asyncio.gather(
+            get_summary_profile(ticker, client=client),
+            get_isin(ticker, client=client),
+        )
+    else:
+        summary_profile, isin = {}, await get_isin(ticker, client=client)
+
+    return Asset(
+        ticker=ticker,
+        name=quote.get("longName")
+        or quote.get("shortName")
+        or summary_profile.get("name"),
+        type=quote.get("quoteType"),
+        exchange_timezone=quote.get("exchangeTimezoneName"),
+        currency=quote.get("currency"),
+        country=summary_profile.get("country"),
+        exchange=quote.get("exchange"),
+        industry=summary_profile.get("industry"),
+        sector=summary_profile.get("sector"),
+        market=quote.get("market"),
+        isin=isin,
+    )
+
+
+async def get_assets(tickers: tp.List[str], *, client: AsyncClient) -> tp.List[Asset]:
+    """Get asset information of many tickers.
+
+    Uses the batch JSON quote API, and falls back to scraping the quote page for
+    tickers missing from the batch response.
+    """
+    unique_tickers = list(dict.fromkeys(tickers))
+    quotes = await get_quotes(unique_tickers, client=client)
+    assets = await asyncio.gather(
+        *[
+            get_asset(ticker, client=client, quote=quotes.get(ticker))
+            for ticker in unique_tickers
+        ]
+    )
+    by_ticker = dict(zip(unique_tickers, assets))
+    return [by_ticker[ticker] for ticker in tickers]
+
+
+async def _get_scrapped_asset(ticker: str, *, client: AsyncClient) -> Asset:
     summary, isin = await asyncio.gather(
         get_quote_summary(ticker, client=client), get_isin(ticker, client=client)
     )
@@ -0,0 +1,71 @@
+import asyncio
+import functools
+import logging
+import typing as tp
+
+logger = logging.getLogger(__name__)
+
+T = tp.TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into a single in-flight task.
+
+    While a call with a given key is running, other calls with the same key await
+    the same task (and get the same result or error) instead of starting a new
+    one. The key is forgotten as soon as the call finishes, results are not
+    cached. A caller being cancelled doesn't cancel the shared task.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: tp.Dict[tp.Hashable, asyncio.Task] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    async def run(
+        self, key: tp.Hashable, factory: tp.Callable[[], tp.Awaitable[T]]
+    ) -> T:
+        task = self._tasks.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        else:
+            logger.debug(f"[SingleFlight] joining in-flight call: {key}")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: tp.Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # the error is retrieved by the callers, if any are left
+        if not task.cancelled():
+            task.exception()
+
+
+def single_flight(
+    key: tp.Callable[..., tp.Hashable],
+) -> tp.Callable[
+    [tp.Callable[..., tp.Awaitable[T]]], tp.Callable[..., tp.Awaitable[T]]
+]:
+    """Decorate an async function so that concurrent identical calls are coalesced.
+
+    Args:
+        key: function called with the decorated function's arguments, returns
+            the key identifying identical calls.
+    """
+
+    def decorator(
+        func: tp.Callable[..., tp.Awaitable[T]],
+    ) -> tp.Callable[..., tp.Awaitable[T]]:
+        flight = SingleFlight()
+
+        @functools.wraps(func)
+        async def wrapper(*args: tp.Any, **kwargs: tp.Any) -> T:
+            return await flight.run(key(*args, **kwargs), lambda: func(*args, **kwargs))
+
+        wrapper.flight = flight  # type: ignore
+        return wrapper
+
+    return decorator
@@ -0,0 +1,10 @@
+import typing as tp
+
+# kept free of heavy imports, used to build the CLI options
+ValidInterval = tp.Literal[
+    "1m", "2m", "5m", "15m", "30m", "1h", "1d", "5d", "1mo", "3mo"
+]
+ValidPeriod = tp.Literal[
+    "1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd"
+]
+AutoValidInterval = tp.Union[tp.Literal["auto"], ValidInterval]
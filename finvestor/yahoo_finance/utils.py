@@ -1,24 +1,35 @@
+import logging
 import random
 import typing as tp
 from datetime import datetime, timezone
 
+import numpy as np
+import pandas as pd
+from httpx import HTTPStatusError, Response, TransportError
 from pydantic import BaseModel, Field, validator
 from pydantic.fields import ModelField
+from tenacity import RetryCallState, before_sleep_log
 
 from finvestor.utils.duration import parse_duration
+from finvestor.utils.metrics import get_metrics
+from finvestor.yahoo_finance.types import (
+    AutoValidInterval,
+    ValidInterval,
+    ValidPeriod,
+)
 
 YF_CHART_URI = "https://query2.finance.yahoo.com/v8/finance/chart/{ticker}"
 YF_QUOTE_URI = "https://finance.yahoo.com/quote/{ticker}"
+YF_QUOTE_API_URI = "https://query2.finance.yahoo.com/v7/finance/quote"
+YF_QUOTE_SUMMARY_URI = (
+    "https://query2.finance.yahoo.com/v10/finance/quoteSummary/{ticker}"
+)
+# maximum number of symbols per batch quote request
+YF_QUOTE_BATCH_SIZE = 50
+# maximum number of attempts of a request failing with a transient error
+YF_MAX_ATTEMPTS = 5
 ISIN_URI = "https://markets.businessinsider.com/ajax/SearchController_Suggest"
 
-ValidInterval = tp.Literal[
-    "1m", "2m", "5m", "15m", "30m", "1h", "1d", "5d", "1mo", "3mo"
-]
-ValidPeriod = tp.Literal[
-    "1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd"
-]
-AutoValidInterval = tp.Union[tp.Literal["auto"], ValidInterval]
-
 
 VALID_INTERVALS: tp.Tuple[ValidInterval, ...] = tp.get_args(ValidInterval)
 MAX_DAYS_TO_VALID_INTERVALS: tp.Dict[float, tp.Tuple[ValidInterval, ...]] = {
@@ -28,6 +39,12 @@ MAX_DAYS_TO_VALID_INTERVALS: tp.Dict[float, tp.Tuple[ValidInterval, ...]] = {
 }
 # by default smallest always valid interval is 1d
 DEFAULT_VALID_INTERVALS: tp.Tuple[ValidInterval, ...] = VALID_INTERVALS[6:]
+# maximum number of days of intraday bars returned by a single request
+MAX_REQUEST_DAYS: tp.Dict[ValidInterval, float] = {
+    "1m": 7,
+    **{interval: 59.9 for interval in VALID_INTERVALS[1:5]},
+    "1h": 729.9,
+}
 
 
 # List of user agent taken from:
@@ -43,6 +60,15 @@ USER_AGENT_LIST: tp.List[str] = [
 ]
 
 
+Timestamps = tp.Union[tp.Sequence[datetime], pd.Series, pd.DatetimeIndex]
+
+
+def to_unix_seconds(timestamps: Timestamps) -> np.ndarray:
+    """Convert timestamps (naive timestamps are UTC) to int64 unix seconds."""
+    index = pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True))
+    return index.asi8 // 10**9
+
+
 def user_agent_header() -> tp.Dict[str, str]:
     return {"User-Agent": random.choice(USER_AGENT_LIST)}
 
@@ -94,23 +120,107 @@ class YFBarsRequestParams(BaseModel):
         validate_assignment = True
 
 
-def get_valid_intervals(params: YFBarsRequestParams) -> tp.Tuple[ValidInterval, ...]:
+def get_requested_days(params: YFBarsRequestParams) -> int:
+    """Get how many days back (from now) bars are requested."""
     if params.period is not None:
         delta = parse_duration(params.period)
     elif params.start is not None:
-        delta = datetime.now(tz=timezone.utc) - datetime.fromtimestamp(params.start)
+        delta = datetime.now(tz=timezone.utc) - datetime.fromtimestamp(
+            params.start, tz=timezone.utc
+        )
+    return delta.days
+
 
+def get_valid_intervals(params: YFBarsRequestParams) -> tp.Tuple[ValidInterval, ...]:
+    days = get_requested_days(params)
     for max_days, valid_intervals in MAX_DAYS_TO_VALID_INTERVALS.items():
-        if delta.days <= max_days:
+        if days <= max_days:
             return valid_intervals
     return DEFAULT_VALID_INTERVALS
 
 
+def split_time_range(
+    start: int, end: int, interval: ValidInterval
+) -> tp.List[tp.Tuple[int, int]]:
+    """Split a start..end range (unix seconds) into consecutive windows that
+    yahoo-finance accepts in a single request of the given interval.
+    """
+    max_days = MAX_REQUEST_DAYS.get(interval)
+    if max_days is None or end <= start:
+        return [(start, end)]
+    step = int(max_days * 24 * 3600)
+    return [(window, min(window + step, end)) for window in range(start, end, step)]
+
+
+def get_candle_duration(interval: ValidInterval) -> int:
+    """Get the (maximum) duration of a candle in seconds.
+
+    Months are counted as 31 days, so that a monthly candle is never considered
+    complete too early.
+    """
+    if interval.endswith("mo"):
+        return int(interval[:-2]) * 31 * 24 * 3600
+    return int(parse_duration(interval).total_seconds())
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Whether a failed request should be retried (network errors, '429 Too Many
+    Requests' and server errors), client errors like '422' are not retried.
+    """
+    if isinstance(error, HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, TransportError)
+
+
+def record_response(resp: Response, *, endpoint: str) -> None:
+    """Count a yahoo-finance response (status and received bytes) in the metrics."""
+    metrics = get_metrics()
+    if not metrics.enabled:
+        return
+    host = resp.request.url.host
+    metrics.increment(
+        "finvestor_http_responses_total",
+        host=host,
+        endpoint=endpoint,
+        status=str(resp.status_code),
+    )
+    metrics.increment(
+        "finvestor_http_received_bytes_total",
+        len(resp.content),
+        host=host,
+        endpoint=endpoint,
+    )
+
+
+def before_retry_sleep(
+    logger: logging.Logger,
+) -> tp.Callable[[RetryCallState], None]:
+    """tenacity `before_sleep` callback, logs and counts the retries of a request."""
+    log = before_sleep_log(logger, logging.DEBUG)
+
+    def _before_sleep(retry_state: RetryCallState) -> None:
+        log(retry_state)
+        metrics = get_metrics()
+        if not metrics.enabled:
+            return
+        function = getattr(retry_state.fn, "__name__", "unknown")
+        metrics.increment("finvestor_retries_total", function=function)
+        if retry_state.next_action is not None:
+            metrics.observe(
+                "finvestor_retry_sleep_seconds",
+                retry_state.next_action.sleep,
+                function=function,
+            )
+
+    return _before_sleep
+
+
 def extract_tickers_list(tickers: tp.Union[str, tp.List[str]]) -> tp.List[str]:
+    """Flatten (comma separated) tickers into a list of unique tickers."""
     if isinstance(tickers, str):
-        return tickers.split(",")
+        return list(dict.fromkeys(tickers.split(",")))
     else:
         _tickers = []
         for ticker in tickers:
             _tickers.extend(extract_tickers_list(ticker))
-        return _tickers
+        return list(dict.fromkeys(_tickers))
@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Isolate every test in its own finvestor cache directory."""
+    path = tmp_path / "cache"
+    monkeypatch.setenv("FINVESTOR_CACHE_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from benchmarks.etoro_parsers import make_statement
+from finvestor.etoro import loader
+from finvestor.etoro.loader import (
+    ETORO_STATEMENT_SHEETS,
+    load_etoro_account_statement,
+)
+
+
+@pytest.fixture(scope="module")
+def statement_xlsx(tmp_path_factory):
+    path = tmp_path_factory.mktemp("etoro") / "statement.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        for name, df in make_statement(200, seed=2).items():
+            df.to_excel(writer, sheet_name=name, index=False)
+        # sheets that are not parsed are not read
+        pd.DataFrame({"x": [1]}).to_excel(writer, sheet_name="Dividends")
+    return path
+
+
+def test_load_statement_reads_only_parsed_sheets(statement_xlsx, monkeypatch):
+    read_excel = pd.read_excel
+    sheet_names = []
+
+    def _read_excel(*args, sheet_name, **kwargs):
+        sheet_names.append(sheet_name)
+        return read_excel(*args, sheet_name=sheet_name, **kwargs)
+
+    monkeypatch.setattr(loader.pd, "read_excel", _read_excel)
+    statement = load_etoro_account_statement(statement_xlsx, use_cache=False)
+    assert sheet_names == [list(ETORO_STATEMENT_SHEETS)]
+    assert len(statement.transactions) > 0
+
+
+def test_load_statement_uses_the_parquet_sidecar(statement_xlsx, tmp_path, monkeypatch):
+    parsed = load_etoro_account_statement(statement_xlsx, cache_dir=tmp_path)
+    (sidecar_dir,) = (tmp_path / "etoro").iterdir()
+    assert (sidecar_dir / "summary.json").is_file()
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("the excel file should not be read")
+
+    monkeypatch.setattr(loader, "read_etoro_account_statement_sheets", _fail)
+    cached = load_etoro_account_statement(
+        statement_xlsx.read_bytes(), cache_dir=tmp_path
+    )
+    for name in ("transactions", "fees", "deposits", "withdrawals"):
+        pd.testing.assert_frame_equal(getattr(cached, name), getattr(parsed, name))
+    assert cached.account_summary == parsed.account_summary
+    assert cached.financial_summary == parsed.financial_summary
+
+
+def test_load_statement_reparses_incomplete_sidecars(statement_xlsx, tmp_path):
+    parsed = load_etoro_account_statement(statement_xlsx, cache_dir=tmp_path)
+    (sidecar_dir,) = (tmp_path / "etoro").iterdir()
+    (sidecar_dir / "summary.json").unlink()
+    reloaded = load_etoro_account_statement(statement_xlsx, cache_dir=tmp_path)
+    pd.testing.assert_frame_equal(reloaded.transactions, parsed.transactions)
+    assert (sidecar_dir / "summary.json").is_file()
+
+
+def test_load_statement_sidecar_is_versioned(statement_xlsx, tmp_path, monkeypatch):
+    load_etoro_account_statement(statement_xlsx, cache_dir=tmp_path)
+    monkeypatch.setattr(loader, "_SIDECAR_VERSION", loader._SIDECAR_VERSION + 1)
+    load_etoro_account_statement(statement_xlsx, cache_dir=tmp_path)
+    versions = sorted(p.name.rsplit("-", 1)[1] for p in (tmp_path / "etoro").iterdir())
+    assert versions == ["v1", "v2"]
+
+
+def test_load_statement_without_parquet_engine(
+    statement_xlsx, tmp_path, monkeypatch, caplog
+):
+    monkeypatch.setattr(loader, "_has_parquet_engine", lambda: False)
+    statement = load_etoro_account_statement(statement_xlsx, cache_dir=tmp_path)
+    assert len(statement.transactions) > 0
+    assert not (tmp_path / "etoro").exists()
+    assert "finvestor[parquet]" in caplog.text
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.etoro_parsers import make_statement
+from finvestor.etoro.parsers import (
+    parse_etoro_account_statement,
+    pre_process_account_activity_df,
+    pre_process_closed_positions_df,
+    split_unique,
+)
+
+
+def test_split_unique_matches_str_split():
+    series = pd.Series(
+        ["AAPL/USD", "BTC/EUR", None, "AAPL/USD", "SPY"], index=[4, 3, 2, 1, 0]
+    )
+    expected = series.str.split("/", n=1, expand=True)
+    pd.testing.assert_frame_equal(split_unique(series, "/"), expected)
+    categorical = split_unique(series.astype("category"), "/")
+    pd.testing.assert_frame_equal(categorical, expected)
+
+
+def test_pre_process_account_activity_partitions_rows_by_type():
+    types = [
+        "Deposit",
+        "Open Position",
+        "Rollover Fee",
+        "Open Position",
+        "Profit/Loss of Trade",
+        "Withdraw Request",
+        "Adjustment",
+        "Withdraw Fee",
+    ]
+    df = pd.DataFrame(
+        {
+            "Date": [f"0{i + 1}/01/2021 00:00:00" for i in range(len(types))],
+            "Type": types,
+            "Details": ["x"] * len(types),
+            "Amount": np.arange(len(types), dtype=float),
+            "Position ID": np.arange(len(types), dtype=float),
+            "Realized Equity Change": 0.0,
+            "NWA": 0.0,
+        }
+    )
+    fees, deposits, withdrawals, opened, closed = pre_process_account_activity_df(df)
+
+    assert list(fees.amount) == [2.0, 6.0]
+    assert list(deposits.amount) == [0.0] and "type" not in deposits
+    assert list(withdrawals.amount) == [5.0, 7.0]
+    assert list(opened.invested) == [1.0, 3.0]
+    assert {"open_date", "invested"} <= set(opened.columns)
+    assert "realized_equity_change" not in opened
+    assert list(closed.amount) == [4.0]
+    assert "nwa" not in fees
+
+
+def test_parse_etoro_account_statement():
+    statement = make_statement(1000, seed=1)
+    activity = statement["Account Activity"]
+    parsed = parse_etoro_account_statement(statement)
+
+    transactions = parsed.transactions
+    n_open = (activity["Type"] == "Open Position").sum()
+    assert len(transactions) == n_open
+    assert transactions["position_id"].dtype == np.int64
+    assert str(transactions["open_date"].dt.tz) == "UTC"
+    n_closed = (activity["Type"] == "Profit/Loss of Trade").sum()
+    assert transactions["close_date"].notna().sum() == n_closed
+    assert set(transactions["currency"]) == {"USD"}
+    assert list(transactions.columns[:2]) == ["ticker", "currency"]
+    assert len(parsed.deposits) == (activity["Type"] == "Deposit").sum()
+
+
+def test_pre_process_closed_positions_upper_cases_types():
+    df = pd.DataFrame(
+        {
+            "Action": ["Buy Apple", "BUY Tesla", "Sell Apple", None],
+            "Amount": [1.0, 2.0, 3.0, 4.0],
+            "Notes": [None] * 4,
+        }
+    )
+    closed = pre_process_closed_positions_df(df)
+    assert closed["type"].tolist()[:3] == ["BUY", "BUY", "SELL"]
+    assert pd.isna(closed["type"].iloc[3])
+    assert sorted(closed["type"].cat.categories) == ["BUY", "SELL"]
+    assert closed["name"].tolist()[:3] == ["Apple", "Tesla", "Apple"]
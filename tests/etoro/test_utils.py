@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from finvestor.etoro.utils import (
+    ETORO_DATETIME_FORMAT,
+    parse_etoro_datetime,
+    parse_etoro_datetimes,
+)
+
+
+def test_parse_etoro_datetimes_matches_strptime():
+    rng = np.random.default_rng(0)
+    start = datetime(1999, 12, 31)
+    dates = [
+        start + timedelta(seconds=int(s))
+        for s in rng.integers(0, 40 * 365 * 86400, 500)
+    ]
+    strings = [d.strftime(ETORO_DATETIME_FORMAT) for d in dates]
+    strings += ["29/02/2000 23:59:59", "29/02/2024 00:00:00", "01/03/2100 12:00:00"]
+
+    parsed = parse_etoro_datetimes(pd.Series(strings, name="open_date"))
+    assert parsed.name == "open_date"
+    assert str(parsed.dt.tz) == "UTC"
+    assert list(parsed) == [parse_etoro_datetime(s) for s in strings]
+
+
+def test_parse_etoro_datetimes_keeps_missing_values_and_index():
+    values = pd.Series(["01/02/2021 10:11:12", None, np.nan], index=[5, 7, 9])
+    parsed = parse_etoro_datetimes(values)
+    assert list(parsed.index) == [5, 7, 9]
+    assert parsed[5] == pd.Timestamp("2021-02-01 10:11:12", tz="UTC")
+    assert parsed[[7, 9]].isna().all()
+
+
+def test_parse_etoro_datetimes_accepts_unpadded_values():
+    parsed = parse_etoro_datetimes(
+        pd.Series(["1/2/2021 9:05:00", "01/02/2021 09:05:00"])
+    )
+    assert list(parsed) == [pd.Timestamp("2021-02-01 09:05:00", tz="UTC")] * 2
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "01/02/2021 10:11:12 junk",
+        "01/02/2021 10:11:12.5",
+        "01/02/2021 10:11",
+        "",
+        "2021-02-01 10:11:12",
+        "32/01/2021 10:11:12",
+        "29/02/2021 10:11:12",
+        "01/13/2021 10:11:12",
+        "01/02/2021 24:11:12",
+        "01/02/2021 10:11:1x",
+    ],
+)
+def test_parse_etoro_datetimes_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        parse_etoro_datetimes(pd.Series(["01/02/2021 10:11:12", value]))
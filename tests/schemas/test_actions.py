@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from finvestor.schemas.actions import CorporateActions, adjust_transactions
+from finvestor.schemas.bar import BAR_FIELDS, Bars
+
+CLOSE = BAR_FIELDS.index("close")
+VOLUME = BAR_FIELDS.index("volume")
+
+
+def make_bars(close):
+    timestamp = np.arange(len(close), dtype=np.int64) * 100 + 50
+    values = np.repeat(np.asarray(close, dtype=np.float64)[:, None], 5, axis=1)
+    values[:, VOLUME] = 1000.0
+    return Bars(timestamp, values, interval="1m")
+
+
+def test_split_factors():
+    actions = CorporateActions([100, 200], [2.0, 3.0], [], [])
+    factors = actions.get_split_factors(np.array([50, 100, 150, 200, 250]))
+    # the split at the same timestamp (the ex-date bar) is not applied
+    assert factors.tolist() == [6.0, 3.0, 3.0, 1.0, 1.0]
+    assert CorporateActions.empty().get_split_factors(np.array([1, 2])).tolist() == [
+        1.0,
+        1.0,
+    ]
+
+
+def test_dividend_factors():
+    # bars at 50, 150, 250 and 350, dividends on the 3rd bar and before any bar
+    bars = make_bars([10.0, 10.0, 9.0, 9.0])
+    actions = CorporateActions([], [], [0, 250], [5.0, 1.0])
+    np.testing.assert_allclose(actions.get_dividend_ratios(bars), [1.0, 0.9])
+    np.testing.assert_allclose(
+        actions.get_dividend_factors(bars.timestamp, bars), [0.9, 0.9, 1.0, 1.0]
+    )
+
+
+def test_adjust_bars():
+    bars = make_bars([12.0, 12.0, 6.0, 6.0])
+    actions = CorporateActions([250], [2.0], [350], [0.6])
+    adjusted = actions.adjust_bars(bars)
+    np.testing.assert_allclose(adjusted.close, [5.4, 5.4, 5.4, 6.0])
+    np.testing.assert_allclose(adjusted.values[:, VOLUME], [2000, 2000, 1000, 1000])
+    # yahoo-finance's adjusted close (prices already split-adjusted)
+    np.testing.assert_allclose(
+        actions.adjust_bars(bars, splits=False).close, [10.8, 10.8, 5.4, 6.0]
+    )
+    assert actions.adjust_bars(bars, splits=False, dividends=False).values.tolist() == (
+        bars.values.tolist()
+    )
+
+
+def test_concat_drops_duplicate_events():
+    actions = CorporateActions.concat(
+        [
+            CorporateActions([200], [2.0], [100], [0.5]),
+            CorporateActions([100, 200], [4.0, 2.0], [], []),
+            CorporateActions.empty(),
+        ]
+    )
+    assert actions.split_timestamp.tolist() == [100, 200]
+    assert actions.split_ratio.tolist() == [4.0, 2.0]
+    assert actions.dividend_timestamp.tolist() == [100]
+    assert len(actions) == 3
+    assert len(CorporateActions.concat([])) == 0
+
+
+def test_from_ohlc():
+    actions = CorporateActions.from_ohlc(
+        {"split_timestamp": np.array([100]), "split_ratio": np.array([2.0])}
+    )
+    assert actions.split_ratio.tolist() == [2.0]
+    assert len(actions.dividend_timestamp) == 0
+
+
+def test_adjust_transactions():
+    df = pd.DataFrame(
+        {
+            "asset_ticker": ["AAPL", "AAPL", "MSFT"],
+            "open_date": pd.to_datetime([50, 300, 50], unit="s"),
+            "quantity": [1.0, 2.0, 3.0],
+            "open_rate": [12.0, 6.0, 100.0],
+        }
+    )
+    actions = {"AAPL": CorporateActions([250], [2.0], [350], [0.6])}
+    adjusted = adjust_transactions(df, actions)
+    assert adjusted["quantity"].tolist() == [2.0, 2.0, 3.0]
+    assert adjusted["open_rate"].tolist() == [6.0, 6.0, 100.0]
+    assert df["quantity"].tolist() == [1.0, 2.0, 3.0]
+
+    bars = {"AAPL": make_bars([12.0, 12.0, 6.0, 6.0])}
+    adjusted = adjust_transactions(df, actions, bars=bars)
+    np.testing.assert_allclose(adjusted["open_rate"], [5.4, 5.4, 100.0])
@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+from finvestor.schemas.bar import BAR_FIELDS, Bar, Bars, BarsPanel
+
+
+def make_bars(timestamp, close=None, interval="1d"):
+    timestamp = np.asarray(timestamp, dtype=np.int64)
+    if close is None:
+        close = np.arange(len(timestamp), dtype=np.float64)
+    values = np.repeat(np.asarray(close, dtype=np.float64)[:, None], 5, axis=1)
+    return Bars(timestamp, values, interval=interval)
+
+
+def test_bars_from_ohlc_converts_none_to_nan():
+    bars = Bars.from_ohlc(
+        {
+            "timestamp": [10, 20, 30],
+            "open": [1.0, None, 3.0],
+            "high": [1.5, 2.5, 3.5],
+            "low": [0.5, 1.5, None],
+            "close": [1.2, 2.2, 3.2],
+            "volume": [100, 200, None],
+        },
+        interval="1m",
+    )
+    assert len(bars) == 3
+    assert bars.timestamp.dtype == np.int64
+    assert bars.values.shape == (3, len(BAR_FIELDS))
+    assert np.isnan(bars.open[1]) and np.isnan(bars.low[2])
+    np.testing.assert_array_equal(bars.close, [1.2, 2.2, 3.2])
+    np.testing.assert_array_equal(bars.volume[:2], [100, 200])
+
+
+def test_bars_rejects_values_of_the_wrong_shape():
+    with pytest.raises(ValueError):
+        Bars(np.arange(3), np.zeros((3, 4)), interval="1d")
+
+
+def test_bars_indexing_builds_bar_objects_and_slicing_keeps_bars():
+    bars = make_bars([86400, 2 * 86400, 3 * 86400])
+    bar = bars[1]
+    assert isinstance(bar, Bar)
+    assert int(bar.timestamp.timestamp()) == 2 * 86400
+    assert bar.close == 1.0 and bar.interval == "1d"
+
+    sliced = bars[1:]
+    assert isinstance(sliced, Bars)
+    np.testing.assert_array_equal(sliced.timestamp, [2 * 86400, 3 * 86400])
+    assert sliced.interval == "1d"
+
+
+def test_bars_df_wraps_values_without_copying():
+    bars = make_bars([0, 60, 120], interval="1m")
+    df = bars.df
+    assert list(df.columns) == [*BAR_FIELDS, "interval"]
+    assert df["interval"].tolist() == ["1m"] * 3
+    assert str(df.index.tz) == "UTC"
+    assert df.index[1].value == 60 * 10**9
+    assert np.shares_memory(df["close"].to_numpy(), bars.values)
+
+
+def test_bars_df_drops_bars_without_values():
+    bars = make_bars([0, 60, 120], close=[1.0, np.nan, 3.0])
+    df = bars.df
+    assert df.index.asi8.tolist() == [0, 120 * 10**9]
+    assert df["close"].tolist() == [1.0, 3.0]
+
+
+def test_bars_concat_sorts_and_keeps_last_duplicate():
+    first = make_bars([30, 10], close=[3.0, 1.0])
+    second = make_bars([20, 30], close=[2.0, 33.0])
+    bars = Bars.concat([first, second])
+    np.testing.assert_array_equal(bars.timestamp, [10, 20, 30])
+    np.testing.assert_array_equal(bars.close, [1.0, 2.0, 33.0])
+    assert bars.interval == "1d"
+
+
+def test_bars_concat_of_nothing_needs_an_interval():
+    with pytest.raises(ValueError):
+        Bars.concat([])
+    assert len(Bars.concat([], interval="1h")) == 0
+
+
+def test_bars_build_round_trips_dict():
+    bars = make_bars([86400, 2 * 86400])
+    rebuilt = Bars.build(bars.dict())
+    np.testing.assert_array_equal(rebuilt.timestamp, bars.timestamp)
+    np.testing.assert_array_equal(rebuilt.values, bars.values)
+    assert rebuilt.interval == "1d"
+
+
+def test_bars_panel_aligns_tickers_on_a_shared_index():
+    panel = BarsPanel.from_bars(
+        {
+            "AAPL": make_bars([10, 20, 30], close=[1.0, 2.0, 3.0]),
+            "MSFT": make_bars([20, 40], close=[5.0, 6.0]),
+        }
+    )
+    assert len(panel) == 4 and panel.tickers == ["AAPL", "MSFT"]
+    np.testing.assert_array_equal(panel.timestamp, [10, 20, 30, 40])
+    assert panel.values.shape == (4, 2, len(BAR_FIELDS))
+    np.testing.assert_array_equal(panel["AAPL"].close, [1.0, 2.0, 3.0, np.nan])
+    np.testing.assert_array_equal(panel["MSFT"].close, [np.nan, 5.0, np.nan, 6.0])
+    assert panel.interval == "1d"
+
+    close = panel.field("close")
+    assert list(close.columns) == ["AAPL", "MSFT"]
+    assert close.loc[close.index[1], "MSFT"] == 5.0
+    df = panel.df
+    assert df[("MSFT", "close")].iloc[3] == 6.0
+    assert np.shares_memory(df.to_numpy(), panel.values)
+
+
+def test_bars_panel_from_chart_arrays():
+    ohlc = {
+        "MSFT": {
+            "timestamp": np.array([20, 40]),
+            **{field: np.array([5.0, 6.0]) for field in BAR_FIELDS},
+        },
+        "AAPL": {
+            "timestamp": np.array([10, 20]),
+            **{field: np.array([1.0, np.nan]) for field in BAR_FIELDS},
+        },
+    }
+    panel = BarsPanel.from_ohlc(ohlc, interval="1d")
+    assert panel.tickers == ["MSFT", "AAPL"]
+    np.testing.assert_array_equal(panel.timestamp, [10, 20, 40])
+    np.testing.assert_array_equal(panel["MSFT"].volume, [np.nan, 5.0, 6.0])
+    np.testing.assert_array_equal(panel["AAPL"].open, [1.0, np.nan, np.nan])
+
+
+def test_bars_panel_rejects_mixed_intervals():
+    with pytest.raises(ValueError):
+        BarsPanel.from_bars(
+            {"A": make_bars([10], interval="1d"), "B": make_bars([10], interval="1h")}
+        )
+
+
+def test_bars_panel_of_nothing_is_empty():
+    panel = BarsPanel.from_bars({})
+    assert len(panel) == 0 and panel.tickers == [] and panel.interval is None
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+
+from benchmarks.cli_startup import (
+    CLI_MODULE,
+    DEFAULT_FORBIDDEN_MODULES,
+    measure_import,
+    parse_importtime,
+)
+
+
+def test_parse_importtime():
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   _io",
+            "import time:       300 |       1500 | finvestor.cli",
+            "unrelated line",
+        ]
+    )
+    assert parse_importtime(stderr) == {"_io": 120, "finvestor.cli": 1500}
+
+
+def test_cli_does_not_import_heavy_modules():
+    _, imported = measure_import(CLI_MODULE)
+    assert not [name for name in DEFAULT_FORBIDDEN_MODULES if name in imported]
+
+
+def test_cli_is_within_the_startup_budget():
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.cli_startup",
+            "--budget-ms",
+            "150",
+            "--repeat",
+            "3",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    assert "within the startup budget" in proc.stdout
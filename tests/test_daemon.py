@@ -0,0 +1,128 @@
+import functools
+import typing as tp
+
+import anyio
+import httpx
+import pytest
+from typer.testing import CliRunner
+
+from finvestor.cli import app
+from finvestor.daemon import (
+    DaemonClient,
+    DaemonError,
+    FinvestorDaemon,
+    connect,
+    get_socket_path,
+)
+from finvestor.schemas.bar import Bars
+from finvestor.utils.executor import set_cpu_executor
+from finvestor.utils.metrics import set_metrics
+from finvestor.yahoo_finance import bars as yf_bars
+from finvestor.yahoo_finance.scheduler import RequestScheduler, set_scheduler
+
+from .yahoo_finance.conftest import FakeYahoo
+
+
+@pytest.fixture
+async def daemon() -> tp.AsyncIterator[FinvestorDaemon]:
+    """A daemon serving fake yahoo-finance responses, in the test's event loop."""
+    daemon = FinvestorDaemon(
+        max_concurrency=4, metrics=True, transport=httpx.MockTransport(FakeYahoo())
+    )
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(daemon.serve)
+        with anyio.fail_after(5):
+            while await anyio.to_thread.run_sync(connect) is None:
+                await anyio.sleep(0.01)
+        try:
+            yield daemon
+        finally:
+            await anyio.to_thread.run_sync(DaemonClient().shutdown)
+    set_scheduler(RequestScheduler())
+    set_metrics(None)
+    set_cpu_executor(None)
+
+
+def test_connect_without_daemon():
+    assert not get_socket_path().exists()
+    assert connect() is None
+
+
+@pytest.mark.anyio
+async def test_daemon_requests(daemon):
+    client = await anyio.to_thread.run_sync(connect)
+    assert client is not None
+    status = await anyio.to_thread.run_sync(client.ping)
+    assert status["settings"] == {
+        "max_concurrency": 4,
+        "http_cache": False,
+        "metrics": True,
+        "cpu_workers": 0,
+    }
+
+    results = await anyio.to_thread.run_sync(
+        lambda: client.get_bars(["AAPL", "MSFT"], interval="1d", period="5d")
+    )
+    assert sorted(results) == ["AAPL", "MSFT"]
+    for bars in results.values():
+        assert isinstance(bars, Bars)
+        assert bars.interval == "1d"
+        assert len(bars) > 0
+
+    metrics = await anyio.to_thread.run_sync(client.get_metrics)
+    assert 'finvestor_http_request_seconds_count{endpoint="chart"} 2' in metrics
+
+    with pytest.raises(DaemonError, match="Unknown method"):
+        await anyio.to_thread.run_sync(client.request, "unknown")
+
+
+@pytest.mark.anyio
+async def test_daemon_conflicting_settings(daemon):
+    client = await anyio.to_thread.run_sync(connect)
+
+    async def _conflicts(**settings):
+        return await anyio.to_thread.run_sync(
+            functools.partial(client.get_conflicting_settings, **settings)
+        )
+
+    assert await _conflicts(max_concurrency=None, http_cache=None) == []
+    assert await _conflicts(max_concurrency=4, http_cache=False, metrics=True) == []
+    assert await _conflicts(max_concurrency=8, http_cache=True, cpu_workers=2) == [
+        "max_concurrency=4 (requested 8)",
+        "http_cache=False (requested True)",
+        "cpu_workers=0 (requested 2)",
+    ]
+
+
+class _ConflictingDaemon:
+    path = "daemon.sock"
+
+    def get_conflicting_settings(self, **settings):
+        cpu_workers = settings["cpu_workers"]
+        return [f"cpu_workers=0 (requested {cpu_workers})"] if cpu_workers else []
+
+    def get_bars(self, tickers, **params):
+        return {ticker: Bars.empty(interval="1d") for ticker in tickers}
+
+
+def test_cli_skips_a_conflicting_daemon(monkeypatch):
+    monkeypatch.setattr("finvestor.daemon.connect", lambda: _ConflictingDaemon())
+    loaded = []
+
+    async def _iter_bars(tickers, **kwargs):
+        for ticker in tickers:
+            loaded.append(ticker)
+            yield ticker, Bars.empty(interval="1d")
+
+    monkeypatch.setattr(yf_bars, "iter_yahoo_finance_bars", _iter_bars)
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["yahoo", "-t", "AAPL"])
+    assert result.exit_code == 0, result.output
+    assert loaded == []
+
+    result = runner.invoke(app, ["yahoo", "-t", "AAPL", "--cpu-workers", "1"])
+    assert result.exit_code == 0, result.output
+    assert loaded == ["AAPL"]
+    set_scheduler(RequestScheduler())
+    set_cpu_executor(None)
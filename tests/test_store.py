@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from finvestor.schemas.bar import BAR_FIELDS, Bars
+from finvestor.store import BarStore
+
+DAY = 86400
+# 2021-01-30 00:00 UTC, the bars span 2021-01 and 2021-02
+JAN_30 = 1611964800
+
+
+def make_bars(timestamp, close=None, interval="1d"):
+    timestamp = np.asarray(timestamp, dtype=np.int64)
+    close = timestamp.astype(np.float64) if close is None else close
+    values = np.repeat(np.asarray(close, dtype=np.float64)[:, None], 5, axis=1)
+    return Bars(timestamp, values, interval=interval)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BarStore(tmp_path / "bars")
+
+
+def test_write_read_df(store):
+    bars = make_bars(JAN_30 + np.arange(4) * DAY)
+    store.write("AAPL", bars)
+    assert store.intervals() == ["1d"]
+    assert store.tickers("1d") == ["AAPL"]
+    assert store.partitions("AAPL", "1d") == ["2021-01", "2021-02"]
+
+    # a single partition is a read-only view of its memory-map
+    january = store.read("AAPL", "1d", end=JAN_30 + 2 * DAY)
+    assert not january.timestamp.flags.writeable
+    assert january.timestamp.tolist() == [JAN_30, JAN_30 + DAY]
+    df = january.df
+    assert df.index.tolist() == [
+        pd.Timestamp("2021-01-30", tz="UTC"),
+        pd.Timestamp("2021-01-31", tz="UTC"),
+    ]
+    assert df.columns.tolist() == [*BAR_FIELDS, "interval"]
+    assert df["close"].tolist() == [JAN_30, JAN_30 + DAY]
+
+    # many partitions are concatenated
+    stored = store.read("AAPL", "1d")
+    assert stored.timestamp.tolist() == bars.timestamp.tolist()
+    np.testing.assert_array_equal(stored.values, bars.values)
+    assert len(stored.df) == 4
+
+
+def test_values_are_stored_bit_for_bit(store):
+    close = np.array([np.nan, -0.0, 1e-300, np.inf])
+    store.write("AAPL", make_bars(JAN_30 + np.arange(2) * DAY, close[:2]))
+    store.write("AAPL", make_bars(JAN_30 + np.arange(2, 4) * DAY, close[2:]))
+    stored = store.read("AAPL", "1d")
+    assert stored.close.tobytes() == close.tobytes()
+
+
+def test_write_merges_and_overwrites(store):
+    store.write("AAPL", make_bars(JAN_30 + np.arange(3) * DAY))
+    store.write(
+        "AAPL", make_bars(JAN_30 + np.arange(2, 5) * DAY, close=[1.0, 2.0, 3.0])
+    )
+    stored = store.read("AAPL", "1d")
+    assert stored.timestamp.tolist() == (JAN_30 + np.arange(5) * DAY).tolist()
+    assert stored.close.tolist() == [JAN_30, JAN_30 + DAY, 1.0, 2.0, 3.0]
+    # no temporary file is left
+    assert sorted(p.name for p in (store.path / "1d" / "AAPL").iterdir()) == [
+        "2021-01.npy",
+        "2021-02.npy",
+    ]
+
+
+def test_temporary_files_are_ignored_and_unknown_partitions_raise(store):
+    store.write("AAPL", make_bars([JAN_30]))
+    ticker_dir = store.path / "1d" / "AAPL"
+    (ticker_dir / ".2021-02.npy.tmp").write_bytes(b"")
+    assert store.partitions("AAPL", "1d") == ["2021-01"]
+    assert store.read("AAPL", "1d").timestamp.tolist() == [JAN_30]
+
+    (ticker_dir / "2020-12.timestamp.npy").write_bytes(b"")
+    with pytest.raises(ValueError, match="2020-12.timestamp.npy"):
+        store.partitions("AAPL", "1d")
+    with pytest.raises(ValueError):
+        store.read("AAPL", "1d")
+
+
+def test_scan_and_read_panel(store):
+    store.write_many(
+        {
+            "AAPL": make_bars(JAN_30 + np.arange(3) * DAY),
+            "MSFT": make_bars(JAN_30 + np.arange(1, 4) * DAY),
+            "^GSPC": make_bars([JAN_30 - 40 * DAY]),
+        }
+    )
+    assert store.tickers("1d") == ["AAPL", "MSFT", "^GSPC"]
+    assert store.read("MISSING", "1d").timestamp.tolist() == []
+
+    start = JAN_30 + DAY
+    scanned = dict(store.scan("1d", start=start))
+    assert sorted(scanned) == ["AAPL", "MSFT"]
+    assert scanned["AAPL"].timestamp.tolist() == [start, start + DAY]
+    assert [t for t, _ in store.scan("1d", tickers="MSFT, ^GSPC")] == ["MSFT", "^GSPC"]
+    assert [t for t, _ in store.scan("1d", tickers=lambda t: t.startswith("A"))] == [
+        "AAPL"
+    ]
+
+    panel = store.read_panel("1d", tickers=["AAPL", "MSFT"], start=start)
+    assert panel.tickers == ["AAPL", "MSFT"]
+    close = panel.field("close")
+    assert close.index[0] == pd.Timestamp("2021-01-31", tz="UTC")
+    assert close["AAPL"].tolist()[:2] == [start, start + DAY]
+    assert np.isnan(close["AAPL"].iloc[-1])
+    assert close["MSFT"].tolist() == [start, start + DAY, start + 2 * DAY]
+
+
+def test_write_rejects_unknown_intervals(store):
+    bars = make_bars([JAN_30], interval=None)
+    with pytest.raises(ValueError):
+        store.write("AAPL", bars)
+    store.write("AAPL", Bars.empty(interval="1d"))
+    assert store.tickers("1d") == []
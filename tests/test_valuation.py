@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from finvestor.schemas.bar import BAR_FIELDS, BarsPanel
+from finvestor.valuation import PortfolioValuation, TradeEvents, get_average_cost
+
+DAY = 86400
+
+
+@pytest.fixture
+def panel():
+    close = np.array(
+        [
+            [10.0, 100.0],
+            [12.0, 100.0],
+            [np.nan, 110.0],
+            [15.0, 120.0],
+        ]
+    )
+    values = np.repeat(close[:, :, None], len(BAR_FIELDS), axis=2)
+    timestamp = np.arange(4, dtype=np.int64) * DAY
+    return BarsPanel(timestamp, ["A", "B"], values, interval="1d")
+
+
+@pytest.fixture
+def events():
+    return TradeEvents(
+        ["B", "A", "A", "A", "B"],
+        [0, 0, DAY + 1, 2 * DAY + 5, 2 * DAY],
+        [-2.0, 10.0, 10.0, -5.0, 3.0],
+        [100.0, 10.0, 14.0, 15.0, 110.0],
+        [0.0, 1.0, 0.0, 0.0, np.nan],
+    )
+
+
+def test_trade_events_are_sorted_by_ticker_and_time(events):
+    assert events.ticker.tolist() == ["A", "A", "A", "B", "B"]
+    assert events.timestamp.tolist() == [0, DAY + 1, 2 * DAY + 5, 0, 2 * DAY]
+    assert events.commission.tolist() == [1.0, 0.0, 0.0, 0.0, 0.0]
+
+
+def test_get_average_cost(events):
+    realized, cost = get_average_cost(events)
+    # A: sells 5 at 15 with an average cost of 12, B: covers a short of 2 at 110
+    # (sold at 100), and the remaining unit opens a long position
+    np.testing.assert_allclose(realized, [-1.0, 0.0, 15.0, 0.0, -20.0])
+    np.testing.assert_allclose(cost, [100.0, 240.0, 180.0, -200.0, 110.0])
+
+
+def test_valuation(events, panel):
+    valuation = PortfolioValuation.compute(events, panel, initial_cash=1000.0)
+    np.testing.assert_allclose(
+        valuation.quantity, [[10, -2], [20, -2], [15, 1], [15, 1]]
+    )
+    # the missing close of A is forward filled
+    np.testing.assert_allclose(
+        valuation.market_value, [[100, -200], [240, -200], [180, 110], [225, 120]]
+    )
+    np.testing.assert_allclose(
+        valuation.realized_pnl, [[-1, 0], [-1, 0], [14, -20], [14, -20]]
+    )
+    np.testing.assert_allclose(
+        valuation.unrealized_pnl, [[0, 0], [0, 0], [0, 0], [45, 10]]
+    )
+    np.testing.assert_allclose(
+        valuation.cash, [[-101, 200], [-241, 200], [-166, -130], [-166, -130]]
+    )
+    np.testing.assert_allclose(
+        valuation.cash + valuation.market_value,
+        valuation.realized_pnl + valuation.unrealized_pnl,
+    )
+    np.testing.assert_allclose(valuation.equity, [999, 999, 994, 1049])
+
+    df = valuation.df
+    assert df.index.equals(panel.index)
+    assert df["cash"].tolist() == [1099.0, 959.0, 704.0, 704.0]
+    assert df["equity"].tolist() == valuation.equity.tolist()
+    quantity = valuation.field("quantity")
+    assert quantity.columns.tolist() == ["A", "B"]
+    assert quantity["A"].tolist() == [10, 20, 15, 15]
+    with pytest.raises(KeyError):
+        valuation.field("equity")
+
+
+def test_valuation_with_missing_tickers(panel):
+    events = TradeEvents(["C"], [0], [1.0], [1.0])
+    with pytest.raises(ValueError, match="'C'"):
+        PortfolioValuation.compute(events, panel)
+
+
+def test_trade_events_from_positions():
+    df = pd.DataFrame(
+        {
+            "ticker": ["A", "B"],
+            "type": ["BUY", "SELL"],
+            "units": [2.0, 4.0],
+            "invested": [20.0, 200.0],
+            "open_rate": [10.0, np.nan],
+            "open_date": pd.to_datetime(["1970-01-01", "1970-01-02"], utc=True),
+            "close_rate": [15.0, np.nan],
+            "close_date": pd.to_datetime(["1970-01-03", None], utc=True),
+        }
+    )
+    events = TradeEvents.from_positions(df)
+    assert events.ticker.tolist() == ["A", "A", "B"]
+    assert events.timestamp.tolist() == [0, 2 * DAY, DAY]
+    assert events.quantity.tolist() == [2.0, -2.0, -4.0]
+    assert events.price.tolist() == [10.0, 15.0, 50.0]
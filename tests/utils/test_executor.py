@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from finvestor.utils.executor import (
+    CPUExecutor,
+    ProcessPoolCPUExecutor,
+    get_cpu_executor,
+    set_cpu_executor,
+)
+from finvestor.utils.metrics import MetricsRegistry, set_metrics
+from finvestor.yahoo_finance.decoding import decode_chart
+
+from ..yahoo_finance.conftest import chart_payload
+
+CONTENT = json.dumps(chart_payload("AAPL", [60, 120], [1.0, 2.0])).encode()
+
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry()
+    set_metrics(registry)
+    yield registry
+    set_metrics(None)
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ProcessPoolCPUExecutor(1, min_offload_size=1024) as executor:
+        yield executor
+
+
+def test_set_cpu_executor():
+    assert type(get_cpu_executor()) is CPUExecutor
+    executor = ProcessPoolCPUExecutor(2)
+    set_cpu_executor(executor)
+    assert get_cpu_executor() is executor
+    set_cpu_executor(None)
+    assert type(get_cpu_executor()) is CPUExecutor
+    with pytest.raises(ValueError):
+        ProcessPoolCPUExecutor(-1)
+
+
+@pytest.mark.anyio
+async def test_inline_executor(registry):
+    ohlc = await CPUExecutor().run(decode_chart, CONTENT)
+    assert ohlc["timestamp"].tolist() == [60, 120]
+    assert registry.histogram("finvestor_parse_seconds", kind="chart")[0] == 1
+    assert (
+        registry.histogram(
+            "finvestor_cpu_task_seconds", task="decode_chart", backend="inline"
+        )[0]
+        == 1
+    )
+
+
+@pytest.mark.anyio
+async def test_process_executor_sends_worker_metrics_back(executor, registry):
+    ohlc = await executor.run(decode_chart, CONTENT, size=4096)
+    assert ohlc["close"].tolist() == [1.0, 2.0]
+    # measured in the worker process, replayed in the parent's sink
+    assert registry.histogram("finvestor_parse_seconds", kind="chart")[0] == 1
+    assert (
+        registry.histogram(
+            "finvestor_cpu_task_seconds", task="decode_chart", backend="process"
+        )[0]
+        == 1
+    )
+
+    # small inputs are processed inline
+    await executor.run(decode_chart, CONTENT, size=0)
+    assert registry.histogram("finvestor_parse_seconds", kind="chart")[0] == 2
+    assert (
+        registry.histogram(
+            "finvestor_cpu_task_seconds", task="decode_chart", backend="inline"
+        )[0]
+        == 1
+    )
+
+
+@pytest.mark.anyio
+async def test_process_executor_without_metrics(executor):
+    ohlc = await executor.run(decode_chart, CONTENT, size=4096)
+    assert ohlc["timestamp"].tolist() == [60, 120]
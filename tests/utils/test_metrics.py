@@ -0,0 +1,120 @@
+import importlib.util
+
+import pytest
+
+from finvestor.utils.metrics import (
+    MetricsRecorder,
+    MetricsRegistry,
+    MetricsSink,
+    OpenTelemetrySink,
+    get_metrics,
+    set_metrics,
+    traced,
+)
+
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    set_metrics(registry)
+    yield registry
+    set_metrics(None)
+
+
+def test_metrics_are_disabled_by_default():
+    sink = get_metrics()
+    assert type(sink) is MetricsSink
+    assert not sink.enabled
+    with sink.timer("finvestor_test_seconds"), sink.span("test"):
+        sink.increment("finvestor_test_total")
+
+
+def test_registry_counters_and_histograms(registry):
+    registry.increment("finvestor_test_total", host="a")
+    registry.increment("finvestor_test_total", 2, host="a")
+    registry.increment("finvestor_test_total", host="b")
+    assert registry.counter("finvestor_test_total", host="a") == 3
+    assert registry.counter("finvestor_test_total", host="b") == 1
+    assert registry.counter("finvestor_test_total") == 0
+
+    registry.observe("finvestor_test_seconds", 0.05, kind="x")
+    registry.observe("finvestor_test_seconds", 0.5, kind="x")
+    registry.observe("finvestor_test_seconds", 5.0, kind="x")
+    assert registry.histogram("finvestor_test_seconds", kind="x") == (3, 5.55)
+    with registry.timer("finvestor_test_seconds", kind="y"):
+        pass
+    assert registry.histogram("finvestor_test_seconds", kind="y")[0] == 1
+
+    registry.reset()
+    assert registry.counter("finvestor_test_total", host="a") == 0
+    assert registry.histogram("finvestor_test_seconds", kind="x") == (0, 0.0)
+
+
+def test_dump_prometheus(registry):
+    registry.increment("finvestor_test_total", host='a"b')
+    registry.observe("finvestor_test_seconds", 0.05)
+    registry.observe("finvestor_test_seconds", 0.5)
+    registry.observe("finvestor_test_seconds", 5.0)
+    assert registry.dump_prometheus().splitlines() == [
+        "# TYPE finvestor_test_total counter",
+        'finvestor_test_total{host="a\\"b"} 1.0',
+        "# TYPE finvestor_test_seconds histogram",
+        'finvestor_test_seconds_bucket{le="0.1"} 1',
+        'finvestor_test_seconds_bucket{le="1.0"} 2',
+        'finvestor_test_seconds_bucket{le="+Inf"} 3',
+        "finvestor_test_seconds_sum 5.55",
+        "finvestor_test_seconds_count 3",
+    ]
+
+
+@pytest.mark.anyio
+async def test_traced(registry):
+    @traced("sync", attributes=lambda x: {"x": x})
+    def _sync(x):
+        return x + 1
+
+    @traced("async")
+    async def _async(x):
+        return x + 2
+
+    assert _sync(1) == 2
+    assert await _async(1) == 3
+    assert registry.histogram("finvestor_span_seconds", span="sync")[0] == 1
+    assert registry.histogram("finvestor_span_seconds", span="async")[0] == 1
+
+    set_metrics(None)
+    assert _sync(1) == 2
+    assert registry.histogram("finvestor_span_seconds", span="sync")[0] == 1
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("opentelemetry") is not None,
+    reason="opentelemetry-api is installed",
+)
+def test_opentelemetry_sink_requires_opentelemetry():
+    with pytest.raises(ImportError, match="opentelemetry-api"):
+        OpenTelemetrySink()
+
+
+def test_opentelemetry_sink():
+    pytest.importorskip("opentelemetry")
+    registry = MetricsRegistry()
+    sink = OpenTelemetrySink(registry)
+    with sink.span("test", ticker="AAPL"):
+        sink.increment("finvestor_test_total")
+    assert registry.histogram("finvestor_span_seconds", span="test")[0] == 1
+    assert registry.counter("finvestor_test_total") == 1
+
+
+def test_recorder_replays_measurements(registry):
+    recorder = MetricsRecorder()
+    recorder.increment("finvestor_test_total", 2, host="a")
+    recorder.observe("finvestor_test_seconds", 0.5, kind="x")
+    with recorder.span("test"):
+        pass
+    assert registry.counter("finvestor_test_total", host="a") == 0
+
+    recorder.replay(registry)
+    assert registry.counter("finvestor_test_total", host="a") == 2
+    assert registry.histogram("finvestor_test_seconds", kind="x") == (1, 0.5)
+    assert registry.histogram("finvestor_span_seconds", span="test")[0] == 1
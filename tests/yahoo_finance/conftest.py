@@ -0,0 +1,227 @@
+import json
+import time
+import typing as tp
+from email.utils import formatdate
+from pathlib import Path
+from urllib.parse import unquote
+
+import httpx
+import pytest
+from tenacity import wait_none
+
+from finvestor.yahoo_finance import bars, scrapper
+from finvestor.yahoo_finance.client import create_client
+from finvestor.yahoo_finance.intervals import (
+    IntervalCapabilities,
+    set_interval_capabilities,
+)
+from finvestor.yahoo_finance.scheduler import RequestScheduler, set_scheduler
+
+INTERVAL_SECONDS = {
+    "1m": 60,
+    "2m": 120,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "60m": 3600,
+    "90m": 5400,
+    "1h": 3600,
+    "1d": 86400,
+    "5d": 5 * 86400,
+    "1wk": 7 * 86400,
+    "1mo": 30 * 86400,
+    "3mo": 90 * 86400,
+}
+RANGE_SECONDS = {"1d": 86400, "5d": 5 * 86400, "1mo": 30 * 86400, "1y": 365 * 86400}
+
+ChartHook = tp.Callable[[str, tp.Dict[str, str]], tp.Optional[httpx.Response]]
+
+
+def chart_payload(
+    ticker: str,
+    timestamp: tp.Sequence[int],
+    close: tp.Sequence[tp.Any],
+    instrument_type: str = "EQUITY",
+) -> tp.Dict[str, tp.Any]:
+    quote = {field: list(close) for field in ("open", "high", "low", "close")}
+    quote["volume"] = [100] * len(timestamp)
+    return {
+        "chart": {
+            "result": [
+                {
+                    "meta": {"symbol": ticker, "instrumentType": instrument_type},
+                    "timestamp": list(timestamp),
+                    "indicators": {"quote": [quote]},
+                }
+            ],
+            "error": None,
+        }
+    }
+
+
+def quote(ticker: str) -> tp.Dict[str, tp.Any]:
+    return {
+        "symbol": ticker,
+        "longName": f"{ticker} Inc.",
+        "quoteType": "CRYPTOCURRENCY" if "-" in ticker else "EQUITY",
+        "currency": "USD",
+        "exchange": "NMS",
+        "exchangeTimezoneName": "America/New_York",
+        "market": "us_market",
+    }
+
+
+def quote_page(ticker: str) -> str:
+    store = {
+        "quoteType": {
+            "longName": f"{ticker} Scraped",
+            "quoteType": "EQUITY",
+            "exchange": "LSE",
+            "market": "gb_market",
+            "exchangeTimezoneName": "Europe/London",
+        },
+        "price": {"currency": "GBp"},
+        "summaryProfile": {"sector": "Tech", "industry": "Software", "country": "UK"},
+    }
+    data = {"context": {"dispatcher": {"stores": {"QuoteSummaryStore": store}}}}
+    return f"<html>root.App.main = {json.dumps(data)};\n}}(this));</html>"
+
+
+class FakeYahoo:
+    """`httpx.MockTransport` handler faking the yahoo-finance endpoints.
+
+    Charts have a bar every interval in the requested range, the close of a bar is
+    its timestamp. `on_chart` can return a response to override a chart request,
+    and responses queued with `queue` are returned first for their endpoint.
+    Tickers in `unknown` are missing from the batch quote api, the chart asset
+    types are taken from `instrument_types` (defaults to 'EQUITY').
+    """
+
+    def __init__(self) -> None:
+        self.requests: tp.List[httpx.Request] = []
+        self.on_chart: tp.Optional[ChartHook] = None
+        self.unknown: tp.Set[str] = set()
+        self.instrument_types: tp.Dict[str, str] = {}
+        self._queued: tp.Dict[str, tp.List[httpx.Response]] = {}
+
+    def queue(self, endpoint: str, *responses: httpx.Response) -> None:
+        self._queued.setdefault(endpoint, []).extend(responses)
+
+    @staticmethod
+    def get_endpoint(request: httpx.Request) -> str:
+        path = request.url.path
+        if "/v8/finance/chart/" in path:
+            return "chart"
+        if path == "/v7/finance/quote":
+            return "quote"
+        if "/v10/finance/quoteSummary/" in path:
+            return "quote_summary"
+        if path.startswith("/quote/"):
+            return "quote_page"
+        if request.url.host == "markets.businessinsider.com":
+            return "isin"
+        raise ValueError(f"Unexpected request: {request.url}")
+
+    def endpoint_requests(self, endpoint: str) -> tp.List[httpx.Request]:
+        return [r for r in self.requests if self.get_endpoint(r) == endpoint]
+
+    def chart_requests(self, ticker: tp.Optional[str] = None) -> tp.List[httpx.Request]:
+        return [
+            request
+            for request in self.endpoint_requests("chart")
+            if ticker is None or request.url.path.endswith(f"/{ticker}")
+        ]
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        endpoint = self.get_endpoint(request)
+        if self._queued.get(endpoint):
+            response = self._queued[endpoint].pop(0)
+        else:
+            response = getattr(self, endpoint)(request)
+        # as sent by yahoo-finance, needed to evaluate the freshness of a response
+        response.headers.setdefault("date", formatdate(usegmt=True))
+        return response
+
+    def chart(self, request: httpx.Request) -> httpx.Response:
+        ticker = unquote(request.url.path.rsplit("/", 1)[1])
+        params = dict(request.url.params)
+        if self.on_chart is not None:
+            response = self.on_chart(ticker, params)
+            if response is not None:
+                return response
+        now = int(time.time())
+        if "period1" in params:
+            start, end = int(params["period1"]), int(params.get("period2", now))
+        else:
+            start, end = now - RANGE_SECONDS[params["range"]], now
+        step = INTERVAL_SECONDS[params["interval"]]
+        timestamp = list(range(-(-start // step) * step, end, step))
+        instrument_type = self.instrument_types.get(ticker, "EQUITY")
+        return httpx.Response(
+            200, json=chart_payload(ticker, timestamp, timestamp, instrument_type)
+        )
+
+    def quote(self, request: httpx.Request) -> httpx.Response:
+        tickers = request.url.params["symbols"].split(",")
+        result = [quote(ticker) for ticker in tickers if ticker not in self.unknown]
+        return httpx.Response(
+            200, json={"quoteResponse": {"result": result, "error": None}}
+        )
+
+    def quote_summary(self, request: httpx.Request) -> httpx.Response:
+        profile = {"sector": "Technology", "industry": "Software", "country": "US"}
+        return httpx.Response(
+            200,
+            json={"quoteSummary": {"result": [{"summaryProfile": profile}]}},
+        )
+
+    def quote_page(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text=quote_page(request.url.path.split("/")[2]))
+
+    def isin(self, request: httpx.Request) -> httpx.Response:
+        ticker = request.url.params["query"]
+        return httpx.Response(200, text=f'["{ticker}|US{ticker:0>10}|Stock"]')
+
+
+# fetchers retrying transient errors
+RETRIED = [
+    bars.get_yahoo_finance_ticker_ohlc,
+    scrapper.get_quote_summary,
+    scrapper._get_quotes_batch,
+    scrapper.get_isin,
+]
+
+
+@pytest.fixture(autouse=True)
+def no_retry_wait(monkeypatch: pytest.MonkeyPatch) -> None:
+    for func in RETRIED:
+        monkeypatch.setattr(func.retry, "wait", wait_none())  # type: ignore
+
+
+@pytest.fixture(autouse=True)
+def scheduler() -> tp.Iterator[RequestScheduler]:
+    """Fresh shared scheduler, without rate limits."""
+    scheduler = RequestScheduler(host_rates={})
+    set_scheduler(scheduler)
+    yield scheduler
+    set_scheduler(RequestScheduler())
+
+
+@pytest.fixture(autouse=True)
+def interval_capabilities(cache_dir: Path) -> IntervalCapabilities:
+    """Fresh shared interval table, in the test's cache dir."""
+    capabilities = IntervalCapabilities(cache_dir / "intervals.json")
+    set_interval_capabilities(capabilities)
+    return capabilities
+
+
+@pytest.fixture
+def yahoo() -> FakeYahoo:
+    return FakeYahoo()
+
+
+@pytest.fixture
+async def client(yahoo: FakeYahoo) -> tp.AsyncIterator[httpx.AsyncClient]:
+    async with create_client(transport=httpx.MockTransport(yahoo)) as client:
+        yield client
@@ -0,0 +1,265 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+import pytest
+
+from finvestor.schemas.bar import Bars
+from finvestor.utils.metrics import MetricsRegistry, set_metrics
+from finvestor.yahoo_finance import bars as yf_bars
+from finvestor.yahoo_finance.bars import (
+    get_yahoo_finance_bars,
+    get_yahoo_finance_panel,
+    get_yahoo_finance_ticker_bars,
+    get_yahoo_finance_ticker_history,
+    iter_yahoo_finance_bars,
+)
+
+from .conftest import chart_payload
+
+
+@pytest.fixture
+def fake_ticker_bars(monkeypatch):
+    """Replace the per-ticker fetch, tracking how many tickers run at once."""
+    state = {"running": 0, "peak": 0, "started": []}
+
+    async def _get_ticker_bars(ticker, **kwargs):
+        state["started"].append(ticker)
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        try:
+            await asyncio.sleep(0.001)
+            if ticker.startswith("BAD"):
+                raise ValueError(ticker)
+            return Bars.empty(interval="1d")
+        finally:
+            state["running"] -= 1
+
+    monkeypatch.setattr(yf_bars, "get_yahoo_finance_ticker_bars", _get_ticker_bars)
+    return state
+
+
+@pytest.mark.anyio
+async def test_iter_bars_yields_every_ticker_and_errors(fake_ticker_bars):
+    tickers = [f"T{i}" for i in range(10)] + ["BAD"]
+    results = {
+        ticker: result
+        async for ticker, result in iter_yahoo_finance_bars(
+            tickers, client=None, period="1d", max_workers=3
+        )
+    }
+    assert set(results) == set(tickers)
+    assert isinstance(results["BAD"], ValueError)
+    assert all(isinstance(results[t], Bars) for t in tickers[:-1])
+    assert fake_ticker_bars["peak"] == 3
+
+
+@pytest.mark.anyio
+async def test_iter_bars_bounds_results_waiting_for_the_consumer(fake_ticker_bars):
+    tickers = [f"T{i}" for i in range(20)]
+    results = iter_yahoo_finance_bars(
+        tickers, client=None, period="1d", max_workers=2, buffer_size=3
+    )
+    await results.__anext__()
+    await asyncio.sleep(0.05)
+    # 1 consumed, 3 buffered and 1 held by each (blocked) worker
+    assert len(fake_ticker_bars["started"]) == 1 + 3 + 2
+    await results.aclose()
+    assert fake_ticker_bars["running"] == 0
+
+
+@pytest.mark.anyio
+async def test_iter_bars_rejects_invalid_bounds():
+    results = iter_yahoo_finance_bars("A", client=None, period="1d", buffer_size=0)
+    with pytest.raises(ValueError):
+        await results.__anext__()
+
+
+@pytest.mark.anyio
+async def test_get_bars_bounds_workers_and_keeps_tickers_order(fake_ticker_bars):
+    tickers = [f"T{i}" for i in range(40)]
+    bars = await get_yahoo_finance_bars(tickers, client=None, period="1d")
+    assert list(bars) == tickers
+    assert fake_ticker_bars["peak"] == yf_bars.DEFAULT_MAX_CONCURRENCY
+
+    with pytest.raises(ValueError):
+        await get_yahoo_finance_bars(["T1", "BAD"], client=None, period="1d")
+
+
+@pytest.mark.anyio
+async def test_get_ticker_bars_from_the_chart_api(yahoo, client):
+    bars = await get_yahoo_finance_ticker_bars(
+        "AAPL", client=client, interval="1h", period="5d"
+    )
+    assert bars.interval == "1h"
+    assert len(bars) > 0
+    np.testing.assert_array_equal(bars.close, bars.timestamp)
+    (request,) = yahoo.chart_requests("AAPL")
+    assert request.url.params["interval"] == "1h"
+    assert request.url.params["range"] == "5d"
+
+
+@pytest.mark.anyio
+async def test_get_ticker_bars_raises_client_errors(yahoo, client):
+    yahoo.on_chart = lambda ticker, params: httpx.Response(404)
+    with pytest.raises(httpx.HTTPStatusError):
+        await get_yahoo_finance_ticker_bars(
+            "AAPL", client=client, interval="1d", period="5d"
+        )
+    assert len(yahoo.chart_requests()) == 1
+
+
+@pytest.mark.anyio
+async def test_get_panel_aligns_tickers_bars(yahoo, client):
+    panel = await get_yahoo_finance_panel(
+        "AAPL,MSFT", client=client, interval="1d", period="1mo"
+    )
+    assert panel.tickers == ["AAPL", "MSFT"]
+    assert panel.interval == "1d"
+    np.testing.assert_array_equal(panel["MSFT"].close, panel.timestamp)
+
+
+@pytest.mark.anyio
+async def test_get_panel_from_chart_arrays(yahoo, client, monkeypatch):
+    def _no_bars(*args, **kwargs):
+        raise AssertionError("the panel is built from the chart arrays")
+
+    monkeypatch.setattr(Bars, "from_ohlc", _no_bars)
+    panel = await get_yahoo_finance_panel(
+        ["AAPL", "MSFT", "TSLA"],
+        client=client,
+        interval="1d",
+        period="5d",
+        max_workers=2,
+    )
+    assert panel.tickers == ["AAPL", "MSFT", "TSLA"]
+    np.testing.assert_array_equal(panel["TSLA"].close, panel.timestamp)
+    with pytest.raises(ValueError):
+        await get_yahoo_finance_panel("AAPL", client=client, max_workers=0)
+
+
+@pytest.mark.anyio
+async def test_chunked_bars_are_fetched_in_windows(yahoo, client):
+    now = int(time.time())
+    start = datetime.fromtimestamp(now - 20 * 86400, tz=timezone.utc)
+    bars = await get_yahoo_finance_ticker_bars(
+        "AAPL", client=client, interval="1m", start=start, chunked=True
+    )
+    requests = yahoo.chart_requests("AAPL")
+    assert len(requests) == 3
+    for request in requests:
+        period = int(request.url.params["period2"]) - int(request.url.params["period1"])
+        assert period <= 7 * 86400
+    assert bars.timestamp[0] == -(-(now - 20 * 86400) // 60) * 60
+    assert (np.diff(bars.timestamp) == 60).all()
+
+
+@pytest.mark.anyio
+async def test_chunked_bars_drop_and_learn_rejected_windows(
+    yahoo, client, interval_capabilities
+):
+    now = int(time.time())
+    retention = now - 30 * 86400
+
+    def _reject_old_windows(ticker, params):
+        if int(params["period1"]) < retention:
+            return httpx.Response(422)
+        return None
+
+    yahoo.on_chart = _reject_old_windows
+    start = datetime.fromtimestamp(now - 40 * 86400, tz=timezone.utc)
+    bars = await get_yahoo_finance_ticker_bars(
+        "AAPL", client=client, interval="1m", start=start, chunked=True
+    )
+    assert len(yahoo.chart_requests("AAPL")) == 6
+    assert bars.timestamp[0] >= retention
+    assert len(bars) > 0
+    assert list(interval_capabilities.df.interval) == ["1m"]
+
+    assert interval_capabilities.asset_types == {"AAPL": "EQUITY"}
+
+    # known rejected windows are skipped
+    again = await get_yahoo_finance_ticker_bars(
+        "AAPL", client=client, interval="1m", start=start, chunked=True
+    )
+    assert len(yahoo.chart_requests("AAPL")) == 6 + 4
+    assert len(again) == len(bars)
+
+
+@pytest.mark.anyio
+async def test_chunked_bars_errors(yahoo, client):
+    start = datetime.fromtimestamp(time.time() - 20 * 86400, tz=timezone.utc)
+    with pytest.raises(ValueError):
+        await get_yahoo_finance_ticker_bars(
+            "AAPL", client=client, interval="auto", start=start, chunked=True
+        )
+
+    yahoo.on_chart = lambda ticker, params: httpx.Response(422)
+    with pytest.raises(httpx.HTTPStatusError):
+        await get_yahoo_finance_ticker_bars(
+            "AAPL", client=client, interval="1m", start=start, chunked=True
+        )
+
+    yahoo.on_chart = lambda ticker, params: httpx.Response(400)
+    with pytest.raises(httpx.HTTPStatusError):
+        await get_yahoo_finance_ticker_bars(
+            "MSFT", client=client, interval="1m", start=start, chunked=True
+        )
+
+
+@pytest.mark.anyio
+async def test_bars_requests_are_measured(yahoo, client):
+    registry = MetricsRegistry()
+    set_metrics(registry)
+    try:
+        bars = await get_yahoo_finance_ticker_bars(
+            "AAPL", client=client, interval="1d", period="5d"
+        )
+    finally:
+        set_metrics(None)
+    assert (
+        registry.histogram("finvestor_http_request_seconds", endpoint="chart")[0] == 1
+    )
+    assert (
+        registry.counter(
+            "finvestor_http_responses_total",
+            host="query2.finance.yahoo.com",
+            endpoint="chart",
+            status="200",
+        )
+        == 1
+    )
+    assert registry.histogram("finvestor_parse_seconds", kind="chart")[0] == 1
+    assert registry.counter("finvestor_bars_rows_total") == len(bars)
+    assert (
+        registry.histogram("finvestor_span_seconds", span="yahoo_finance.ohlc")[0] == 1
+    )
+
+
+@pytest.mark.anyio
+async def test_ticker_history_keeps_the_chart_events(yahoo, client):
+    payload = chart_payload("AAPL", [86400, 2 * 86400], [10.0, 5.0])
+    payload["chart"]["result"][0]["events"] = {
+        "splits": {"1": {"date": 2 * 86400, "numerator": 2, "denominator": 1}},
+        "dividends": {"2": {"date": 2 * 86400, "amount": 0.5}},
+    }
+    payload["chart"]["result"][0]["indicators"]["adjclose"] = [{"adjclose": [9.5, 5.0]}]
+    yahoo.on_chart = lambda ticker, params: httpx.Response(200, json=payload)
+    bars, actions, adjclose = await get_yahoo_finance_ticker_history(
+        "AAPL", client=client, interval="1d", period="5d"
+    )
+    assert bars.timestamp.tolist() == [86400, 2 * 86400]
+    assert yahoo.chart_requests()[0].url.params["events"] == "div,splits"
+    assert actions.split_ratio.tolist() == [2.0]
+    assert actions.dividend_amount.tolist() == [0.5]
+    np.testing.assert_allclose(actions.adjust_bars(bars).close, [4.75, 5.0])
+    # chart prices are split-adjusted, the dividend factors give 'adjclose'
+    np.testing.assert_allclose(actions.adjust_bars(bars, splits=False).close, adjclose)
+
+    del payload["chart"]["result"][0]["indicators"]["adjclose"]
+    *_, adjclose = await get_yahoo_finance_ticker_history(
+        "AAPL", client=client, interval="1h", period="5d"
+    )
+    assert np.isnan(adjclose).all()
@@ -0,0 +1,159 @@
+import time
+
+import httpx
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from finvestor.cli import app
+from finvestor.schemas.bar import Bars
+from finvestor.yahoo_finance.cache import (
+    BarCache,
+    get_requested_range,
+    merge_ranges,
+    subtract_ranges,
+)
+from finvestor.yahoo_finance.utils import YFBarsRequestParams
+
+
+def test_merge_ranges_merges_overlapping_and_touching_ranges():
+    assert merge_ranges([(5, 8), (0, 2), (2, 4), (7, 10), (12, 13)]) == [
+        (0, 4),
+        (5, 10),
+        (12, 13),
+    ]
+    assert merge_ranges([]) == []
+
+
+@pytest.mark.parametrize(
+    "covered, missing",
+    [
+        ([], [(0, 100)]),
+        ([(0, 100)], []),
+        ([(-10, 200)], []),
+        ([(20, 30)], [(0, 20), (30, 100)]),
+        ([(60, 80), (10, 30)], [(0, 10), (30, 60), (80, 100)]),
+        ([(0, 50), (40, 60)], [(60, 100)]),
+        ([(-20, -10), (150, 200)], [(0, 100)]),
+        ([(90, 150)], [(0, 90)]),
+    ],
+)
+def test_subtract_ranges(covered, missing):
+    assert subtract_ranges(0, 100, covered) == missing
+
+
+def test_get_requested_range_clips_end_to_now():
+    now = 1_000_000
+    params = YFBarsRequestParams(interval="1d", start=10, end=2_000_000)
+    assert get_requested_range(params, now) == (10, now)
+    params = YFBarsRequestParams(interval="1d", period="5d")
+    assert get_requested_range(params, now) == (now - 5 * 86400, now)
+
+
+def test_bar_cache_write_read_and_covered_ranges(tmp_path):
+    cache = BarCache(tmp_path / "bars.sqlite")
+    key = ("AAPL", "1d", "", 0)
+    bars = Bars(
+        np.array([0, 86400, 2 * 86400]),
+        np.arange(15, dtype=np.float64).reshape(3, 5),
+        interval="1d",
+    )
+    cache.write(key, bars, covered=(0, 2 * 86400))
+    cache.write(key, Bars.empty(interval="1d"), covered=(5 * 86400, 6 * 86400))
+
+    read = cache.read(key, 86400, 3 * 86400)
+    np.testing.assert_array_equal(read.timestamp, [86400, 2 * 86400])
+    np.testing.assert_array_equal(read.values, bars.values[1:])
+    assert cache.covered_ranges(key) == [(0, 2 * 86400), (5 * 86400, 6 * 86400)]
+    assert cache.missing_ranges(key, 0, 7 * 86400) == [
+        (2 * 86400, 5 * 86400),
+        (6 * 86400, 7 * 86400),
+    ]
+    # other keys are independent
+    assert cache.covered_ranges(("AAPL", "1h", "", 0)) == []
+    cache.close()
+
+
+def test_bar_cache_rejects_auto_interval():
+    with pytest.raises(ValueError):
+        BarCache.get_key("AAPL", YFBarsRequestParams(interval="auto", period="1d"))
+
+
+@pytest.mark.anyio
+async def test_bar_cache_only_fetches_missing_ranges(tmp_path, yahoo, client):
+    cache = BarCache(tmp_path / "bars.sqlite")
+    now = int(time.time())
+    start = now - now % 86400 - 20 * 86400
+    params = YFBarsRequestParams(interval="1d", start=start)
+
+    first = await cache.get_ticker_bars("AAPL", params=params, client=client)
+    assert len(yahoo.chart_requests("AAPL")) == 1
+    assert len(first) >= 20
+    np.testing.assert_array_equal(first.close, first.timestamp)
+
+    # only the still open candle is fetched again
+    second = await cache.get_ticker_bars("AAPL", params=params, client=client)
+    requests = yahoo.chart_requests("AAPL")
+    assert len(requests) == 2
+    assert int(requests[1].url.params["period1"]) >= now - 2 * 86400
+    np.testing.assert_array_equal(second.timestamp, first.timestamp)
+
+    # an older start only fetches the older gap (and the open candle)
+    older = params.copy(update={"start": start - 10 * 86400})
+    bars = await cache.get_ticker_bars("AAPL", params=older, client=client)
+    requests = yahoo.chart_requests("AAPL")[2:]
+    assert len(requests) == 2
+    assert (str(start - 10 * 86400), str(start)) in [
+        (r.url.params["period1"], r.url.params["period2"]) for r in requests
+    ]
+    assert bars.timestamp[0] == start - 10 * 86400
+    cache.close()
+
+
+@pytest.mark.anyio
+async def test_bar_cache_skips_rejected_gaps(tmp_path, yahoo, client):
+    cache = BarCache(tmp_path / "bars.sqlite")
+    now = int(time.time())
+    start = now - now % 86400 - 20 * 86400
+    params = YFBarsRequestParams(interval="1m", start=start, end=start + 14 * 86400)
+
+    # the first 7 days window is older than the intraday retention
+    yahoo.on_chart = lambda ticker, p: (
+        httpx.Response(422, json={"chart": {"result": None, "error": "too old"}})
+        if int(p["period1"]) < start + 7 * 86400
+        else None
+    )
+    bars = await cache.get_ticker_bars("AAPL", params=params, client=client)
+    assert len(yahoo.chart_requests("AAPL")) == 2
+    assert bars.timestamp[0] == start + 7 * 86400
+    assert cache.covered_ranges(cache.get_key("AAPL", params)) == [
+        (start + 7 * 86400, start + 14 * 86400)
+    ]
+
+    # nothing left to fetch but the rejected range
+    older = params.copy(update={"end": start + 7 * 86400})
+    with pytest.raises(httpx.HTTPStatusError):
+        await cache.get_ticker_bars("AAPL", params=older, client=client)
+
+
+@pytest.mark.anyio
+async def test_bar_cache_stores_fetched_gaps_on_errors(tmp_path, yahoo, client):
+    cache = BarCache(tmp_path / "bars.sqlite")
+    now = int(time.time())
+    start = now - now % 86400 - 20 * 86400
+    params = YFBarsRequestParams(interval="1m", start=start, end=start + 14 * 86400)
+
+    yahoo.on_chart = lambda ticker, p: (
+        httpx.Response(404) if int(p["period1"]) < start + 7 * 86400 else None
+    )
+    with pytest.raises(httpx.HTTPStatusError):
+        await cache.get_ticker_bars("AAPL", params=params, client=client)
+    assert cache.covered_ranges(cache.get_key("AAPL", params)) == [
+        (start + 7 * 86400, start + 14 * 86400)
+    ]
+
+
+def test_cli_rejects_caching_auto_intervals():
+    result = CliRunner().invoke(app, ["yahoo", "-t", "AAPL", "--cache"])
+    assert result.exit_code == 2
+    assert "explicit interval" in result.output
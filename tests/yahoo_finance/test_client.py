@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import shutil
+import ssl
+import subprocess
+from datetime import timedelta
+
+import h2.config
+import h2.connection
+import h2.events
+import httpx
+import pytest
+
+from finvestor.yahoo_finance import client as client_module
+from finvestor.yahoo_finance.client import (
+    DEFAULT_CACHE_RULES,
+    CacheRulesTransport,
+    create_client,
+)
+from finvestor.yahoo_finance.utils import YF_CHART_URI, YF_QUOTE_API_URI
+
+
+def test_cache_rules_longest_prefix_wins(tmp_path):
+    transport = CacheRulesTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200)),
+        cache=None,
+        rules={
+            "https://example.com/": timedelta(minutes=1),
+            "https://example.com/static/": timedelta(days=1),
+        },
+    )
+    assert transport.get_max_age(httpx.URL("https://example.com/static/a")) == 86400
+    assert transport.get_max_age(httpx.URL("https://example.com/api")) == 60
+    assert transport.get_max_age(httpx.URL("https://other.com/")) is None
+
+
+def test_default_cache_rules_keep_charts_fresh():
+    transport = CacheRulesTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200)),
+        cache=None,
+        rules=DEFAULT_CACHE_RULES,
+    )
+    chart_url = httpx.URL(YF_CHART_URI.format(ticker="AAPL"))
+    assert transport.get_max_age(chart_url) == 60
+    assert transport.get_max_age(httpx.URL(YF_QUOTE_API_URI)) == 300
+
+
+@pytest.mark.anyio
+async def test_create_client_caches_matching_requests(tmp_path, yahoo):
+    client = create_client(
+        transport=httpx.MockTransport(yahoo), cache=True, cache_dir=tmp_path / "http"
+    )
+    async with client:
+        url = YF_QUOTE_API_URI
+        for _ in range(2):
+            resp = await client.get(url, params={"symbols": "AAPL"})
+            assert resp.json()["quoteResponse"]["result"][0]["symbol"] == "AAPL"
+        assert len(yahoo.endpoint_requests("quote")) == 1
+
+        # requests with their own cache-control skip the rules
+        await client.get(
+            url, params={"symbols": "AAPL"}, headers={"cache-control": "no-cache"}
+        )
+        assert len(yahoo.endpoint_requests("quote")) == 2
+
+        # urls without a rule are never cached
+        for _ in range(2):
+            await client.get(
+                "https://markets.businessinsider.com/other", params={"query": "A"}
+            )
+        assert len(yahoo.endpoint_requests("isin")) == 2
+
+
+@pytest.mark.anyio
+async def test_create_client_without_cache(yahoo):
+    async with create_client(transport=httpx.MockTransport(yahoo)) as client:
+        for _ in range(2):
+            await client.get(YF_QUOTE_API_URI, params={"symbols": "AAPL"})
+    assert len(yahoo.endpoint_requests("quote")) == 2
+
+
+@pytest.fixture
+def tls_cert(tmp_path, monkeypatch):
+    """Self-signed certificate of 'localhost', trusted by httpx clients."""
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is not installed")
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1"]
+        + ["-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost"]
+        + ["-keyout", str(key), "-out", str(cert)],
+        check=True,
+        capture_output=True,
+    )
+    monkeypatch.setenv("SSL_CERT_FILE", str(cert))
+    return cert, key
+
+
+async def _serve_h2(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Answer every request of a HTTP/2 connection with its negotiated protocol."""
+    protocol = writer.get_extra_info("ssl_object").selected_alpn_protocol()
+    conn = h2.connection.H2Connection(
+        h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+    )
+    conn.initiate_connection()
+    writer.write(conn.data_to_send())
+    while not reader.at_eof():
+        data = await reader.read(65535)
+        for event in conn.receive_data(data):
+            if isinstance(event, h2.events.StreamEnded):
+                conn.send_headers(event.stream_id, [(":status", "200")])
+                conn.send_data(event.stream_id, protocol.encode(), end_stream=True)
+        writer.write(conn.data_to_send())
+        await writer.drain()
+    writer.close()
+
+
+@pytest.mark.anyio
+async def test_create_client_negotiates_http2(tls_cert):
+    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ssl_context.load_cert_chain(*tls_cert)
+    ssl_context.set_alpn_protocols(["h2"])
+    server = await asyncio.start_server(_serve_h2, "localhost", 0, ssl=ssl_context)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        async with create_client() as client:
+            responses = await asyncio.gather(
+                *[client.get(f"https://localhost:{port}/{i}") for i in range(3)]
+            )
+    assert [r.http_version for r in responses] == ["HTTP/2"] * 3
+    assert [r.text for r in responses] == ["h2"] * 3
+
+
+def test_create_client_warns_without_h2(monkeypatch, caplog):
+    monkeypatch.setattr(client_module, "has_http2", lambda: False)
+    create_client()
+    assert "pip install httpx[http2]" in caplog.text
+    caplog.clear()
+    create_client(http2=False)
+    assert not [r for r in caplog.records if r.levelno >= logging.WARNING]
@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+import pytest
+
+from finvestor.yahoo_finance.decoding import (
+    JSON_DECODERS,
+    ChartDecodeError,
+    ChartEmptyError,
+    decode_chart,
+    get_instrument_type,
+    loads_json,
+)
+
+from .conftest import chart_payload
+
+
+@pytest.mark.parametrize("decoder", sorted(JSON_DECODERS))
+def test_loads_json(decoder):
+    content = b'{"a": [1, 2.5, null]}'
+    assert loads_json(content, decoder=decoder) == {"a": [1, 2.5, None]}
+    assert loads_json(content.decode(), decoder=decoder) == {"a": [1, 2.5, None]}
+
+
+def test_decode_chart_converts_nulls_to_nan():
+    payload = chart_payload("SPY", [60, 120, 180], [1.0, None, 3.0], "ETF")
+    ohlc = decode_chart(json.dumps(payload).encode())
+    assert ohlc["timestamp"].dtype == np.int64
+    assert ohlc["timestamp"].tolist() == [60, 120, 180]
+    for field in ("open", "high", "low", "close"):
+        assert ohlc[field].dtype == np.float64
+        np.testing.assert_array_equal(ohlc[field], [1.0, np.nan, 3.0])
+    assert np.isnan(ohlc["adjclose"]).all()
+    assert len(ohlc["dividend_timestamp"]) == len(ohlc["split_timestamp"]) == 0
+    assert get_instrument_type(ohlc) == "ETF"
+
+
+def test_decode_chart_events_and_adjclose():
+    payload = chart_payload("AAPL", [60, 120], [1.0, 2.0])
+    result = payload["chart"]["result"][0]
+    result["indicators"]["adjclose"] = [{"adjclose": [0.5, None]}]
+    result["events"] = {
+        "dividends": {
+            "120": {"date": 120, "amount": 0.2},
+            "60": {"date": 60, "amount": 0.1},
+        },
+        "splits": {
+            "120": {"date": 120, "numerator": 4, "denominator": 1},
+            "90": {"date": 90, "numerator": 0, "denominator": 0},
+        },
+    }
+    ohlc = decode_chart(json.dumps(payload))
+    np.testing.assert_array_equal(ohlc["adjclose"], [0.5, np.nan])
+    assert ohlc["dividend_timestamp"].tolist() == [60, 120]
+    assert ohlc["dividend_amount"].tolist() == [0.1, 0.2]
+    assert ohlc["split_timestamp"].tolist() == [120]
+    assert ohlc["split_ratio"].tolist() == [4.0]
+
+
+def test_decode_chart_without_instrument_type():
+    payload = chart_payload("AAPL", [60], [1.0])
+    del payload["chart"]["result"][0]["meta"]
+    assert get_instrument_type(decode_chart(json.dumps(payload))) is None
+
+
+@pytest.mark.parametrize(
+    "payload, error",
+    [
+        ({"chart": {"result": None, "error": {"code": "Not Found"}}}, ChartDecodeError),
+        ({"chart": {"result": []}}, ChartDecodeError),
+        ({"chart": {"result": [{"meta": {}}]}}, ChartEmptyError),
+        (
+            {"chart": {"result": [{"timestamp": [60], "indicators": {}}]}},
+            ChartDecodeError,
+        ),
+    ],
+)
+def test_decode_chart_errors(payload, error):
+    with pytest.raises(error):
+        decode_chart(json.dumps(payload))
@@ -0,0 +1,120 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+
+from finvestor.schemas.bar import BAR_FIELDS, Bars, BarsPanel
+from finvestor.yahoo_finance.fx import FXRates, get_fx_ticker, normalize_currency
+
+from .conftest import chart_payload
+
+DAY = 86400
+RATES = {"EURUSD=X": 1.2, "GBPUSD=X": 1.5}
+# 2021-01-04 00:00 UTC
+JAN_4 = 1609718400
+
+
+@pytest.fixture
+def fx_yahoo(yahoo):
+    """Daily fx bars with a constant rate per pair."""
+
+    def _chart(ticker, params):
+        start, end = int(params["period1"]), int(params["period2"])
+        timestamp = list(range(-(-start // DAY) * DAY, end, DAY))
+        return httpx.Response(
+            200, json=chart_payload(ticker, timestamp, [RATES[ticker]] * len(timestamp))
+        )
+
+    yahoo.on_chart = _chart
+    return yahoo
+
+
+def test_normalize_currency():
+    assert normalize_currency("GBp") == ("GBP", 0.01)
+    assert normalize_currency("EUR") == ("EUR", 1.0)
+    assert get_fx_ticker("EUR", "USD") == "EURUSD=X"
+
+
+@pytest.mark.anyio
+async def test_convert_transactions(fx_yahoo, client):
+    df = pd.DataFrame(
+        {
+            "currency": ["EUR", "GBp", "USD", None],
+            "open_date": pd.to_datetime(
+                [JAN_4 + 3600, JAN_4 + DAY, JAN_4, JAN_4 + 2 * DAY], unit="s"
+            ),
+            "open_rate": [10.0, 200.0, 3.0, 4.0],
+        }
+    )
+    fx_rates = FXRates()
+    converted = await fx_rates.convert_transactions(df, client=client)
+    np.testing.assert_allclose(converted["open_rate"], [12.0, 3.0, 3.0, 4.0])
+    assert converted["currency"].tolist() == ["USD"] * 4
+    assert df["open_rate"].tolist() == [10.0, 200.0, 3.0, 4.0]
+    assert sorted(fx_rates.pairs) == ["EURUSD=X", "GBPUSD=X"]
+    assert len(fx_yahoo.chart_requests()) == 2
+
+    # loaded ranges are reused
+    await fx_rates.convert_transactions(df.iloc[:2], client=client)
+    assert len(fx_yahoo.chart_requests()) == 2
+
+
+@pytest.mark.anyio
+async def test_concurrent_loads_merge_the_ranges(fx_yahoo, client):
+    fx_rates = FXRates()
+    ranges = [(JAN_4, JAN_4 + DAY), (JAN_4 + 10 * DAY, JAN_4 + 12 * DAY)]
+    await asyncio.gather(
+        *[
+            fx_rates.load(["EUR"], "USD", client=client, start=start, end=end)
+            for start, end in ranges
+        ]
+    )
+    # the second load waits for the first one and fetches the merged range
+    requests = fx_yahoo.chart_requests("EURUSD=X")
+    assert len(requests) == 2
+    assert int(requests[1].url.params["period1"]) == int(
+        requests[0].url.params["period1"]
+    )
+    rates = fx_rates.get_rates("EUR", "USD", np.array([start for start, _ in ranges]))
+    np.testing.assert_array_equal(rates, [1.2, 1.2])
+    series = fx_rates.get_series("EUR", "USD")
+    assert series.timestamp[0] <= JAN_4 and series.timestamp[-1] >= JAN_4 + 12 * DAY
+
+
+@pytest.mark.anyio
+async def test_get_rates(fx_yahoo, client):
+    fx_rates = FXRates()
+    with pytest.raises(KeyError):
+        fx_rates.get_rates("EUR", "USD", np.array([JAN_4]))
+    await fx_rates.load(["EUR"], "USD", client=client, start=JAN_4, end=JAN_4)
+    rates = fx_rates.get_rates(
+        np.array(["EUR", "USD", "EUR"]), "USD", np.array([JAN_4, JAN_4, 0])
+    )
+    np.testing.assert_array_equal(rates, [1.2, 1.0, np.nan])
+
+
+@pytest.mark.anyio
+async def test_convert_bars_and_panel(fx_yahoo, client):
+    timestamp = np.array([JAN_4, JAN_4 + DAY], dtype=np.int64)
+    values = np.ones((2, len(BAR_FIELDS)))
+    fx_rates = FXRates()
+
+    bars = await fx_rates.convert_bars(
+        Bars(timestamp, values, interval="1d"), "EUR", client=client
+    )
+    np.testing.assert_allclose(bars.close, [1.2, 1.2])
+    np.testing.assert_allclose(bars.volume, [1.0, 1.0])
+
+    panel = BarsPanel(
+        timestamp,
+        ["SAP", "AAPL", "VOD.L"],
+        np.ones((2, 3, len(BAR_FIELDS))),
+        interval="1d",
+    )
+    panel = await fx_rates.convert_panel(
+        panel, {"SAP": "EUR", "VOD.L": "GBp"}, client=client
+    )
+    close = panel.values[:, :, BAR_FIELDS.index("close")]
+    np.testing.assert_allclose(close, [[1.2, 1.0, 0.015], [1.2, 1.0, 0.015]])
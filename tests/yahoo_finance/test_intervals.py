@@ -0,0 +1,155 @@
+import json
+import time
+from datetime import timedelta
+
+import httpx
+import pytest
+
+from finvestor.schemas.asset import Asset
+from finvestor.yahoo_finance.bars import get_yahoo_finance_ticker_bars
+from finvestor.yahoo_finance.intervals import IntervalCapabilities, guess_asset_type
+from finvestor.yahoo_finance.registry import AssetRegistry
+from finvestor.yahoo_finance.utils import YFBarsRequestParams, get_valid_intervals
+
+DAY = YFBarsRequestParams(interval="auto", period="1d")
+MONTH = YFBarsRequestParams(interval="auto", period="1mo")
+
+
+def test_record_and_resolve_per_asset_type(tmp_path):
+    capabilities = IntervalCapabilities(tmp_path / "intervals.json")
+    capabilities.record(
+        "AAPL", DAY, asset_type="EQUITY", rejected=["1m", "2m"], accepted="5m"
+    )
+    assert capabilities.resolve("AAPL", DAY, get_valid_intervals(DAY))[0] == "5m"
+    # same asset type, once known
+    capabilities.record("MSFT", MONTH, asset_type="EQUITY", rejected=[])
+    assert capabilities.resolve("MSFT", DAY, get_valid_intervals(DAY))[0] == "5m"
+    # other asset types and range buckets are not affected
+    capabilities.record("SPY", MONTH, asset_type="ETF", rejected=[])
+    assert capabilities.resolve("SPY", DAY, get_valid_intervals(DAY))[0] == "1m"
+    assert capabilities.resolve("AAPL", MONTH, get_valid_intervals(MONTH))[0] == "2m"
+    # the asset type of tickers without a known chart is guessed
+    assert capabilities.resolve("TSLA", DAY, get_valid_intervals(DAY))[0] == "5m"
+    assert capabilities.resolve("ETH-USD", DAY, get_valid_intervals(DAY))[0] == "1m"
+
+    # persisted
+    capabilities.flush()
+    reloaded = IntervalCapabilities(tmp_path / "intervals.json")
+    assert reloaded.rejected("EQUITY/1d") == {"1m", "2m"}
+    assert reloaded.asset_types == {"AAPL": "EQUITY", "MSFT": "EQUITY", "SPY": "ETF"}
+    assert reloaded.df[["asset_type", "range"]].drop_duplicates().values.tolist() == [
+        ["EQUITY", "1d"]
+    ]
+
+    # an accepted interval is no longer rejected
+    reloaded.record("AAPL", DAY, asset_type="EQUITY", rejected=[], accepted="1m")
+    assert reloaded.rejected("EQUITY/1d") == {"2m"}
+
+
+def test_record_without_asset_type_is_ignored(tmp_path):
+    capabilities = IntervalCapabilities(tmp_path / "intervals.json")
+    capabilities.record("AAPL", DAY, asset_type=None, rejected=["1m"])
+    assert capabilities.table == {}
+    assert not (tmp_path / "intervals.json").exists()
+
+
+def test_asset_types_of_unknown_tickers(tmp_path):
+    registry = AssetRegistry(tmp_path / "assets.sqlite")
+    registry.put([Asset(ticker="SPY", type="ETF"), Asset(ticker="VTSAX")])
+    capabilities = IntervalCapabilities(tmp_path / "intervals.json", registry=registry)
+    capabilities.record("QQQ", DAY, asset_type="ETF", rejected=["1m"])
+    assert capabilities.resolve("SPY", DAY, get_valid_intervals(DAY))[0] == "2m"
+    assert capabilities.get_asset_type("VTSAX") == "EQUITY"
+    # the asset type of the charts wins
+    capabilities.record("SPY", MONTH, asset_type="EQUITY", rejected=[])
+    assert capabilities.get_asset_type("SPY") == "EQUITY"
+    registry.close()
+
+
+@pytest.mark.parametrize(
+    "ticker, asset_type",
+    [
+        ("AAPL", "EQUITY"),
+        ("VOD.L", "EQUITY"),
+        ("BRK-B", "EQUITY"),
+        ("^GSPC", "INDEX"),
+        ("EURUSD=X", "CURRENCY"),
+        ("CL=F", "FUTURE"),
+        ("BTC-USD", "CRYPTOCURRENCY"),
+    ],
+)
+def test_guess_asset_type(ticker, asset_type):
+    assert guess_asset_type(ticker) == asset_type
+
+
+def test_changes_are_saved_in_batches(tmp_path):
+    path = tmp_path / "intervals.json"
+    capabilities = IntervalCapabilities(path, save_interval=3600)
+    capabilities.record("AAPL", DAY, asset_type="EQUITY", rejected=["1m"])
+    saved = path.read_text()
+    capabilities.record("MSFT", DAY, asset_type="EQUITY", rejected=["1m"])
+    capabilities.record("SPY", DAY, asset_type="ETF", rejected=[])
+    assert path.read_text() == saved
+    capabilities.flush()
+    assert IntervalCapabilities(path).asset_types.keys() == {"AAPL", "MSFT", "SPY"}
+
+    # recent rejections are not rewritten
+    rejected_at = capabilities.table["EQUITY/1d"]["1m"] = int(time.time()) - 60
+    capabilities.record("MSFT", DAY, asset_type="EQUITY", rejected=["1m"])
+    assert capabilities.table["EQUITY/1d"]["1m"] == rejected_at
+    assert not capabilities._dirty
+
+
+def test_resolve_keeps_the_coarsest_interval(tmp_path):
+    capabilities = IntervalCapabilities(tmp_path / "intervals.json")
+    valid_intervals = get_valid_intervals(DAY)
+    capabilities.record(
+        "AAPL", DAY, asset_type="EQUITY", rejected=list(valid_intervals)
+    )
+    assert capabilities.resolve("AAPL", DAY, valid_intervals) == ("3mo",)
+
+
+def test_rejections_expire(tmp_path):
+    capabilities = IntervalCapabilities(
+        tmp_path / "intervals.json", ttl=timedelta(days=1)
+    )
+    capabilities.record("AAPL", DAY, asset_type="EQUITY", rejected=["1m"])
+    capabilities.table["EQUITY/1d"]["1m"] -= 2 * 86400
+    assert capabilities.rejected("EQUITY/1d") == set()
+
+
+def test_guessed_tables_are_reset(tmp_path):
+    path = tmp_path / "intervals.json"
+    path.write_text(json.dumps({"EQUITY/1d": {"1m": int(time.time())}}))
+    capabilities = IntervalCapabilities(path)
+    assert capabilities.table == {}
+    assert capabilities.asset_types == {}
+
+
+@pytest.mark.anyio
+async def test_auto_interval_learns_rejections_per_asset_type(
+    yahoo, client, interval_capabilities
+):
+    def _reject_minute_bars(ticker, params):
+        if params["interval"] == "1m" and ticker != "BTC-USD":
+            return httpx.Response(422)
+        return None
+
+    yahoo.on_chart = _reject_minute_bars
+    yahoo.instrument_types["BTC-USD"] = "CRYPTOCURRENCY"
+    bars = await get_yahoo_finance_ticker_bars("AAPL", client=client, period="1d")
+    assert bars.interval == "2m"
+    assert [r.url.params["interval"] for r in yahoo.chart_requests("AAPL")] == [
+        "1m",
+        "2m",
+    ]
+    assert interval_capabilities.rejected("EQUITY/1d") == {"1m"}
+
+    # applies to the first request of a ticker of the same (guessed) asset type
+    await get_yahoo_finance_ticker_bars("MSFT", client=client, period="1d")
+    assert [r.url.params["interval"] for r in yahoo.chart_requests("MSFT")] == ["2m"]
+
+    bars = await get_yahoo_finance_ticker_bars("BTC-USD", client=client, period="1d")
+    assert bars.interval == "1m"
+    assert interval_capabilities.asset_types["BTC-USD"] == "CRYPTOCURRENCY"
+    assert interval_capabilities.rejected("CRYPTOCURRENCY/1d") == set()
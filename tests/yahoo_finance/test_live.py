@@ -0,0 +1,149 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+from finvestor.schemas.bar import BAR_FIELDS, Bars
+from finvestor.yahoo_finance.live import (
+    BarRingBuffer,
+    LiveBarsPoller,
+    get_next_boundary,
+)
+
+from .conftest import chart_payload
+
+
+def make_bars(timestamp, close=None, interval="1m"):
+    timestamp = np.asarray(timestamp, dtype=np.int64)
+    close = timestamp if close is None else close
+    values = np.repeat(
+        np.asarray(close, dtype=np.float64)[:, None], len(BAR_FIELDS), axis=1
+    )
+    return Bars(timestamp, values, interval=interval)
+
+
+def test_ring_buffer_bulk_fill_keeps_the_latest_bars():
+    buffer = BarRingBuffer(3, interval="1m")
+    assert buffer.last_timestamp is None
+    changes = buffer.update(make_bars([60, 120, 180, 240, 300]))
+    assert changes == [("new", 0), ("new", 1), ("new", 2)]
+    assert len(buffer) == 3
+    assert buffer.bars.timestamp.tolist() == [180, 240, 300]
+    assert buffer.last_timestamp == 300
+
+
+def test_ring_buffer_appends_and_wraps():
+    buffer = BarRingBuffer(3, interval="1m")
+    buffer.update(make_bars([60, 120, 180]))
+    assert buffer.update(make_bars([240, 300])) == [("new", 0), ("new", 1)]
+    assert buffer.bars.timestamp.tolist() == [180, 240, 300]
+    assert buffer.bars.close.tolist() == [180, 240, 300]
+
+
+def test_ring_buffer_patches_bars_in_place():
+    buffer = BarRingBuffer(4, interval="1m")
+    buffer.update(make_bars([60, 120, 180]))
+    # the last bar is still forming, older bars are patched by timestamp
+    changes = buffer.update(make_bars([120, 180, 200], close=[1.0, 180.0, 2.0]))
+    assert changes == [("update", 1), ("update", 2)]
+    assert buffer.bars.timestamp.tolist() == [60, 120, 200]
+    assert buffer.bars.close.tolist() == [60.0, 1.0, 2.0]
+    assert buffer.last_timestamp == 200
+    assert buffer.last_opened == 180
+    bar = buffer.get_bar(2)
+    assert (bar.timestamp.timestamp(), bar.close) == (200, 2.0)
+
+    # the closed candle is published with its start, the next one is appended
+    changes = buffer.update(make_bars([180, 240], close=[3.0, 240.0]))
+    assert changes == [("update", 2), ("new", 3)]
+    assert buffer.bars.timestamp.tolist() == [60, 120, 180, 240]
+    assert buffer.bars.close.tolist() == [60.0, 1.0, 3.0, 240.0]
+
+    # unknown old bars and bars without a close are skipped
+    assert buffer.update(make_bars([30, 300], close=[1.0, np.nan])) == []
+    assert len(buffer) == 4
+
+
+def test_ring_buffer_previous_close():
+    buffer = BarRingBuffer(3, interval="1m")
+    buffer.update(make_bars([60, 120]))
+    buffer.update(make_bars([150]))  # forming bar, patched with its last trade
+    # the new bar opens late, the previous candle closed at 180
+    assert buffer.update(make_bars([200])) == [("new", 2)]
+    assert buffer.get_previous_close(2) == 180
+    assert buffer.update(make_bars([260])) == [("new", 0)]
+    assert buffer.get_previous_close(0) == 260
+    # the bar before the oldest one is no longer kept
+    assert buffer.get_previous_close(1) == 120
+
+
+def test_ring_buffer_errors():
+    with pytest.raises(ValueError):
+        BarRingBuffer(0, interval="1m")
+    with pytest.raises(ValueError):
+        LiveBarsPoller("AAPL", client=None, interval="1mo")  # type: ignore
+
+
+def test_get_next_boundary():
+    assert get_next_boundary(59.5, 60) == 60
+    assert get_next_boundary(60, 60) == 120
+
+
+@pytest.mark.anyio
+async def test_poller_emits_new_and_updated_bars(yahoo, client):
+    # ticker -> newest (timestamp, close) published by yahoo-finance
+    published = {"AAPL": [(60, 60.0), (120, 120.0)], "MSFT": [(60, 60.0)]}
+
+    def _chart(ticker, params):
+        timestamp, close = zip(*published[ticker])
+        return httpx.Response(200, json=chart_payload(ticker, timestamp, close))
+
+    yahoo.on_chart = _chart
+    poller = LiveBarsPoller(["AAPL", "MSFT"], client=client, interval="1m")
+    events = []
+    poller.subscribe(events.append)
+
+    await poller.poll(initial=True)
+    assert events == []
+    assert poller["AAPL"].timestamp.tolist() == [60, 120]
+
+    published["AAPL"] = [(120, 120.0), (180, 180.0)]
+    await poller.poll()
+    assert [(e.ticker, e.kind) for e in events] == [("AAPL", "new")]
+    assert events[0].bar.close == 180.0
+    assert events[0].latency is not None
+    assert poller.latency_stats()["count"] == 1
+    # the next poll only requests bars from the last buffered bar
+    assert int(yahoo.chart_requests("AAPL")[-1].url.params["period1"]) == 120
+
+    published["MSFT"] = [(60, 61.0), (120, 120.0)]
+    await poller.poll()
+    assert [(e.ticker, e.kind) for e in events[1:]] == [
+        ("MSFT", "update"),
+        ("MSFT", "new"),
+    ]
+
+
+@pytest.mark.anyio
+async def test_poller_events_until_stopped(yahoo, client):
+    yahoo.on_chart = lambda ticker, params: httpx.Response(
+        200, json=chart_payload(ticker, [60], [60.0])
+    )
+    poller = LiveBarsPoller("AAPL", client=client, interval="1m")
+    await poller.poll(initial=True)
+    yahoo.on_chart = lambda ticker, params: httpx.Response(
+        200, json=chart_payload(ticker, [60, 120], [60.0, 120.0])
+    )
+
+    async def _poll_and_stop():
+        await asyncio.sleep(0)
+        await poller.poll()
+        poller.stop()
+
+    task = asyncio.ensure_future(_poll_and_stop())
+    received = [event async for event in poller.events()]
+    await task
+    assert [(e.ticker, e.kind, e.bar.close) for e in received] == [
+        ("AAPL", "new", 120.0)
+    ]
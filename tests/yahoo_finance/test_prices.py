@@ -0,0 +1,72 @@
+import time
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+
+from finvestor.schemas.bar import Bars
+from finvestor.yahoo_finance.prices import (
+    get_price_at_timestamp,
+    get_prices,
+    get_prices_at_timestamps,
+    lookup_prices,
+)
+
+HOUR = 3600
+
+
+def make_hourly_bars():
+    # open is the hour, close is the hour + 0.5, the 3rd bar has no prices
+    timestamp = np.array([0, HOUR, 2 * HOUR, 3 * HOUR])
+    values = np.zeros((4, 5))
+    values[:, 0] = [0.0, 1.0, np.nan, 3.0]
+    values[:, 3] = [0.5, 1.5, np.nan, 3.5]
+    return Bars(timestamp + 10 * HOUR, values, interval="1h")
+
+
+def test_lookup_prices_uses_the_open_of_the_bar_or_the_last_close():
+    bars = make_hourly_bars()
+    timestamps = np.array([9, 10, 10.5, 11, 12.2, 13.9, 14, 40]) * HOUR
+    np.testing.assert_array_equal(
+        lookup_prices(bars, timestamps.astype(np.int64)),
+        [np.nan, 0.0, 0.0, 1.0, 1.5, 3.0, 3.5, 3.5],
+    )
+
+
+def test_lookup_prices_without_bars():
+    prices = lookup_prices(Bars.empty(interval="1d"), np.array([1, 2]))
+    assert np.isnan(prices).all()
+
+
+@pytest.mark.anyio
+async def test_get_prices_at_timestamps_with_a_single_request(yahoo, client):
+    now = int(time.time())
+    seconds = [now - 3 * 86400 + 30, now - 86400 + 90, now - 5 * 86400]
+    timestamps = pd.Series(pd.to_datetime(seconds, unit="s", utc=True))
+    prices = await get_prices_at_timestamps("AAPL", timestamps, client=client)
+    (request,) = yahoo.chart_requests("AAPL")
+    # the finest interval accepted for 12 days (with the lookback)
+    assert request.url.params["interval"] == "2m"
+    # bars of the fake chart open at their timestamp
+    np.testing.assert_array_equal(prices, [s - s % 120 for s in seconds])
+
+    empty = await get_prices_at_timestamps("AAPL", [], client=client)
+    assert empty.shape == (0,)
+    assert len(yahoo.chart_requests("AAPL")) == 1
+
+
+@pytest.mark.anyio
+async def test_get_prices_of_many_tickers(yahoo, client):
+    yahoo.on_chart = lambda ticker, _: httpx.Response(404) if ticker == "BAD" else None
+    timestamp = datetime(2021, 6, 1, 12, tzinfo=timezone.utc)
+    prices = await get_prices({"AAPL": [timestamp], "MSFT": [timestamp]}, client=client)
+    assert list(prices) == ["AAPL", "MSFT"]
+    day = int(timestamp.timestamp()) // 86400 * 86400
+    assert prices["AAPL"][0] == day
+
+    price = await get_price_at_timestamp("MSFT", client=client, timestamp=timestamp)
+    assert price == day
+    with pytest.raises(httpx.HTTPStatusError):
+        await get_price_at_timestamp("BAD", client=client, timestamp=timestamp)
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+import pytest
+
+from finvestor.schemas.asset import Asset
+from finvestor.yahoo_finance.portfolio import load_assets
+from finvestor.yahoo_finance.registry import AssetRegistry
+
+
+def make_asset(ticker: str, isin: str = None) -> Asset:
+    return Asset(ticker=ticker, name=f"{ticker} Inc.", type="EQUITY", isin=isin)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = AssetRegistry(tmp_path / "assets.sqlite")
+    yield registry
+    registry.close()
+
+
+def test_registry_put_get_and_isin_lookups(registry):
+    registry.put(
+        [
+            make_asset("AAPL", "US0378331005"),
+            make_asset("APC.DE", "US0378331005"),
+            make_asset("MSFT", "US5949181045"),
+        ]
+    )
+    assert registry.get("AAPL") == make_asset("AAPL", "US0378331005")
+    assert registry.get("TSLA") is None
+    assert set(registry.get_many(["MSFT", "TSLA", "AAPL"])) == {"AAPL", "MSFT"}
+    assert [a.ticker for a in registry.get_by_isin("US0378331005")] == [
+        "AAPL",
+        "APC.DE",
+    ]
+    assert registry.missing(["TSLA", "AAPL", "TSLA"]) == ["TSLA"]
+
+    # persisted across connections
+    registry.close()
+    assert AssetRegistry(registry.path).get("MSFT") is not None
+
+
+def test_registry_get_many_handles_more_than_sqlite_variables_limit(registry):
+    tickers = [f"T{i}" for i in range(2000)]
+    registry.put([make_asset(ticker) for ticker in tickers])
+    assert len(registry.get_many(tickers)) == 2000
+
+
+def test_registry_assets_expire(registry):
+    registry.put([make_asset("AAPL")])
+    registry.ttl = timedelta(seconds=-1)
+    assert registry.get("AAPL") is None
+    assert registry.missing(["AAPL"]) == ["AAPL"]
+
+
+@pytest.mark.anyio
+async def test_registry_only_fetches_missing_assets(registry, yahoo, client):
+    registry.put([make_asset("AAPL")])
+    assets = await registry.warm_up(["MSFT", "AAPL", "TSLA"], client=client)
+    assert [asset.ticker for asset in assets] == ["MSFT", "AAPL", "TSLA"]
+    assert assets[1].name == "AAPL Inc."
+    (request,) = yahoo.endpoint_requests("quote")
+    assert request.url.params["symbols"] == "MSFT,TSLA"
+
+    await registry.get_asset("TSLA", client=client)
+    await load_assets(["AAPL", "MSFT", "TSLA"], client=client, registry=registry)
+    assert len(yahoo.endpoint_requests("quote")) == 1
@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import pytest
+
+from finvestor.yahoo_finance.scheduler import RequestScheduler, TokenBucket
+
+URL = "https://query2.finance.yahoo.com/v8/finance/chart/AAPL"
+
+
+def test_token_bucket_rejects_invalid_rates():
+    with pytest.raises(ValueError):
+        TokenBucket(0, 1)
+    with pytest.raises(ValueError):
+        TokenBucket(1, 0)
+
+
+@pytest.mark.anyio
+async def test_token_bucket_allows_a_burst_then_limits_the_rate():
+    bucket = TokenBucket(rate=50, burst=2)
+    started = time.monotonic()
+    await bucket.acquire()
+    await bucket.acquire()
+    assert time.monotonic() - started < 0.015
+    # tokens are reserved in call order: the 4th waits for 2 refills
+    await asyncio.gather(bucket.acquire(), bucket.acquire())
+    assert 0.035 <= time.monotonic() - started < 0.5
+
+
+@pytest.mark.anyio
+async def test_scheduler_bounds_concurrency():
+    scheduler = RequestScheduler(max_concurrency=3, host_rates={})
+    running = peak = 0
+
+    async def request(i: int) -> None:
+        nonlocal running, peak
+        async with scheduler.slot(URL, key=str(i % 4)):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+
+    await asyncio.gather(*[request(i) for i in range(20)])
+    assert peak == 3
+    assert scheduler.active == 0 and scheduler.pending == 0
+
+
+@pytest.mark.anyio
+async def test_scheduler_serves_waiting_keys_round_robin():
+    scheduler = RequestScheduler(max_concurrency=1, host_rates={})
+    order = []
+    release = asyncio.Event()
+
+    async def blocker() -> None:
+        async with scheduler.slot(URL, key="blocker"):
+            await release.wait()
+
+    async def request(key: str, i: int) -> None:
+        async with scheduler.slot(URL, key=key):
+            order.append(f"{key}{i}")
+
+    tasks = [asyncio.ensure_future(blocker())]
+    await asyncio.sleep(0)
+    tasks += [asyncio.ensure_future(request("A", i)) for i in range(3)]
+    tasks += [asyncio.ensure_future(request("B", i)) for i in range(2)]
+    await asyncio.sleep(0)
+    assert scheduler.pending == 5
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ["A0", "B0", "A1", "B1", "A2"]
+
+
+@pytest.mark.anyio
+async def test_scheduler_cancelled_waiters_dont_leak_slots():
+    scheduler = RequestScheduler(max_concurrency=1, host_rates={})
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with scheduler.slot(URL, key="A"):
+            await release.wait()
+
+    holder = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    assert scheduler.pending == 1
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert scheduler.pending == 0
+    release.set()
+    await holder
+    assert scheduler.active == 0
+
+
+@pytest.mark.anyio
+async def test_scheduler_rate_limits_listed_hosts_only():
+    scheduler = RequestScheduler(
+        max_concurrency=10, host_rates={"query2.finance.yahoo.com": (20.0, 1)}
+    )
+    started = time.monotonic()
+    for _ in range(5):
+        async with scheduler.slot("https://finance.yahoo.com/quote/AAPL"):
+            pass
+    assert time.monotonic() - started < 0.04
+    for _ in range(3):
+        async with scheduler.slot(URL):
+            pass
+    assert time.monotonic() - started >= 0.09
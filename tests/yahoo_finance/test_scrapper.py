@@ -0,0 +1,75 @@
+import threading
+
+import httpx
+import pytest
+from rich.live import _RefreshThread
+
+from finvestor.yahoo_finance.portfolio import load_assets
+from finvestor.yahoo_finance.scrapper import get_asset, get_assets, get_quotes
+from finvestor.yahoo_finance.utils import YF_MAX_ATTEMPTS, YF_QUOTE_BATCH_SIZE
+
+
+@pytest.mark.anyio
+async def test_get_quotes_requests_batches(yahoo, client):
+    tickers = [f"T{i}" for i in range(2 * YF_QUOTE_BATCH_SIZE + 1)]
+    yahoo.unknown = {"T3"}
+    quotes = await get_quotes(tickers + tickers[:5], client=client)
+    assert len(yahoo.endpoint_requests("quote")) == 3
+    assert set(quotes) == set(tickers) - {"T3"}
+    assert quotes["T1"]["longName"] == "T1 Inc."
+
+
+@pytest.mark.anyio
+async def test_get_quotes_retries_transient_errors(yahoo, client):
+    yahoo.queue("quote", httpx.Response(429), httpx.Response(503))
+    quotes = await get_quotes(["AAPL", "MSFT"], client=client)
+    assert set(quotes) == {"AAPL", "MSFT"}
+    assert len(yahoo.endpoint_requests("quote")) == 3
+
+
+@pytest.mark.anyio
+async def test_get_assets_doesnt_scrape_pages_when_throttled(yahoo, client):
+    yahoo.queue("quote", *[httpx.Response(429)] * YF_MAX_ATTEMPTS)
+    with pytest.raises(httpx.HTTPStatusError):
+        await get_assets(["AAPL", "MSFT"], client=client)
+    assert len(yahoo.endpoint_requests("quote")) == YF_MAX_ATTEMPTS
+    assert yahoo.endpoint_requests("quote_page") == []
+
+
+@pytest.mark.anyio
+async def test_get_assets_scrapes_pages_on_client_errors(yahoo, client):
+    yahoo.queue("quote", httpx.Response(400))
+    assets = await get_assets(["AAPL", "MSFT"], client=client)
+    assert [asset.name for asset in assets] == ["AAPL Scraped", "MSFT Scraped"]
+    assert len(yahoo.endpoint_requests("quote")) == 1
+    assert len(yahoo.endpoint_requests("quote_page")) == 2
+
+
+@pytest.mark.anyio
+async def test_get_assets_from_quotes_and_fallback_pages(yahoo, client):
+    yahoo.unknown = {"OLD"}
+    assets = await get_assets(["AAPL", "BTC-USD", "OLD", "AAPL"], client=client)
+    assert [asset.ticker for asset in assets] == ["AAPL", "BTC-USD", "OLD", "AAPL"]
+    aapl, btc, old, _ = assets
+    assert aapl.name == "AAPL Inc." and aapl.sector == "Technology"
+    assert aapl.isin == "US000000AAPL"
+    # only equities have a summary profile, crypto has no ISIN
+    assert btc.type == "CRYPTOCURRENCY" and btc.sector is None and btc.isin is None
+    assert old.name == "OLD Scraped" and old.currency == "GBp"
+    assert [r.url.path for r in yahoo.endpoint_requests("quote_page")] == ["/quote/OLD"]
+
+
+@pytest.mark.anyio
+async def test_get_asset_returns_the_quote_fields(yahoo, client):
+    asset = await get_asset("MSFT", client=client, quote={"quoteType": "ETF"})
+    assert asset.type == "ETF"
+    assert yahoo.endpoint_requests("quote_summary") == []
+
+
+@pytest.mark.anyio
+async def test_load_assets_stops_the_progress_display_on_errors(yahoo, client):
+    yahoo.unknown = {"OLD"}
+    yahoo.queue("quote_page", httpx.Response(404))
+    with pytest.raises(httpx.HTTPStatusError):
+        await load_assets(["AAPL", "OLD"], client=client)
+    assert not any(isinstance(t, _RefreshThread) for t in threading.enumerate())
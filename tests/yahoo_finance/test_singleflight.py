@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from finvestor.yahoo_finance.bars import get_yahoo_finance_ticker_ohlc
+from finvestor.yahoo_finance.singleflight import SingleFlight, single_flight
+from finvestor.yahoo_finance.utils import YFBarsRequestParams
+
+
+@pytest.mark.anyio
+async def test_single_flight_coalesces_concurrent_calls():
+    calls = []
+
+    @single_flight(key=lambda key, **_: key)
+    async def fetch(key: str, *, delay: float = 0.01) -> str:
+        calls.append(key)
+        await asyncio.sleep(delay)
+        return key.upper()
+
+    results = await asyncio.gather(fetch("a"), fetch("a"), fetch("b"), fetch("a"))
+    assert results == ["A", "A", "B", "A"]
+    assert sorted(calls) == ["a", "b"]
+    assert fetch.flight.in_flight == 0
+
+    # results are not cached
+    assert await fetch("a") == "A"
+    assert calls.count("a") == 2
+
+
+@pytest.mark.anyio
+async def test_single_flight_shares_errors():
+    calls = 0
+
+    async def fail() -> None:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    flight = SingleFlight()
+    results = await asyncio.gather(
+        flight.run("key", fail), flight.run("key", fail), return_exceptions=True
+    )
+    assert calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.anyio
+async def test_single_flight_cancelled_caller_doesnt_cancel_the_call():
+    flight = SingleFlight()
+    done = asyncio.Event()
+
+    async def work() -> int:
+        await asyncio.sleep(0.02)
+        done.set()
+        return 1
+
+    first = asyncio.ensure_future(flight.run("key", work))
+    second = asyncio.ensure_future(flight.run("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == 1
+    assert done.is_set()
+
+
+@pytest.mark.anyio
+async def test_identical_chart_requests_are_coalesced(yahoo, client):
+    params = YFBarsRequestParams(interval="1d", period="5d")
+    results = await asyncio.gather(
+        *[
+            get_yahoo_finance_ticker_ohlc("AAPL", params=params, client=client)
+            for _ in range(5)
+        ],
+        get_yahoo_finance_ticker_ohlc(
+            "AAPL", params=params.copy(update={"interval": "1h"}), client=client
+        ),
+    )
+    assert len(yahoo.chart_requests("AAPL")) == 2
+    assert all(result is results[0] for result in results[:5])
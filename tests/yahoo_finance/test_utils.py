@@ -0,0 +1,17 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from finvestor.yahoo_finance.utils import to_unix_seconds
+
+
+def test_to_unix_seconds():
+    cet = timezone(timedelta(hours=1))
+    timestamps = [
+        datetime(1970, 1, 1, 0, 1),
+        datetime(1970, 1, 1, 1, 0, 2, tzinfo=cet),
+    ]
+    assert to_unix_seconds(timestamps).tolist() == [60, 2]
+    series = pd.Series(pd.to_datetime(["1970-01-02"], utc=True))
+    assert to_unix_seconds(series).tolist() == [86400]
+    assert to_unix_seconds(pd.DatetimeIndex([], tz="UTC")).tolist() == []